@@ -0,0 +1,90 @@
+import heapq
+import itertools
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# Rebuild the heap once stale entries outnumber live ones by this much
+COMPACT_SLACK = 64
+
+
+def normalize_url(url: str) -> str:
+    """Key of a URL for deduplication (fragment and trailing "/" dropped)"""
+    return url.split('#')[0].rstrip('/')
+
+
+class CrawlFrontier:
+    """
+    URLs waiting to be crawled, best priority first
+
+    A heap ordered by (priority, insertion order) plus an index of queued
+    URLs by normalized key, so pushing, deduplicating and popping are all
+    O(log n) or better. A URL rediscovered with a higher priority is moved
+    up: the new heap entry supersedes the old one, which is skipped when it
+    surfaces (lazy deletion). Popped URLs are remembered and never queued
+    again.
+
+    Entries are tuples (url, priority, *metadata).
+    """
+
+    def __init__(self, normalize: Callable[[str], str] = normalize_url):
+        self.normalize = normalize
+        self._heap: List[Tuple[float, int, str]] = []
+        # key -> (sequence number of its live heap entry, entry)
+        self._queued: Dict[str, Tuple[int, Tuple]] = {}
+        self._popped: Set[str] = set()
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    def __bool__(self) -> bool:
+        return bool(self._queued)
+
+    def __contains__(self, url: str) -> bool:
+        """Whether a URL is queued or was already popped"""
+        key = self.normalize(url)
+        return key in self._queued or key in self._popped
+
+    def seen(self, url: str) -> bool:
+        """Whether a URL was already popped"""
+        return self.normalize(url) in self._popped
+
+    def push(self, url: str, priority: float, *metadata) -> bool:
+        """
+        Queue a URL, or raise its priority if it's queued lower
+
+        Returns:
+            True if the URL was added or moved up
+        """
+        key = self.normalize(url)
+        if key in self._popped:
+            return False
+        queued = self._queued.get(key)
+        if queued is not None and queued[1][1] >= priority:
+            return False
+
+        sequence = next(self._counter)
+        self._queued[key] = (sequence, (url, priority, *metadata))
+        heapq.heappush(self._heap, (-priority, sequence, key))
+        if len(self._heap) > 2 * len(self._queued) + COMPACT_SLACK:
+            self._compact()
+        return True
+
+    def pop(self) -> Optional[Tuple]:
+        """Best queued entry (None if empty); its URL counts as seen from now on"""
+        while self._heap:
+            _, sequence, key = heapq.heappop(self._heap)
+            queued = self._queued.get(key)
+            if queued is None or queued[0] != sequence:
+                continue  # superseded by a higher-priority push
+            del self._queued[key]
+            self._popped.add(key)
+            return queued[1]
+        return None
+
+    def _compact(self):
+        """Drop superseded heap entries"""
+        self._heap = [
+            entry for entry in self._heap
+            if self._queued.get(entry[2], (None,))[0] == entry[1]
+        ]
+        heapq.heapify(self._heap)
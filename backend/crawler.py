@@ -0,0 +1,143 @@
+import asyncio
+import heapq
+import itertools
+import httpx
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from crawl_frontier import CrawlFrontier, normalize_url
+from deadline import Deadline
+
+CRAWL_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
+CRAWL_TIMEOUT = 10
+# Pages in progress at once (fetching or waiting for their host's slot)
+CRAWL_WIDTH = 8
+# Requests to one host at a time, to stay polite to small restaurant sites
+DEFAULT_PER_HOST = 4
+# Best-scoring pages whose bodies are kept for the deep scrape
+PAGE_STORE_SIZE = 5
+
+# Frontier entries are (url, priority, *metadata)
+FrontierItem = Tuple
+
+
+def new_crawl_client(max_connections: int = CRAWL_WIDTH) -> httpx.AsyncClient:
+    """Async client (one connection pool) shared by every page of a crawl"""
+    return httpx.AsyncClient(
+        headers=CRAWL_HEADERS,
+        timeout=CRAWL_TIMEOUT,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    )
+
+
+class HostLimiter:
+    """Caps concurrent requests per host with one semaphore each"""
+
+    def __init__(self, per_host: int = DEFAULT_PER_HOST):
+        self.per_host = max(1, per_host)
+        self._semaphores: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+
+    def __call__(self, url: str) -> asyncio.Semaphore:
+        return self._semaphores[urlparse(url).netloc]
+
+
+class PageStore:
+    """
+    Bodies of the best-scoring pages of a crawl, bounded to `size` pages
+
+    A min-heap on score: a new page only gets in by pushing out the worst
+    stored one, so memory stays flat however many pages are scanned.
+    """
+
+    def __init__(self, size: int = PAGE_STORE_SIZE, normalize: Callable[[str], str] = normalize_url):
+        self.size = size
+        self.normalize = normalize
+        self._heap: List[Tuple[float, int, str]] = []
+        self._pages: Dict[str, bytes] = {}
+        self._counter = itertools.count()
+
+    def offer(self, url: str, score: float, content: bytes):
+        """Keep a page if it's among the best `size` so far"""
+        key = self.normalize(url)
+        if key in self._pages or self.size <= 0:
+            return
+        if len(self._heap) >= self.size:
+            if score <= self._heap[0][0]:
+                return
+            _, _, evicted = heapq.heappop(self._heap)
+            del self._pages[evicted]
+        heapq.heappush(self._heap, (score, next(self._counter), key))
+        self._pages[key] = content
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Stored body of a page (None if it wasn't kept)"""
+        return self._pages.get(self.normalize(url))
+
+
+async def fetch_page(client: httpx.AsyncClient, limiter: HostLimiter, url: str, timeout: float = CRAWL_TIMEOUT) -> bytes:
+    """Body of a page, waiting for a free slot on its host first"""
+    async with limiter(url):
+        response = await client.get(url, timeout=timeout)
+    return response.content
+
+
+async def crawl(
+    seeds: List[FrontierItem],
+    visit: Callable[[FrontierItem], Awaitable[List[FrontierItem]]],
+    max_pages: int,
+    normalize: Callable[[str], str] = normalize_url,
+    width: int = CRAWL_WIDTH,
+    deadline: Optional[Deadline] = None
+) -> int:
+    """
+    Priority-driven crawl with several pages in flight
+
+    The highest-priority URLs of the frontier are started first, up to
+    `width` at a time; as soon as any page finishes, the links it returned
+    join the frontier (raising the priority of ones already queued) and
+    the next best URL starts. Once the deadline expires no page is
+    started and the pages in flight are cancelled.
+
+    Args:
+        seeds: Starting frontier entries
+        visit: Coroutine scanning one entry and returning the entries it links to
+        max_pages: Max pages to start
+        normalize: URL -> key used to skip URLs already queued or started
+        width: Max pages in progress at once
+        deadline: Time budget of the crawl (recorded as cut "crawl")
+
+    Returns:
+        Number of pages started
+    """
+    frontier = CrawlFrontier(normalize)
+    for item in seeds:
+        frontier.push(*item)
+    started = 0
+    pending = set()
+
+    try:
+        while frontier or pending:
+            if deadline is not None and deadline.expired():
+                deadline.cut("crawl")
+                break
+            while frontier and len(pending) < width and started < max_pages:
+                started += 1
+                pending.add(asyncio.ensure_future(visit(frontier.pop())))
+            if not pending:
+                break
+
+            timeout = deadline.remaining() if deadline is not None else None
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                for link in task.result():
+                    frontier.push(*link)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    return started
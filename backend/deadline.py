@@ -0,0 +1,54 @@
+import time
+from typing import Dict, List, Optional
+
+# Never hand a zero/negative timeout to an HTTP client
+MIN_TIMEOUT = 0.05
+
+
+class Deadline:
+    """
+    Time budget of one request, passed through every stage
+
+    Stages ask for their timeout (capped by what's left), skip work once the
+    budget is gone and record that they were cut short, so endpoints can
+    return partial results and say which parts are incomplete.
+    A Deadline without a budget never expires.
+    """
+
+    def __init__(self, budget_ms: Optional[float] = None):
+        self.budget_ms = budget_ms
+        self.started = time.monotonic()
+        self._expires = None if budget_ms is None else self.started + budget_ms / 1000.0
+        self.truncated: List[str] = []
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (None = unlimited)"""
+        if self._expires is None:
+            return None
+        return max(self._expires - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def timeout(self, default: float) -> float:
+        """A stage's usual timeout, capped by the time left"""
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return max(min(default, remaining), MIN_TIMEOUT)
+
+    def cut(self, stage: str):
+        """Record that a stage was skipped or cut short"""
+        if stage not in self.truncated:
+            self.truncated.append(stage)
+            print(f"⏱️ Deadline: '{stage}' cut short")
+
+    def report(self) -> Dict:
+        """Summary for API responses"""
+        return {
+            "deadline_ms": self.budget_ms,
+            "elapsed_ms": round((time.monotonic() - self.started) * 1000),
+            "truncated": bool(self.truncated),
+            "truncated_stages": list(self.truncated)
+        }
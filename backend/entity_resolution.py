@@ -0,0 +1,247 @@
+import math
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import List, Dict, Optional, Set, Tuple
+from geo import haversine_m
+from place_record import Place
+
+# Two records are the same place if they are this close...
+MATCH_DISTANCE_M = 80
+# ...and their normalized names are at least this similar
+NAME_SIMILARITY = 0.8
+
+# Which record wins when fields conflict (lower = preferred)
+SOURCE_PRIORITY = {"Google Places": 0, "OpenStreetMap": 1, "Nominatim": 2}
+
+# Generic words that don't tell two places apart
+GENERIC_WORDS = {
+    "the", "a", "restaurant", "restauracia", "restaurace", "cafe", "kaviaren",
+    "kavarna", "bar", "pub", "bistro", "pizzeria", "hotel", "caffe", "coffee",
+}
+
+MISSING_VALUES = ("N/A", None, "", [], {})
+
+# OSM tag keys that say what kind of place something is
+KIND_TAG_KEYS = ("amenity", "shop", "tourism", "leisure", "historic", "craft")
+# Provider kinds that say nothing (Google adds these to almost everything)
+GENERIC_KINDS = {"point_of_interest", "establishment", "unknown", "yes", "n_a"}
+# Kinds providers disagree on for the same place (Google "restaurant" vs
+# OSM "fast_food"); anything not listed is its own family
+KIND_FAMILIES = {
+    **dict.fromkeys((
+        "restaurant", "cafe", "coffee", "coffee_shop", "bar", "pub", "fast_food", "food",
+        "meal_takeaway", "meal_delivery", "food_court", "bakery", "ice_cream", "biergarten",
+        "nightclub", "night_club", "bistro", "pizzeria", "pizza_place", "tea_room", "wine_bar",
+        "cocktail_bar", "beer_bar", "diner", "confectionery", "pastry", "deli",
+    ), "food_and_drink"),
+    **dict.fromkeys((
+        "hotel", "motel", "hostel", "guest_house", "lodging", "apartment", "chalet", "camp_site",
+    ), "lodging"),
+    **dict.fromkeys((
+        "museum", "gallery", "art_gallery", "arts_centre", "attraction", "tourist_attraction",
+    ), "culture"),
+    **dict.fromkeys(("park", "garden", "playground", "nature_reserve"), "park"),
+    **dict.fromkeys(("supermarket", "grocery_or_supermarket", "convenience", "market", "store", "shop"), "shop"),
+}
+
+
+# ============================================================
+# 1. NORMALIZATION & SIMILARITY
+# ============================================================
+def normalize_name(name: str) -> str:
+    """Lowercase, fold diacritics (Košice -> kosice), drop punctuation and generic words"""
+    folded = unicodedata.normalize("NFKD", name or "")
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch)).casefold()
+    tokens = re.sub(r"[^0-9a-z]+", " ", folded).split()
+    meaningful = [token for token in tokens if token not in GENERIC_WORDS]
+    return " ".join(meaningful or tokens)
+
+
+def name_similarity(a: str, b: str, threshold: float = 0.0) -> float:
+    """
+    Similarity of two normalized names, 0.0-1.0
+
+    With a threshold, cheap upper bounds are checked first and 0.0 is
+    returned as soon as the names can't reach it.
+    """
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    # "napoli centrum" vs "napoli centrum kosice": one name is contained in
+    # the other. A single shared word isn't enough ("central" in "cafe
+    # central" and "central park")
+    if (tokens_a <= tokens_b or tokens_b <= tokens_a) and len(tokens_a & tokens_b) > 1:
+        return 0.9
+    matcher = SequenceMatcher(None, a, b)
+    if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+        return 0.0
+    return matcher.ratio()
+
+
+def _fold_kind(kind: str) -> str:
+    folded = unicodedata.normalize("NFKD", str(kind))
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch)).casefold()
+    return "_".join(re.sub(r"[^0-9a-z]+", " ", folded).split())
+
+
+def place_kinds(place: Dict) -> Set[str]:
+    """
+    Families of what a place is, from any provider's fields
+
+    Reads OSM tags, Google/Yelp "types", a Foursquare "category" name and
+    the query category of labelled records ("amenity=cafe"). Empty when
+    the record doesn't say.
+    """
+    raw = []
+    # Place records and serialized places expose their OSM tags as "all_tags"
+    tags = place.get("tags") or place.get("all_tags")
+    if isinstance(tags, dict):
+        raw.extend(tags[key] for key in KIND_TAG_KEYS if tags.get(key))
+    types = place.get("types")
+    if isinstance(types, list):
+        raw.extend(types)
+    category = place.get("category")
+    if isinstance(category, str):
+        raw.append(category.partition("=")[2] or category)
+
+    kinds = set()
+    for kind in raw:
+        for value in str(kind).split(";"):
+            folded = _fold_kind(value)
+            if folded and folded not in GENERIC_KINDS:
+                kinds.add(KIND_FAMILIES.get(folded, folded))
+    return kinds
+
+
+def kinds_compatible(a: Set[str], b: Set[str]) -> bool:
+    """Whether two places can be the same kind of place (unknown kinds always can)"""
+    return not a or not b or bool(a & b)
+
+
+def place_coords(place: Dict) -> Optional[Tuple[float, float]]:
+    """(lat, lon) of a Place or a place dict in either the places_api or main.py shape"""
+    if place.get("lat") is not None and place.get("lon") is not None:
+        return float(place["lat"]), float(place["lon"])
+    coordinates = place.get("coordinates") or {}
+    if coordinates.get("lat") is not None and coordinates.get("lon") is not None:
+        return float(coordinates["lat"]), float(coordinates["lon"])
+    return None
+
+
+# ============================================================
+# 2. MERGING
+# ============================================================
+def merge_records(records: List[Dict]) -> Dict:
+    """
+    One record per real place
+
+    The preferred source (Google: rating, photos, reviews) provides the
+    base record; missing fields are filled from the others (OSM tags,
+    cuisine, opening hours, ...).
+    """
+    if len(records) == 1:
+        return records[0]
+
+    ordered = sorted(records, key=lambda r: SOURCE_PRIORITY.get(r.get("source"), len(SOURCE_PRIORITY)))
+    if all(isinstance(record, Place) for record in ordered):
+        return Place.merge(ordered)
+    # Mixed Place records and dicts: merge as dicts
+    ordered = [record.to_dict() if isinstance(record, Place) else record for record in ordered]
+
+    merged = dict(ordered[0])
+    for record in ordered[1:]:
+        for key, value in record.items():
+            if merged.get(key) in MISSING_VALUES and value not in MISSING_VALUES:
+                merged[key] = value
+
+    sources = []
+    for record in ordered:
+        for source in record.get("sources") or [record.get("source")]:
+            if source and source not in sources:
+                sources.append(source)
+    merged["sources"] = sources
+    return merged
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+# ============================================================
+# 3. ENTITY RESOLUTION
+# ============================================================
+def resolve_entities(
+    places: List[Dict],
+    max_distance_m: float = MATCH_DISTANCE_M,
+    min_similarity: float = NAME_SIMILARITY
+) -> List[Dict]:
+    """
+    Merge duplicate places coming from different providers
+
+    Candidates are bucketed into a spatial hash grid with cells of
+    max_distance_m, so each place is only compared with places in its own
+    and the 8 neighbouring cells: O(n) for realistic densities. Distinct
+    branches of a chain stay separate because they are far apart, and
+    places of incompatible kinds (a cafe and a park) are never merged.
+
+    Args:
+        places: Place records or dicts from any provider (order is preserved)
+        max_distance_m: Max distance between two records of the same place
+        min_similarity: Min normalized-name similarity
+
+    Returns:
+        One merged record per real place
+    """
+    if not places:
+        return []
+
+    coords = [place_coords(place) for place in places]
+    names = [normalize_name(place.get("name") or "") for place in places]
+    kinds = [place_kinds(place) for place in places]
+
+    # Cell size in degrees; longitude scaled at the set's mean latitude
+    known = [c for c in coords if c]
+    mean_lat = sum(lat for lat, _ in known) / len(known) if known else 0.0
+    cell_lat = max_distance_m / 111320.0
+    cell_lon = cell_lat / max(math.cos(math.radians(mean_lat)), 1e-6)
+
+    grid: Dict[Tuple[int, int], List[int]] = {}
+    groups = _UnionFind(len(places))
+
+    for i, point in enumerate(coords):
+        if not point or names[i] in ("", "unknown"):
+            continue
+        cx, cy = int(math.floor(point[1] / cell_lon)), int(math.floor(point[0] / cell_lat))
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for j in grid.get((cx + dx, cy + dy), ()):
+                    if haversine_m(point[0], point[1], coords[j][0], coords[j][1]) > max_distance_m:
+                        continue
+                    if groups.find(i) == groups.find(j):
+                        continue
+                    if not kinds_compatible(kinds[i], kinds[j]):
+                        continue
+                    if name_similarity(names[i], names[j], min_similarity) >= min_similarity:
+                        groups.union(i, j)
+        grid.setdefault((cx, cy), []).append(i)
+
+    clusters: Dict[int, List[Dict]] = {}
+    for i, place in enumerate(places):
+        clusters.setdefault(groups.find(i), []).append(place)
+
+    return [merge_records(records) for records in clusters.values()]
@@ -0,0 +1,171 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+EARTH_RADIUS_M = 6371000.0
+
+
+# ============================================================
+# 1. DISTANCES
+# ============================================================
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great-circle distance between two points
+    
+    Returns:
+        Distance in meters
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def bbox_around(lat: float, lon: float, radius: float) -> Tuple[float, float, float, float]:
+    """
+    Bounding box that contains a circle
+    
+    Returns:
+        (south, west, north, east) in degrees
+    """
+    dlat = math.degrees(radius / EARTH_RADIUS_M)
+    dlon = math.degrees(radius / (EARTH_RADIUS_M * max(math.cos(math.radians(lat)), 1e-6)))
+    return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+
+
+# ============================================================
+# 2. SLIPPY MAP TILES
+# ============================================================
+def tile_for(lat: float, lon: float, zoom: int) -> Tuple[int, int]:
+    """Slippy map tile (x, y) containing a point"""
+    n = 2 ** zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds(x: int, y: int, zoom: int) -> Tuple[float, float, float, float]:
+    """
+    Bounds of a slippy map tile
+    
+    Returns:
+        (south, west, north, east) in degrees
+    """
+    n = 2 ** zoom
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return south, west, north, east
+
+
+def tiles_covering(lat: float, lon: float, radius: float, zoom: int) -> List[Tuple[int, int]]:
+    """All tiles intersecting the bounding box of a circle"""
+    south, west, north, east = bbox_around(lat, lon, radius)
+    x0, y0 = tile_for(north, west, zoom)
+    x1, y1 = tile_for(south, east, zoom)
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+# ============================================================
+# 3. OSM ELEMENT HELPERS
+# ============================================================
+def element_coords(element: Dict) -> Optional[Tuple[float, float]]:
+    """
+    Coordinates of an Overpass element
+    
+    Accepts every shape Overpass can send: node lat/lon, a way/relation
+    "center", "bounds", a "geometry" point list (out geom) or a GeoJSON
+    point (derived elements from convert).
+    
+    Returns:
+        (lat, lon) or None if the element has no position
+    """
+    if "lat" in element and "lon" in element:
+        return element["lat"], element["lon"]
+    center = element.get("center")
+    if center and "lat" in center and "lon" in center:
+        return center["lat"], center["lon"]
+    geometry = element.get("geometry")
+    if isinstance(geometry, dict) and geometry.get("type") == "Point":
+        coordinates = geometry.get("coordinates") or []
+        if len(coordinates) >= 2:
+            return coordinates[1], coordinates[0]
+    if isinstance(geometry, list):
+        points = [point for point in geometry if point and "lat" in point and "lon" in point]
+        if points:
+            return (
+                sum(point["lat"] for point in points) / len(points),
+                sum(point["lon"] for point in points) / len(points)
+            )
+    bounds = element.get("bounds")
+    if bounds and all(key in bounds for key in ("minlat", "minlon", "maxlat", "maxlon")):
+        return (bounds["minlat"] + bounds["maxlat"]) / 2, (bounds["minlon"] + bounds["maxlon"]) / 2
+    return None
+
+
+# ============================================================
+# 4. ROUTES (POLYLINES)
+# ============================================================
+def decode_polyline(encoded: str) -> List[Tuple[float, float]]:
+    """
+    Decode a Google encoded polyline (precision 5)
+
+    Returns:
+        [(lat, lon), ...]
+    """
+    points = []
+    index, lat, lon = 0, 0, 0
+    while index < len(encoded):
+        deltas = []
+        for _ in range(2):
+            shift, value = 0, 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                value |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(value >> 1) if value & 1 else value >> 1)
+        lat += deltas[0]
+        lon += deltas[1]
+        points.append((lat / 1e5, lon / 1e5))
+    return points
+
+
+def route_length_m(points: List[Tuple[float, float]]) -> float:
+    """Total length of a polyline in meters"""
+    return sum(haversine_m(*points[i], *points[i + 1]) for i in range(len(points) - 1))
+
+
+def project_onto_route(lat: float, lon: float, points: List[Tuple[float, float]]) -> Tuple[float, float]:
+    """
+    Closest point of a polyline to a location
+
+    Each segment is projected in a local equirectangular plane, which is
+    accurate enough for walking/city-scale routes.
+
+    Returns:
+        (distance along the route to that point, distance from the route), in meters
+    """
+    if len(points) == 1:
+        return 0.0, haversine_m(lat, lon, *points[0])
+
+    best_offset, best_along = float("inf"), 0.0
+    travelled = 0.0
+    for (lat1, lon1), (lat2, lon2) in zip(points, points[1:]):
+        scale = math.cos(math.radians((lat1 + lat2) / 2))
+        # Segment and point in meters relative to the segment start
+        sx = math.radians(lon2 - lon1) * scale * EARTH_RADIUS_M
+        sy = math.radians(lat2 - lat1) * EARTH_RADIUS_M
+        px = math.radians(lon - lon1) * scale * EARTH_RADIUS_M
+        py = math.radians(lat - lat1) * EARTH_RADIUS_M
+        length2 = sx * sx + sy * sy
+        t = 0.0 if length2 == 0 else min(max((px * sx + py * sy) / length2, 0.0), 1.0)
+        offset = math.hypot(px - t * sx, py - t * sy)
+        if offset < best_offset:
+            best_offset, best_along = offset, travelled + t * math.sqrt(length2)
+        travelled += math.sqrt(length2)
+    return best_along, best_offset
@@ -0,0 +1,159 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+import httpx
+import requests
+from cachetools import TLRUCache
+from typing import List, Dict, Optional
+from rate_limit import acquire, acquire_async
+from sqlite_cache import SqliteCache
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+USER_AGENT = "TripPlannerApp/1.0"
+GEOCODE_TIMEOUT = 10
+
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", os.path.join("cache", "geocode.sqlite3"))
+GEOCODE_TTL = 30 * 86400          # places don't move
+GEOCODE_NOT_FOUND_TTL = 86400     # retry unknown queries daily
+GEOCODE_MEMORY_SIZE = 2048
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a free-text location: "  KOŠICE, " -> "kosice" """
+    folded = unicodedata.normalize("NFKD", query or "")
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch)).casefold()
+    folded = re.sub(r"\s+", " ", folded)
+    return folded.strip(" ,.;")
+
+
+class GeocodingService:
+    """
+    Nominatim lookups behind an in-memory LRU and a shared SQLite store
+
+    Every Nominatim call site (weather.geocode, /search-places and
+    places_api.find_places_nominatim) goes through here, so repeated
+    lookups never leave the box. Memory entries expire like the stored
+    ones, so a not-found answer is retried after GEOCODE_NOT_FOUND_TTL.
+    """
+
+    def __init__(self, store: SqliteCache, memory_size: int = GEOCODE_MEMORY_SIZE, timer=time.monotonic):
+        self.store = store
+        self._memory = TLRUCache(maxsize=memory_size, ttu=self._expires, timer=timer)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _expires(key: str, results: List[Dict], now: float) -> float:
+        return now + (GEOCODE_TTL if results else GEOCODE_NOT_FOUND_TTL)
+
+    @staticmethod
+    def _key(query: str, limit: int, params: Dict) -> str:
+        extra = "&".join(f"{k}={params[k]}" for k in sorted(params))
+        return f"{normalize_query(query)}|{limit}|{extra}"
+
+    def _cached(self, key: str) -> Optional[List[Dict]]:
+        with self._lock:
+            results = self._memory.get(key)
+        if results is None:
+            results = self.store.get(key)
+            if results is not None:
+                with self._lock:
+                    self._memory[key] = results
+        return results
+
+    def _remember(self, key: str, results: List[Dict]):
+        with self._lock:
+            self._memory[key] = results
+        self.store.set(key, results, ttl=GEOCODE_TTL if results else GEOCODE_NOT_FOUND_TTL)
+
+    def search(self, query: str, limit: int = 1, timeout: float = GEOCODE_TIMEOUT, **params) -> List[Dict]:
+        """
+        Raw Nominatim search results (cached)
+
+        Args:
+            query: Free-text query
+            limit: Max number of results
+            timeout: Request timeout in seconds
+            **params: Extra Nominatim parameters (addressdetails, extratags, ...)
+
+        Returns:
+            Nominatim result list ([] if nothing found or on error)
+        """
+        key = self._key(query, limit, params)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        try:
+            acquire("nominatim")
+            response = requests.get(
+                NOMINATIM_URL,
+                params={"format": "json", "q": query, "limit": limit, **params},
+                headers={"User-Agent": USER_AGENT},
+                timeout=timeout
+            )
+            response.raise_for_status()
+            results = response.json()
+        except Exception as e:
+            print(f"❌ Geocoding error for '{query}': {e}")
+            return []
+
+        self._remember(key, results)
+        return results
+
+    async def search_async(
+        self,
+        client: httpx.AsyncClient,
+        query: str,
+        limit: int = 1,
+        raise_errors: bool = False,
+        **params
+    ) -> List[Dict]:
+        """Async variant of search() for the places_api fan-out (raise_errors: raise instead of returning [])"""
+        key = self._key(query, limit, params)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        try:
+            await acquire_async("nominatim")
+            response = await client.get(
+                NOMINATIM_URL,
+                params={"format": "json", "q": query, "limit": limit, **params},
+                headers={"User-Agent": USER_AGENT},
+                timeout=GEOCODE_TIMEOUT
+            )
+            response.raise_for_status()
+            results = response.json()
+        except Exception as e:
+            print(f"❌ Geocoding error for '{query}': {e}")
+            if raise_errors:
+                raise
+            return []
+
+        self._remember(key, results)
+        return results
+
+    def geocode(self, query: str, timeout: float = GEOCODE_TIMEOUT) -> Optional[Dict]:
+        """
+        Geocode a free-text location
+
+        Args:
+            query: Free-text location
+            timeout: Request timeout in seconds (cache hits are instant)
+
+        Returns:
+            {"lat", "lon", "display_name"} or None if not found
+        """
+        results = self.search(query, limit=1, timeout=timeout)
+        if not results:
+            return None
+        return {
+            "lat": float(results[0]["lat"]),
+            "lon": float(results[0]["lon"]),
+            "display_name": results[0]["display_name"]
+        }
+
+
+geocoding_service = GeocodingService(SqliteCache(GEOCODE_CACHE_PATH, table="geocode", ttl=GEOCODE_TTL))
@@ -0,0 +1,249 @@
+import asyncio
+import os
+import threading
+import time
+import httpx
+import requests
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import AsyncIterator, Iterator, List, Dict, Optional
+from rate_limit import acquire, acquire_async
+from deadline import Deadline
+
+GOOGLE_NEARBY_URL = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+GOOGLE_DETAILS_URL = "https://maps.googleapis.com/maps/api/place/details/json"
+DETAILS_FIELDS = "name,formatted_address,formatted_phone_number,international_phone_number,website,opening_hours,price_level,rating,user_ratings_total,reviews,types,geometry,photos,business_status,url"
+
+DETAILS_TTL = int(os.getenv("PLACE_DETAILS_TTL", str(6 * 3600)))
+DETAILS_CACHE_SIZE = 4096
+# Bounded pool: enough to overlap round-trips without hammering the API
+DETAILS_WORKERS = 5
+
+# Nearby Search pages: 20 results each, at most 3 pages (60 results).
+# A next_page_token only becomes valid a couple of seconds after it is issued.
+NEARBY_MAX_PAGES = 3
+NEXT_PAGE_DELAY = 2.0
+TOKEN_RETRIES = 3
+TOKEN_RETRY_DELAY = 1.0
+NEARBY_TIMEOUT = 30
+DETAILS_TIMEOUT = 10
+
+_details_cache = TTLCache(maxsize=DETAILS_CACHE_SIZE, ttl=DETAILS_TTL)
+_details_lock = threading.Lock()
+_details_pool = ThreadPoolExecutor(max_workers=DETAILS_WORKERS, thread_name_prefix="place-details")
+
+
+# ============================================================
+# 1. NEARBY SEARCH (lazy pagination)
+# ============================================================
+def _nearby_params(lat: float, lon: float, radius: int, place_type: str, api_key: str, token: Optional[str]) -> Dict:
+    if token:
+        return {"pagetoken": token, "key": api_key}
+    return {"location": f"{lat},{lon}", "radius": radius, "type": place_type, "key": api_key}
+
+
+def _page_ok(data: Dict) -> bool:
+    """Whether a Nearby Search page has results (logs real errors)"""
+    status = data.get("status")
+    if status == "OK":
+        return True
+    if status != "ZERO_RESULTS":
+        print(f"⚠️ Google API status: {status}")
+    return False
+
+
+def _raise_status(data: Dict, raise_errors: bool):
+    """Raise for an error status (not for ZERO_RESULTS) if asked to"""
+    if raise_errors and data.get("status") != "ZERO_RESULTS":
+        raise RuntimeError(f"Google API status: {data.get('status')}")
+
+
+def iter_nearby_results(
+    lat: float,
+    lon: float,
+    radius: int,
+    place_type: str,
+    api_key: str,
+    max_pages: int = NEARBY_MAX_PAGES,
+    deadline: Optional[Deadline] = None,
+    raise_errors: bool = False
+) -> Iterator[Dict]:
+    """
+    Google Nearby Search results, fetched one page at a time on demand
+
+    Page 1 is yielded right away. The next page is only requested once the
+    consumer has used up the current one, so callers that stop early (small
+    limits) never pay for it. The token's activation delay runs from when
+    the page arrived: a slow consumer doesn't wait at all. With a deadline,
+    paging stops once the next page can't arrive in time. With raise_errors,
+    failed requests and error statuses raise instead of ending the results
+    (lets caches tell "no more places" apart from "request failed").
+
+    Yields:
+        Raw Nearby Search result objects
+    """
+    deadline = deadline or Deadline()
+    token = None
+    ready_at = 0.0
+    for _ in range(max_pages):
+        try:
+            delay = ready_at - time.monotonic()
+            remaining = deadline.remaining()
+            if remaining is not None and remaining <= max(delay, 0):
+                deadline.cut("google")
+                return
+            if delay > 0:
+                time.sleep(delay)
+            for attempt in range(TOKEN_RETRIES):
+                acquire("google")
+                response = requests.get(
+                    GOOGLE_NEARBY_URL,
+                    params=_nearby_params(lat, lon, radius, place_type, api_key, token),
+                    timeout=deadline.timeout(NEARBY_TIMEOUT)
+                )
+                data = response.json()
+                # INVALID_REQUEST on a token means "not active yet"
+                if not token or data.get("status") != "INVALID_REQUEST":
+                    break
+                time.sleep(TOKEN_RETRY_DELAY)
+        except Exception as e:
+            print(f"❌ Google Places API error: {e}")
+            if deadline.expired():
+                deadline.cut("google")
+            if raise_errors:
+                raise
+            return
+
+        if not _page_ok(data):
+            _raise_status(data, raise_errors)
+            return
+        token = data.get("next_page_token")
+        ready_at = time.monotonic() + NEXT_PAGE_DELAY
+        yield from data.get("results", [])
+        if not token:
+            return
+
+
+async def iter_nearby_results_async(
+    client: httpx.AsyncClient,
+    lat: float,
+    lon: float,
+    radius: int,
+    place_type: str,
+    api_key: str,
+    max_pages: int = NEARBY_MAX_PAGES,
+    raise_errors: bool = False
+) -> AsyncIterator[Dict]:
+    """Async variant of iter_nearby_results() for the places_api fan-out"""
+    token = None
+    ready_at = 0.0
+    for _ in range(max_pages):
+        try:
+            wait = ready_at - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            for attempt in range(TOKEN_RETRIES):
+                await acquire_async("google")
+                response = await client.get(
+                    GOOGLE_NEARBY_URL,
+                    params=_nearby_params(lat, lon, radius, place_type, api_key, token),
+                    timeout=NEARBY_TIMEOUT
+                )
+                data = response.json()
+                if not token or data.get("status") != "INVALID_REQUEST":
+                    break
+                await asyncio.sleep(TOKEN_RETRY_DELAY)
+        except Exception as e:
+            print(f"❌ Google Places API error: {e}")
+            if raise_errors:
+                raise
+            return
+
+        if not _page_ok(data):
+            _raise_status(data, raise_errors)
+            return
+        token = data.get("next_page_token")
+        ready_at = time.monotonic() + NEXT_PAGE_DELAY
+        for result in data.get("results", []):
+            yield result
+        if not token:
+            return
+
+
+# ============================================================
+# 2. PLACE DETAILS
+# ============================================================
+def fetch_place_details(place_id: str, api_key: str, timeout: float = DETAILS_TIMEOUT) -> Dict:
+    """
+    Google Place Details for one place (cached by place_id)
+
+    Returns:
+        The "result" object ({} on error, errors are not cached)
+    """
+    with _details_lock:
+        cached = _details_cache.get(place_id)
+    if cached is not None:
+        return cached
+
+    try:
+        acquire("google")
+        response = requests.get(
+            GOOGLE_DETAILS_URL,
+            params={"place_id": place_id, "fields": DETAILS_FIELDS, "key": api_key},
+            timeout=timeout
+        )
+        if response.status_code != 200:
+            return {}
+        data = response.json()
+        if data.get("status") != "OK":
+            return {}
+    except Exception as e:
+        print(f"⚠️ Place Details failed for {place_id}: {e}")
+        return {}
+
+    details = data.get("result", {})
+    with _details_lock:
+        _details_cache[place_id] = details
+    return details
+
+
+def fetch_place_details_many(place_ids: List[str], api_key: str, deadline: Optional[Deadline] = None) -> Dict[str, Dict]:
+    """
+    Place Details for several places, fetched concurrently
+
+    Cached places are answered immediately, the rest go to a bounded
+    thread pool instead of N sequential round-trips. Places whose details
+    don't arrive before the deadline are left out.
+
+    Returns:
+        {place_id: details}
+    """
+    deadline = deadline or Deadline()
+    results = {}
+    missing = []
+    with _details_lock:
+        for place_id in place_ids:
+            cached = _details_cache.get(place_id)
+            if cached is not None:
+                results[place_id] = cached
+            elif place_id not in missing:
+                missing.append(place_id)
+
+    if missing:
+        print(f"   📇 Place Details: {len(results)} cached, fetching {len(missing)}")
+        if deadline.expired():
+            deadline.cut("place_details")
+            return results
+        timeout = deadline.timeout(DETAILS_TIMEOUT)
+        futures = {
+            place_id: _details_pool.submit(fetch_place_details, place_id, api_key, timeout)
+            for place_id in missing
+        }
+        wait(futures.values(), timeout=deadline.remaining())
+        for place_id, future in futures.items():
+            if future.done():
+                results[place_id] = future.result()
+            else:
+                deadline.cut("place_details")
+
+    return results
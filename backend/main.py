@@ -2,7 +2,11 @@ from fastapi import FastAPI, Query, Response, Body
 from fastapi.middleware.cors import CORSMiddleware
 import openai
 import requests
+import asyncio
 import json
+import math
+import re
+from itertools import islice
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 from selenium import webdriver
@@ -13,6 +17,22 @@ from selenium.webdriver.support import expected_conditions as EC
 import time
 from typing import Optional, List, Dict
 from places_api import search_places, format_place_for_display, get_place_types
+from place_record import Place
+from geo import decode_polyline, route_length_m
+from route_search import search_along_route, parse_waypoints
+from tile_cache import overpass_tile_cache
+from overpass import place_type_to_tag, normalize_tags
+from entity_resolution import resolve_entities
+from ranking import rank_places
+from geocoding import geocoding_service, GEOCODE_TIMEOUT
+from google_places import fetch_place_details_many, iter_nearby_results
+from deadline import Deadline
+from crawler import HostLimiter, PageStore, crawl, fetch_page, new_crawl_client, CRAWL_TIMEOUT, DEFAULT_PER_HOST
+from crawl_frontier import CrawlFrontier
+from relevance_cache import url_relevance_cache
+from query_cache import query_cache, normalize_place_type, fold_text
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from osm_index import get_local_index
 
 app = FastAPI()
 
@@ -38,6 +58,24 @@ except:
 tags_for_places = []
 settings = {}
 
+# Usual timeouts of the smart-search stages (capped by deadline_ms when given)
+GPT_TIMEOUT = 30
+SCRAPE_TIMEOUT = 60
+# Results per provider in /search-places (the Overpass search caps at the same)
+SEARCH_PLACES_LIMIT = 10
+# Website scraping runs here so a request can stop waiting on it at its deadline
+_scrape_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="scrape")
+# Smart search runs one Google nearby search per place type, at most this
+# many, side by side (and alongside the OSM search)
+MAX_GOOGLE_PLACE_TYPES = 3
+_google_pool = ThreadPoolExecutor(max_workers=MAX_GOOGLE_PLACE_TYPES, thread_name_prefix="google")
+
+
+@app.on_event("startup")
+def load_local_osm_index():
+    """Load the offline OSM extract (if OSM_EXTRACT_PATH is set) before serving"""
+    get_local_index()
+
 
 def is_valid_image_url(url):
     """Check if URL is a valid image (not tracking pixel or analytics)"""
@@ -72,6 +110,27 @@ def is_valid_image_url(url):
     return True
 
 
+def detect_context_category(context: str) -> Optional[str]:
+    """Context category of the URL rules ("tea", "interior", "food", "atmosphere"), None if unclear"""
+    context_lower = context.lower()
+    
+    # Check for specific keywords in context
+    if any(word in context_lower for word in ["tea", "čaj", "caj", "cajovna"]):
+        return "tea"
+    elif any(word in context_lower for word in ["interior", "interiér", "priestor", "miestnost"]):
+        return "interior"
+    elif any(word in context_lower for word in ["food", "jedlo", "menu", "dish"]):
+        return "food"
+    elif any(word in context_lower for word in ["atmosphere", "atmosfera", "event"]):
+        return "atmosphere"
+    return None
+
+
+def relevance_context_key(context: str) -> str:
+    """Key under which AI URL scores for a context are cached"""
+    return detect_context_category(context) or fold_text(context)
+
+
 def should_visit_url_for_context(url: str, context: str) -> tuple[bool, float]:
     """
     Determines if URL is relevant for given context
@@ -80,8 +139,6 @@ def should_visit_url_for_context(url: str, context: str) -> tuple[bool, float]:
     url_lower = url.lower()
     path = urlparse(url).path.lower()
     
-    context_lower = context.lower()
-    
     # Define context-specific URL patterns with MORE SPECIFIC matching
     context_patterns = {
         "interior": {
@@ -136,20 +193,7 @@ def should_visit_url_for_context(url: str, context: str) -> tuple[bool, float]:
     }
     
     # Detect context category with BETTER MATCHING
-    detected_context = None
-    
-    # Check for specific keywords in context
-    if any(word in context_lower for word in ["tea", "čaj", "caj", "cajovna"]):
-        detected_context = "tea"
-    elif any(word in context_lower for word in ["interior", "interiér", "priestor", "miestnost"]):
-        detected_context = "interior"
-    elif any(word in context_lower for word in ["food", "jedlo", "menu", "dish"]):
-        detected_context = "food"
-    elif any(word in context_lower for word in ["atmosphere", "atmosfera", "event"]):
-        detected_context = "atmosphere"
-    else:
-        # Default: try to guess from context
-        detected_context = "tea"  # Default for this case
+    detected_context = detect_context_category(context) or "tea"  # Default for this case
     
     patterns = context_patterns.get(detected_context, context_patterns["tea"])
     
@@ -181,12 +225,25 @@ def read_root():
     return {"message": "Hello, FastAPI!"}
 
 
+# Prompt kind and version in the relevance cache key: bump when a prompt changes
+AI_SCORE_PROMPT_SINGLE = "single-v1"
+AI_SCORE_PROMPT_BATCH = "batch-v1"
+
+
 def ai_score_url_relevance(url: str, context: str, page_title: str = "", link_text: str = "") -> float:
     """
     Uses GPT to score URL relevance for given context
+    Scores are cached per (prompt, URL, context category), see relevance_cache
     Returns: relevance score 0.0-1.0
     """
+    context_key = relevance_context_key(context)
+    cached = url_relevance_cache.get(url, context_key, AI_SCORE_PROMPT_SINGLE)
+    if cached is not None:
+        return cached
+    
     try:
+        started = time.time()
+        
         # Prepare URL info for GPT
         path = urlparse(url).path
         
@@ -227,11 +284,11 @@ Return ONLY the number, nothing else."""
         score_text = response.choices[0].message.content.strip()
         
         # Extract number from response
-        import re
         match = re.search(r'(\d+\.?\d*)', score_text)
         if match:
             score = float(match.group(1))
             score = min(max(score, 0.0), 1.0)  # Clamp to 0.0-1.0
+            url_relevance_cache.set(url, context_key, AI_SCORE_PROMPT_SINGLE, score, time.time() - started)
             return score
         else:
             return 0.3  # Default if parsing fails
@@ -241,6 +298,100 @@ Return ONLY the number, nothing else."""
         return 0.3  # Default fallback
 
 
+# Links per GPT call when scoring in batches (keeps prompt and answer small)
+AI_SCORE_BATCH_SIZE = 40
+
+
+def ai_score_urls_batch(links: List[tuple], context: str, page_title: str = "") -> Dict[str, float]:
+    """
+    Uses GPT to score many links of one page at once
+    
+    Same scale as ai_score_url_relevance, but one chat call per
+    AI_SCORE_BATCH_SIZE links instead of one per URL. Cached scores are
+    used first; only the rest goes to GPT.
+    
+    Args:
+        links: [(url, link_text), ...]
+        context: What the images should show
+        page_title: Title of the page the links were found on
+    
+    Returns:
+        {url: relevance score 0.0-1.0}; links GPT didn't score are missing
+    """
+    context_key = relevance_context_key(context)
+    scores = {}
+    unscored = []
+    for url, link_text in links:
+        cached = url_relevance_cache.get(url, context_key, AI_SCORE_PROMPT_BATCH)
+        if cached is not None:
+            scores[url] = cached
+        else:
+            unscored.append((url, link_text))
+    
+    for start in range(0, len(unscored), AI_SCORE_BATCH_SIZE):
+        batch = unscored[start:start + AI_SCORE_BATCH_SIZE]
+        listing = "\n".join(
+            f"{i}. URL: {url} | Path: {urlparse(url).path} | Link Text: {link_text or 'N/A'}"
+            for i, (url, link_text) in enumerate(batch, 1)
+        )
+        
+        prompt = f"""You are analyzing links found on a page to determine which are relevant for the context: "{context}"
+
+Page Title: {page_title or "N/A"}
+
+Links:
+{listing}
+
+For every link, determine how relevant its page is for finding images about "{context}".
+
+Consider:
+- URL path keywords (e.g., /gallery/, /menu/, /interior/, /ponuka/)
+- Slovakian language patterns (e.g., "čaj" = tea, "ponuka" = offer/menu, "miestnosti" = rooms)
+- Page purpose based on path structure
+- Whether this page likely contains relevant images
+
+Score each link between 0.0 and 1.0:
+- 1.0 = Perfect match (e.g., /gallery/ for "interior")
+- 0.8 = Very relevant (e.g., /ponuka/ for "tea")
+- 0.5 = Somewhat relevant
+- 0.2 = Low relevance
+- 0.0 = Not relevant (e.g., /contact/ for any context)
+
+Return ONLY one line per link in the form "<number>: <score>", nothing else."""
+
+        try:
+            started = time.time()
+            response = openai.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": "You are an expert at analyzing URLs for content relevance. Return only numbered decimal scores."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.1,
+                max_tokens=10 * len(batch) + 20
+            )
+            answer = response.choices[0].message.content
+            elapsed = time.time() - started
+        except Exception as e:
+            print(f"⚠️ AI batch scoring failed: {e}")
+            continue
+        
+        for number, score in re.findall(r'(\d+)\s*[:.)=-]\s*(\d+(?:\.\d+)?)', answer):
+            index = int(number) - 1
+            if 0 <= index < len(batch):
+                url = batch[index][0]
+                scores[url] = min(max(float(score), 0.0), 1.0)
+                url_relevance_cache.set(url, context_key, AI_SCORE_PROMPT_BATCH, scores[url], elapsed / len(batch))
+    
+    return scores
+
+
+@app.get("/url-relevance-cache")
+def url_relevance_cache_stats():
+    """Hits and misses of the AI URL relevance cache (all workers) and the GPT time it saved"""
+    return url_relevance_cache.stats()
+
+
 @app.get("/scrape-website-images")
 def scrape_website_images(
     website: str = Query(..., description="Website URL"),
@@ -248,13 +399,39 @@ def scrape_website_images(
     max_images: int = Query(200, description="Maximum images to collect"),
     context: str = Query("interior", description="Context for smart URL filtering"),
     min_images_per_page: int = Query(5, description="Stop if page has enough good images"),
-    use_ai_scoring: bool = Query(True, description="Use AI to score URL relevance")
+    use_ai_scoring: bool = Query(True, description="Use AI to score URL relevance"),
+    batch_ai_scoring: bool = Query(True, description="Score all links of a page in one AI call"),
+    max_per_host: int = Query(DEFAULT_PER_HOST, description="Pages fetched in parallel from one host")
 ):
     """
     TWO-PHASE approach with AI-powered URL scoring:
-    1. Fast scan all pages with AI scoring URLs
+    1. Fast scan all pages with AI scoring URLs (several pages in parallel)
     2. Deep scrape only the best page
     """
+    return scrape_website(
+        website, max_pages, max_images, context, min_images_per_page,
+        use_ai_scoring, batch_ai_scoring, max_per_host
+    )
+
+
+def scrape_website(
+    website: str,
+    max_pages: int = 50,
+    max_images: int = 200,
+    context: str = "interior",
+    min_images_per_page: int = 5,
+    use_ai_scoring: bool = True,
+    batch_ai_scoring: bool = True,
+    max_per_host: int = DEFAULT_PER_HOST,
+    deadline: Optional[Deadline] = None
+):
+    """
+    Two-phase website image scrape behind /scrape-website-images
+
+    Callable from other endpoints (plain defaults). With a deadline, page
+    downloads are capped by the time left and the crawl stops once it
+    expires, so a caller that stopped waiting doesn't leave it running.
+    """
     # Initialize variables
     visited_urls = set()
     skipped_urls = set()
@@ -268,7 +445,12 @@ def scrape_website_images(
         }
         
         initial_url = website.split('#')[0]
-        urls_to_visit = [(website, 1.0, "Main page", "")]  # (url, priority, title, link_text)
+        # (url, priority, title, link_text, ai_score or None if not scored yet)
+        urls_to_visit = [(website, 1.0, "Main page", "", None)]
+        # AI scores of links by normalized URL (a link is scored once per crawl)
+        link_ai_scores = {}
+        # Bodies of the best pages, so phase 2 doesn't download the winner again
+        page_store = PageStore()
         
         base_domain = urlparse(initial_url).netloc
         
@@ -280,12 +462,13 @@ def scrape_website_images(
         def normalize_url(url):
             return url.split('#')[0].rstrip('/')
         
-        def quick_scan_page(url, priority, page_title, link_text):
+        async def quick_scan_page(client, limiter, item):
             """PHASE 1: Quick scan with AI-powered URL scoring"""
+            url, priority, page_title, link_text, ai_score = item
             normalized = normalize_url(url)
             
             if normalized in visited_urls:
-                return [], 0
+                return []
             
             visited_urls.add(normalized)
             
@@ -293,17 +476,29 @@ def scrape_website_images(
                 print(f"\n⚡ Quick scan [{len(visited_urls)}/{max_pages}]: {url}")
                 print(f"   Initial priority: {priority:.2f} | Context: '{context}'")
                 
+                # The page downloads while GPT scores its URL
+                timeout = deadline.timeout(CRAWL_TIMEOUT) if deadline else CRAWL_TIMEOUT
+                download = fetch_page(client, limiter, url, timeout)
+                
+                if ai_score is not None:
+                    # Scored in a batch with the page that linked here, priority is blended already
+                    print(f"   🤖 AI relevance score: {ai_score:.2f} (batch)")
+                    content = await download
                 # AI SCORING: Ask GPT if this URL is relevant
-                if use_ai_scoring:
-                    ai_score = ai_score_url_relevance(url, context, page_title, link_text)
+                elif use_ai_scoring:
+                    ai_score, content = await asyncio.gather(
+                        asyncio.to_thread(ai_score_url_relevance, url, context, page_title, link_text),
+                        download
+                    )
                     print(f"   🤖 AI relevance score: {ai_score:.2f}")
                     
                     # Blend initial priority with AI score (AI has 70% weight)
                     priority = priority * 0.3 + ai_score * 0.7
                     print(f"   📊 Final priority: {priority:.2f} (blended)")
+                else:
+                    content = await download
                 
-                response = requests.get(url, headers=headers, timeout=10)
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = BeautifulSoup(content, 'html.parser')
                 
                 # Get page title for better AI analysis
                 page_title_tag = soup.find('title')
@@ -323,7 +518,6 @@ def scrape_website_images(
                     if any(bad in src for bad in ['logo', 'icon', 'favicon', 'sprite', '1x1']):
                         continue
                     
-                    import re
                     filename = src.split('/')[-1]
                     base_name = re.sub(r'-\d+x\d+\.', '.', filename)
                     base_name = re.sub(r'_(thumb|thumbnail|small|medium)\.', '.', base_name)
@@ -347,6 +541,7 @@ def scrape_website_images(
                 print(f"   🎯 Score: {combined_score:.2f} (context={context_score:.2f} + images={image_score:.2f})")
                 
                 # Store page score
+                page_store.offer(url, combined_score, content)
                 page_scores.append({
                     "url": url,
                     "priority": priority,
@@ -379,32 +574,58 @@ def scrape_website_images(
                                 should_visit, relevance = should_visit_url_for_context(href, context)
                                 
                                 if should_visit:
-                                    page_links.append((href, relevance, page_title, link_text))
+                                    page_links.append((href, relevance, page_title, link_text, None))
                                 else:
                                     skipped_urls.add(normalized_href)
                 
-                return page_links, valid_count
+                if use_ai_scoring and batch_ai_scoring:
+                    page_links = await score_links(page_links, page_title)
+                
+                return page_links
             
             except Exception as e:
                 print(f"❌ Error: {e}")
-                return [], 0
-        
-        # PHASE 1: Quick scan with AI scoring
-        print("\n🔍 PHASE 1: AI-powered page scanning...")
+                return []
         
-        while urls_to_visit and len(visited_urls) < max_pages:
-            # Sort by current priority
-            urls_to_visit.sort(key=lambda x: x[1], reverse=True)
-            current_url, priority, page_title, link_text = urls_to_visit.pop(0)
-            
-            page_links, img_count = quick_scan_page(current_url, priority, page_title, link_text)
+        async def score_links(page_links, page_title):
+            """AI-score a page's new links in one batch and blend them into their priorities"""
+            unscored = {}
+            for href, _, _, link_text, _ in page_links:
+                key = normalize_url(href)
+                if key not in link_ai_scores and key not in unscored:
+                    unscored[key] = (href, link_text)
+            if unscored:
+                print(f"   🤖 AI batch scoring {len(unscored)} links")
+                scores = await asyncio.to_thread(ai_score_urls_batch, list(unscored.values()), context, page_title)
+                for key, (href, _) in unscored.items():
+                    link_ai_scores[key] = scores.get(href)
             
-            # Add new links with metadata
-            for link, relevance, title, text in page_links:
-                normalized_link = normalize_url(link)
-                if not any(normalize_url(u[0]) == normalized_link for u in urls_to_visit):
-                    if normalized_link not in visited_urls:
-                        urls_to_visit.append((link, relevance, title, text))
+            scored_links = []
+            for href, relevance, title, link_text, _ in page_links:
+                link_ai_score = link_ai_scores.get(normalize_url(href))
+                if link_ai_score is None:
+                    # Not scored: the rule-based relevance stands, scored singly on visit
+                    scored_links.append((href, relevance, title, link_text, None))
+                else:
+                    # Blend initial priority with AI score (AI has 70% weight)
+                    scored_links.append((href, relevance * 0.3 + link_ai_score * 0.7, title, link_text, link_ai_score))
+            return scored_links
+        
+        async def scan_pages():
+            # One connection pool for the whole crawl, max_per_host requests per host
+            async with new_crawl_client() as client:
+                limiter = HostLimiter(max_per_host)
+                await crawl(
+                    urls_to_visit,
+                    lambda item: quick_scan_page(client, limiter, item),
+                    max_pages,
+                    normalize_url,
+                    deadline=deadline
+                )
+        
+        # PHASE 1: Quick scan with AI scoring (best URLs first, several at a time)
+        print("\n🔍 PHASE 1: AI-powered page scanning...")
+        asyncio.run(scan_pages())
         
         # Sort pages by combined score
         page_scores.sort(key=lambda x: x["score"], reverse=True)
@@ -442,10 +663,18 @@ def scrape_website_images(
         def deep_scrape_page(url):
             """PHASE 2: Full image extraction with validation"""
             try:
-                print(f"\n📥 Downloading images from: {url}")
-                
-                response = requests.get(url, headers=headers, timeout=15)
-                soup = BeautifulSoup(response.content, 'html.parser')
+                # Reuse the phase-1 download when the page was kept
+                content = page_store.get(url)
+                if content is not None:
+                    print(f"\n📥 Extracting images from: {url} (phase 1 copy)")
+                elif deadline is not None and deadline.expired():
+                    deadline.cut("deep_scrape")
+                    return []
+                else:
+                    print(f"\n📥 Downloading images from: {url}")
+                    timeout = deadline.timeout(15) if deadline else 15
+                    content = requests.get(url, headers=headers, timeout=timeout).content
+                soup = BeautifulSoup(content, 'html.parser')
                 
                 page_images = []
                 
@@ -465,7 +694,6 @@ def scrape_website_images(
                 for elem in soup.find_all(style=True):
                     style = elem.get('style', '')
                     if 'background-image' in style or 'background:' in style:
-                        import re
                         urls = re.findall(r'url\(["\']?([^"\')]+)["\']?\)', style)
                         page_images.extend(urls)
                 
@@ -502,7 +730,6 @@ def scrape_website_images(
                         continue
                     
                     # DEDUPLICATION
-                    import re
                     base_url = img_url
                     base_url = re.sub(r'-\d+x\d+\.(jpg|jpeg|png|webp|gif)', r'.\1', base_url, flags=re.IGNORECASE)
                     base_url = re.sub(r'_(thumb|thumbnail|small|medium|large)\.(jpg|jpeg|png|webp|gif)', r'.\2', base_url, flags=re.IGNORECASE)
@@ -544,8 +771,10 @@ def scrape_website_images(
             },
             "phase_2": {
                 "best_page": best_page,
-                "images_downloaded": len(final_images)
+                "images_downloaded": len(final_images),
+                "reused_phase_1_fetch": page_store.get(best_page["url"]) is not None
             },
+            "ai_score_cache": url_relevance_cache.stats(),
             "total_images": len(final_images),
             "images": final_images,
             "best_page_url": best_page["url"]
@@ -588,7 +817,6 @@ def scrape_website_images_with_js(
         visited_urls = set()
         skipped_urls = set()
         images_found = set()
-        urls_to_visit = [(website, 1.0)]
         base_domain = urlparse(website.split('#')[0]).netloc
         
         best_page = {"url": None, "images": 0, "priority": 0}
@@ -596,6 +824,9 @@ def scrape_website_images_with_js(
         def normalize_url(url):
             return url.split('#')[0].rstrip('/')
         
+        urls_to_visit = CrawlFrontier(normalize_url)
+        urls_to_visit.push(website, 1.0)
+        
         def scrape_with_selenium(url, priority):
             normalized = normalize_url(url)
             
@@ -700,9 +931,7 @@ def scrape_website_images_with_js(
         early_stop = False
         
         while urls_to_visit and len(visited_urls) < max_pages and not early_stop:
-            urls_to_visit.sort(key=lambda x: x[1], reverse=True)
-            
-            current_url, priority = urls_to_visit.pop(0)
+            current_url, priority = urls_to_visit.pop()
             
             page_images, page_links, quality_score = scrape_with_selenium(current_url, priority)
             
@@ -716,10 +945,7 @@ def scrape_website_images_with_js(
             
             if not early_stop:
                 for link, relevance in page_links:
-                    normalized_link = normalize_url(link)
-                    if not any(normalize_url(u[0]) == normalized_link for u in urls_to_visit):
-                        if normalized_link not in visited_urls:
-                            urls_to_visit.append((link, relevance))
+                    urls_to_visit.push(link, relevance)
         
         driver.quit()
         
@@ -771,7 +997,7 @@ def filter_images_by_ai(
             min_images_per_page=min_images_per_page  # ← ADD THIS
         )
     else:
-        scrape_result = scrape_website_images(
+        scrape_result = scrape_website(
             website=website,
             max_pages=max_pages,
             max_images=max_images,
@@ -928,7 +1154,6 @@ Return ONLY JSON with scores for ALL {len(images_to_rate)} images."""
             print(f"📝 Raw response:\n{response_text}")
             
             # Fallback: try to extract numbers manually
-            import re
             ratings = {}
             matches = re.findall(r'"(\d+)":\s*([\d.]+)', response_text)
             for idx, score in matches:
@@ -1433,38 +1658,78 @@ Only return valid JSON, nothing else."""
 def search_places(
     place_type: str = Query(..., description="Type of place (restaurant, cafe, museum, etc.)"),
     location: str = Query(..., description="City or address"),
-    radius: int = Query(1000, description="Search radius in meters")
+    radius: int = Query(1000, description="Search radius in meters"),
+    deadline_ms: Optional[int] = Query(None, description="Time budget; partial results are returned when it runs out")
 ):
     """
     Search for places using both Google Places API and Overpass API (OpenStreetMap)
     """
+    deadline = Deadline(deadline_ms)
     try:
         # Read API keys
         with open("api_google.txt", "r") as f:
             google_api_key = f.read().strip()
         
-        # 1. Geocode location
-        geocode_url = f"https://nominatim.openstreetmap.org/search?format=json&q={location}&limit=1"
-        geocode_response = requests.get(geocode_url, headers={"User-Agent": "PlaceSearchApp/1.0"})
-        geocode_data = geocode_response.json()
+        # 1. Geocode location (cached)
+        geocoded = geocoding_service.geocode(location, timeout=deadline.timeout(GEOCODE_TIMEOUT))
         
-        if not geocode_data:
+        if not geocoded:
+            if deadline.expired():
+                deadline.cut("geocoding")
+                return {"status": "error", "message": "Geocoding ran out of time", **deadline.report()}
             return {"status": "error", "message": f"Location '{location}' not found"}
         
-        lat = float(geocode_data[0]["lat"])
-        lon = float(geocode_data[0]["lon"])
-        
-        # 2. Search using Google Places API
-        google_places = search_google_places(lat, lon, place_type, radius, google_api_key)
+        lat = geocoded["lat"]
+        lon = geocoded["lon"]
         
-        # 3. Search using Overpass API (OpenStreetMap)
-        osm_places = search_overpass_api(lat, lon, place_type, radius)
+        # 2. Answer from an earlier search whose circle contains this one
+        place_type = normalize_place_type(place_type, get_place_types())
+        cached = query_cache.get("search-places", place_type, lat, lon, radius, SEARCH_PLACES_LIMIT)
+        if cached is not None:
+            google_results = cached["google_places"]
+            osm_results = cached["osm_places"]
+        else:
+            cuts_before = len(deadline.truncated)
+            # A failed provider must not be cached as "nothing there"
+            failed = False
+            
+            # 3. Search using Google Places API
+            try:
+                google_places = search_google_places(
+                    lat, lon, place_type, radius, google_api_key, SEARCH_PLACES_LIMIT, deadline=deadline,
+                    raise_errors=True
+                )
+            except Exception:
+                google_places, failed = [], True
+            
+            # 4. Search using Overpass API (OpenStreetMap)
+            try:
+                osm_places = search_overpass_api(
+                    lat, lon, place_type, radius, deadline, SEARCH_PLACES_LIMIT, raise_errors=True
+                )
+            except Exception:
+                osm_places, failed = [], True
+            
+            # Records are serialized only here
+            google_results = [place.to_dict() for place in google_places]
+            osm_results = [place.to_dict() for place in osm_places]
+            query_cache.set(
+                "search-places", place_type, lat, lon, radius,
+                {"google_places": google_results, "osm_places": osm_results},
+                complete=(
+                    not failed
+                    and len(google_results) < SEARCH_PLACES_LIMIT
+                    and len(osm_results) < SEARCH_PLACES_LIMIT
+                    and len(deadline.truncated) == cuts_before
+                ),
+                limit=SEARCH_PLACES_LIMIT
+            )
         
-        # 4. Combine results
+        # 5. Combine results
         all_places = {
             "status": "success",
             "location": {
-                "name": geocode_data[0]["display_name"],
+                "name": geocoded["display_name"],
                 "lat": lat,
                 "lon": lon
             },
@@ -1472,13 +1737,15 @@ def search_places(
                 "place_type": place_type,
                 "radius": radius
             },
-            "google_places": google_places,
-            "osm_places": osm_places,
+            "google_places": google_results,
+            "osm_places": osm_results,
             "total_results": {
-                "google": len(google_places),
-                "osm": len(osm_places),
-                "combined": len(google_places) + len(osm_places)
-            }
+                "google": len(google_results),
+                "osm": len(osm_results),
+                "combined": len(google_results) + len(osm_results)
+            },
+            "cached": cached is not None,
+            **deadline.report()
         }
         
         return all_places
@@ -1490,183 +1757,111 @@ def search_places(
         }
 
 
-def search_google_places(lat: float, lon: float, place_type: str, radius: int, api_key: str):
-    """Search places using Google Places API with ALL available data"""
-    url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-    params = {
-        "location": f"{lat},{lon}",
-        "radius": radius,
-        "type": place_type,
-        "key": api_key
-    }
+def search_google_places(
+    lat: float,
+    lon: float,
+    place_type: str,
+    radius: int,
+    api_key: str,
+    limit: int = 10,
+    deadline: Optional[Deadline] = None,
+    raise_errors: bool = False
+):
+    """Search places using Google Places API with ALL available data (raise_errors: raise instead of returning [])"""
+    deadline = deadline or Deadline()
+    if deadline.expired():
+        deadline.cut("google")
+        return []
     
     try:
-        response = requests.get(url, params=params, timeout=30)
-        data = response.json()
+        # Later result pages are only fetched if limit needs them
+        results = list(islice(
+            iter_nearby_results(lat, lon, radius, place_type, api_key, deadline=deadline, raise_errors=raise_errors),
+            limit
+        ))
         
-        if data.get("status") not in ["OK", "ZERO_RESULTS"]:
-            print(f"⚠️ Google API status: {data.get('status')}")
-            return []
+        # Get detailed information: concurrent + cached by place_id
+        # (places whose details miss the deadline keep their basic info)
+        place_ids = [place.get("place_id") for place in results if place.get("place_id")]
+        details_by_id = fetch_place_details_many(place_ids, api_key, deadline)
         
         places = []
-        for place in data.get("results", [])[:10]:
+        for place in results:
             place_id = place.get("place_id")
+            details = details_by_id.get(place_id, {})
             
-            # Get detailed information
-            details = {}
-            if place_id:
-                detail_url = "https://maps.googleapis.com/maps/api/place/details/json"
-                detail_params = {
-                    "place_id": place_id,
-                    "fields": "name,formatted_address,formatted_phone_number,international_phone_number,website,opening_hours,price_level,rating,user_ratings_total,reviews,types,geometry,photos,business_status,url",
-                    "key": api_key
-                }
-                try:
-                    detail_response = requests.get(detail_url, params=detail_params, timeout=10)
-                    if detail_response.status_code == 200:
-                        details = detail_response.json().get("result", {})
-                except:
-                    pass
-            
-            place_info = {
-                "source": "Google Places",
-                "place_id": place_id,
-                "name": place.get("name", "Unknown"),
-                "coordinates": {
-                    "lat": place["geometry"]["location"]["lat"],
-                    "lon": place["geometry"]["location"]["lng"]
-                },
-                "address": details.get("formatted_address", place.get("vicinity", "N/A")),
-                "rating": place.get("rating", "N/A"),
-                "user_ratings_total": place.get("user_ratings_total", 0),
-                "price_level": place.get("price_level", "N/A"),
-                "types": place.get("types", []),
-                "business_status": place.get("business_status", "N/A"),
-                "phone": details.get("formatted_phone_number", "N/A"),
-                "international_phone": details.get("international_phone_number", "N/A"),
-                "website": details.get("website", "N/A"),
-                "url": details.get("url", "N/A"),
-                "opening_hours": details.get("opening_hours", {}).get("weekday_text", []),
-                "photos": details.get("photos", []),
-                "reviews": [
-                    {
-                        "author": r.get("author_name"),
-                        "rating": r.get("rating"),
-                        "text": r.get("text", "")[:200],
-                        "time": r.get("relative_time_description")
-                    }
-                    for r in details.get("reviews", [])[:3]
-                ]
-            }
-            places.append(place_info)
+            places.append(Place.from_google(place, details))
         
         return places
         
     except Exception as e:
         print(f"❌ Google Places API error: {e}")
+        if raise_errors:
+            raise
         return []
 
 
-def search_overpass_api(lat: float, lon: float, place_type: str, radius: int):
-    """Search places using Overpass API with ALL available OSM data"""
-    
-    type_mapping = {
-        "restaurant": "restaurant",
-        "cafe": "cafe",
-        "bar": "bar",
-        "pub": "pub",
-        "fast_food": "fast_food",
-        "museum": "museum",
-        "gallery": "gallery",
-        "cinema": "cinema",
-        "theatre": "theatre",
-        "nightclub": "nightclub",
-        "park": "park",
-        "hotel": "hotel",
-        "shop": "shop",
-        "gym": "gym",
-        "library": "library"
-    }
+def search_overpass_multi(
+    lat: float,
+    lon: float,
+    osm_tags: List[str],
+    radius: int,
+    limit_per_tag: int = 10,
+    deadline: Optional[Deadline] = None,
+    raise_errors: bool = False
+) -> Dict[str, List[Place]]:
+    """
+    Search several OSM tags (amenity, tourism, historic, leisure, shop) at once
     
-    amenity = type_mapping.get(place_type.lower(), place_type)
+    All tags are compiled into one Overpass union query and the results are
+    split back per tag on our side. With raise_errors, Overpass failures
+    raise instead of returning empty lists (deadline cuts never raise).
     
-    url = "https://overpass-api.de/api/interpreter"
-    query = f"""
-    [out:json][timeout:25];
-    (
-      node(around:{radius},{lat},{lon})["amenity"="{amenity}"];
-      way(around:{radius},{lat},{lon})["amenity"="{amenity}"];
-    );
-    out body;
-    >;
-    out skel qt;
+    Returns:
+        {"key=value": [places...]} for every requested tag
     """
+    deadline = deadline or Deadline()
+    osm_tags = normalize_tags(osm_tags)
+    if not osm_tags:
+        return {}
+    if deadline.expired():
+        deadline.cut("osm")
+        return {tag: [] for tag in osm_tags}
     
     try:
-        response = requests.post(url, data=query, timeout=30)
-        
-        if response.status_code != 200:
-            print(f"⚠️ Overpass API status: {response.status_code}")
-            return []
-        
-        data = response.json()
-        places = []
-        
-        for element in data.get("elements", [])[:10]:
-            if element.get("type") not in ["node", "way"]:
-                continue
-                
-            tags = element.get("tags", {})
-            
-            if element.get("type") == "node":
-                element_lat = element.get("lat")
-                element_lon = element.get("lon")
-            else:
-                element_lat = tags.get("lat") or element.get("lat")
-                element_lon = tags.get("lon") or element.get("lon")
-            
-            if not element_lat or not element_lon:
-                continue
-            
-            place_info = {
-                "source": "OpenStreetMap",
-                "osm_id": element.get("id"),
-                "osm_type": element.get("type"),
-                "name": tags.get("name", "Unknown"),
-                "coordinates": {
-                    "lat": element_lat,
-                    "lon": element_lon
-                },
-                "amenity": tags.get("amenity", "N/A"),
-                "cuisine": tags.get("cuisine", "N/A"),
-                "address": f"{tags.get('addr:street', '')} {tags.get('addr:housenumber', '')}".strip() or "N/A",
-                "city": tags.get("addr:city", "N/A"),
-                "postcode": tags.get("addr:postcode", "N/A"),
-                "phone": tags.get("phone") or tags.get("contact:phone", "N/A"),
-                "website": tags.get("website") or tags.get("contact:website", "N/A"),
-                "email": tags.get("email") or tags.get("contact:email", "N/A"),
-                "opening_hours": tags.get("opening_hours", "N/A"),
-                "wheelchair": tags.get("wheelchair", "N/A"),
-                "outdoor_seating": tags.get("outdoor_seating", "N/A"),
-                "delivery": tags.get("delivery", "N/A"),
-                "takeaway": tags.get("takeaway", "N/A"),
-                "smoking": tags.get("smoking", "N/A"),
-                "internet_access": tags.get("internet_access", "N/A"),
-                "wifi": tags.get("internet_access:fee", "N/A"),
-                "rating": "N/A",
-                "description": tags.get("description", "N/A"),
-                "brand": tags.get("brand", "N/A"),
-                "operator": tags.get("operator", "N/A"),
-                "capacity": tags.get("capacity", "N/A"),
-                "all_tags": tags
-            }
-            places.append(place_info)
+        # Served from the geo-tile cache, only missing tiles hit Overpass
+        places_by_tag = overpass_tile_cache.query_many(
+            lat, lon, radius, osm_tags, limit_per_tag, timeout=deadline.remaining(), raise_errors=raise_errors
+        )
         
-        return places
+        # Cached records are shared, label copies with the category
+        return {
+            tag: [place.with_category(tag) for place in places[:limit_per_tag]]
+            for tag, places in places_by_tag.items()
+        }
         
+    except asyncio.TimeoutError:
+        deadline.cut("osm")
+        return {tag: [] for tag in osm_tags}
     except Exception as e:
         print(f"❌ Overpass API error: {e}")
-        return []
+        if raise_errors:
+            raise
+        return {tag: [] for tag in osm_tags}
+
+
+def search_overpass_api(
+    lat: float,
+    lon: float,
+    place_type: str,
+    radius: int,
+    deadline: Optional[Deadline] = None,
+    limit: int = 10,
+    raise_errors: bool = False
+):
+    """Search places using Overpass API with ALL available OSM data"""
+    tag = place_type_to_tag(place_type)
+    return search_overpass_multi(lat, lon, [tag], radius, limit, deadline, raise_errors).get(tag, [])
 
 @app.get("/search-places-with-images")
 def search_places_with_images(
@@ -1675,11 +1870,13 @@ def search_places_with_images(
     lon: float = Query(21.2611, description="Longitude"),
     radius: int = Query(500, description="Search radius in meters"),
     limit: int = Query(5, description="Max number of places"),
-    images_per_place: int = Query(3, description="Max images per place")
+    images_per_place: int = Query(3, description="Max images per place"),
+    deadline_ms: Optional[int] = Query(None, description="Time budget; partial results are returned when it runs out")
 ):
     """
     🎯 MAIN ENDPOINT: AI extracts place types → Search with Google & OSM → Get images
     """
+    deadline = Deadline(deadline_ms)
     try:
         print(f"\n{'='*60}")
         print(f"🔍 SMART SEARCH WITH IMAGES")
@@ -1698,34 +1895,42 @@ def search_places_with_images(
         # STEP 1: Extract place types from user request with AI
         print(f"\n📝 STEP 1: Extracting place types with AI...")
         
-        parse_response = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": """Extract place types from user request.
+        try:
+            parse_response = openai.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {
+                        "role": "system", 
+                        "content": """Extract place types from user request.
 
 Output JSON:
 {
   "place_types": ["array of specific place types mentioned (e.g., restaurant, cafe, museum, park, hotel)"],
+  "osm_tags": ["OpenStreetMap tags in key=value format for these places (keys: amenity, tourism, historic, leisure, shop)"],
   "location": "city or area mentioned or null"
 }
 
 Examples:
-- "Find me a restaurant in Berlin" -> {"place_types": ["restaurant"], "location": "Berlin"}
-- "I want to visit museums and cafes" -> {"place_types": ["museum", "cafe"], "location": null}
-- "Show me parks" -> {"place_types": ["park"], "location": null}
+- "Find me a restaurant in Berlin" -> {"place_types": ["restaurant"], "osm_tags": ["amenity=restaurant"], "location": "Berlin"}
+- "I want to visit museums and cafes" -> {"place_types": ["museum", "cafe"], "osm_tags": ["tourism=museum", "amenity=cafe"], "location": null}
+- "Show me old castles and parks" -> {"place_types": ["castle", "park"], "osm_tags": ["historic=castle", "leisure=park"], "location": null}
 
 Only return valid JSON, nothing else."""
-                },
-                {"role": "user", "content": request}
-            ],
-            temperature=0.3,
-            max_tokens=200
-        )
-        
-        gpt_response = parse_response.choices[0].message.content.strip()
-        parsed_data = json.loads(gpt_response)
+                    },
+                    {"role": "user", "content": request}
+                ],
+                temperature=0.3,
+                max_tokens=300,
+                timeout=deadline.timeout(GPT_TIMEOUT)
+            )
+            gpt_response = parse_response.choices[0].message.content.strip()
+            parsed_data = json.loads(gpt_response)
+        except (openai.APITimeoutError, openai.APIConnectionError):
+            if not deadline.expired():
+                raise
+            # Out of time: search the default type rather than return nothing
+            deadline.cut("gpt_parse")
+            parsed_data = {"place_types": ["restaurant"], "osm_tags": []}
         
         place_types = parsed_data.get("place_types", ["restaurant"])
         cuisine = parsed_data.get("cuisine")
@@ -1740,32 +1945,43 @@ Only return valid JSON, nothing else."""
         
         all_places = []
         
-        # Try each place type
-        for place_type in place_types[:2]:  # Max 2 types to save time
-            print(f"\n   🔍 Searching for: {place_type}")
-            
-            # 2a. Google Places API
-            if google_api_key:
-                print(f"      🌐 Google Places API...")
-                google_places = search_google_places(lat, lon, place_type, radius, google_api_key)
-                print(f"      ✅ Google: Found {len(google_places)} places")
-                all_places.extend(google_places)
-            
-            # 2b. Overpass API (OSM)
-            print(f"      🗺️ OpenStreetMap API...")
-            osm_places = search_overpass_api(lat, lon, place_type, radius)
-            print(f"      ✅ OSM: Found {len(osm_places)} places")
+        # 2a. Google Places API: one nearby search per type, run in the
+        # background while OSM is searched (extra types are left to OSM)
+        google_searches = {}
+        if google_api_key:
+            if len(place_types) > MAX_GOOGLE_PLACE_TYPES:
+                print(f"   ⚠️ Google: searching only {place_types[:MAX_GOOGLE_PLACE_TYPES]}")
+            for place_type in place_types[:MAX_GOOGLE_PLACE_TYPES]:
+                print(f"\n   🌐 Google Places API: {place_type}...")
+                google_searches[place_type] = _google_pool.submit(
+                    search_google_places, lat, lon, place_type, radius, google_api_key, max(limit, 10), deadline
+                )
+        
+        # 2b. Overpass API (OSM): every type and tag in ONE union query
+        osm_tags = normalize_tags(
+            [place_type_to_tag(place_type) for place_type in place_types] + parsed_data.get("osm_tags", [])
+        )
+        print(f"\n   🗺️ OpenStreetMap API: {osm_tags}...")
+        osm_results = search_overpass_multi(lat, lon, osm_tags, radius, deadline=deadline)
+        for tag, osm_places in osm_results.items():
+            print(f"      ✅ OSM {tag}: Found {len(osm_places)} places")
             all_places.extend(osm_places)
         
-        # Remove duplicates by name
-        unique_places = []
-        seen_names = set()
+        for place_type, google_search in google_searches.items():
+            try:
+                google_places = google_search.result(timeout=deadline.remaining())
+            except FutureTimeoutError:
+                # Still running past the deadline: go on without it
+                deadline.cut("google")
+                continue
+            print(f"      ✅ Google {place_type}: Found {len(google_places)} places")
+            all_places.extend(google_places)
         
-        for place in all_places:
-            name_lower = place["name"].lower().strip()
-            if name_lower not in seen_names and name_lower != "unknown":
-                seen_names.add(name_lower)
-                unique_places.append(place)
+        # Merge duplicates across providers (same name + nearby), drop unnamed
+        unique_places = [
+            place for place in resolve_entities(all_places)
+            if (place.name or "").lower().strip() not in ("", "unknown")
+        ]
         
         print(f"\n   ✅ Total: {len(unique_places)} unique places (from {len(all_places)} raw results)")
         
@@ -1774,27 +1990,22 @@ Only return valid JSON, nothing else."""
                 "status": "error",
                 "message": "No places found",
                 "parsed_context": parsed_data,
-                "suggestions": ["Try increasing radius", "Try different search terms"]
+                "suggestions": ["Try increasing radius", "Try different search terms"],
+                **deadline.report()
             }
         
-        # Sort by rating (safe conversion)
+        # Numeric rating for logging (NaN = unrated)
         def safe_get_rating(place):
-            rating = place.get("rating", "N/A")
-            if rating == "N/A" or rating is None:
-                return 0.0
-            try:
-                return float(rating)
-            except:
-                return 0.0
+            return 0.0 if math.isnan(place.rating) else place.rating
         
-        unique_places.sort(key=safe_get_rating, reverse=True)
-        unique_places = unique_places[:limit]
+        # Rank by distance, rating, reviews and category (vectorized, top-k only)
+        unique_places = rank_places(unique_places, lat, lon, radius, limit, place_types + osm_tags)
         
         # Show top 3
-        print(f"\n   📊 Top places by rating:")
+        print(f"\n   📊 Top places:")
         for i, place in enumerate(unique_places[:3]):
             rating = safe_get_rating(place)
-            print(f"      {i+1}. {place['name']} - ⭐ {rating:.1f} ({place.get('source')})")
+            print(f"      {i+1}. {place.name} - ⭐ {rating:.1f} ({place.source})")
         
         # STEP 3: Get images for each place
         print(f"\n🖼️ STEP 3: Getting images for {len(unique_places)} places...")
@@ -1802,28 +2013,41 @@ Only return valid JSON, nothing else."""
         results = []
         
         for i, place in enumerate(unique_places):
-            print(f"\n   [{i+1}/{len(unique_places)}] {place['name']}")
+            print(f"\n   [{i+1}/{len(unique_places)}] {place.name}")
             
             place_result = {
-                "place_info": place,
+                "place_info": place.to_dict(),
                 "images": [],
                 "image_search_method": "none"
             }
             
             # Strategy 1: Scrape from website
             website = place.get("website")
-            if website and website != "N/A" and website.startswith("http"):
+            if website and website != "N/A" and website.startswith("http") and deadline.expired():
+                deadline.cut("scraping")
+            elif website and website != "N/A" and website.startswith("http"):
                 print(f"      🌐 Website: {website}")
                 
                 try:
-                    scrape_result = scrape_website_images(
+                    # The scrape gets the time we'll wait for it and stops
+                    # by itself when it's up, instead of running on unseen
+                    scrape_wait = deadline.timeout(SCRAPE_TIMEOUT)
+                    scrape_future = _scrape_pool.submit(
+                        scrape_website,
                         website=website,
                         max_pages=3,
                         max_images=15,
                         context=search_context,
                         min_images_per_page=2,
-                        use_ai_scoring=False
+                        use_ai_scoring=False,
+                        deadline=Deadline(scrape_wait * 1000)
                     )
+                    try:
+                        scrape_result = scrape_future.result(timeout=scrape_wait)
+                    except FutureTimeoutError:
+                        # Keep going with Google Photos / placeholder for this place
+                        deadline.cut("scraping")
+                        scrape_result = {}
                     
                     if scrape_result.get("status") == "success":
                         images = scrape_result.get("images", [])
@@ -1840,7 +2064,7 @@ Only return valid JSON, nothing else."""
                     print(f"      ⚠️ Scraping failed: {e}")
             
             # Strategy 2: Use Google Photos (if available from Google Places)
-            if not place_result["images"] and place.get("source") == "Google Places":
+            if not place_result["images"] and place.source == "Google Places":
                 photos = place.get("photos", [])
                 if photos and google_api_key:
                     print(f"      📸 Using Google Photos API...")
@@ -1861,7 +2085,7 @@ Only return valid JSON, nothing else."""
             # Fallback: Placeholder
             if not place_result["images"]:
                 place_result["images"] = [{
-                    "url": f"https://via.placeholder.com/400x300?text={place['name'].replace(' ', '+')}",
+                    "url": f"https://via.placeholder.com/400x300?text={place.name.replace(' ', '+')}",
                     "confidence": 0.1,
                     "source": "placeholder"
                 }]
@@ -1883,7 +2107,8 @@ Only return valid JSON, nothing else."""
             "total_places": len(results),
             "places": results,
             "api_sources": ["Google Places API", "OpenStreetMap (Overpass)"],
-            "image_sources": ["Website scraping", "Google Photos", "Placeholder"]
+            "image_sources": ["Website scraping", "Google Photos", "Placeholder"],
+            **deadline.report()
         }
     
     except json.JSONDecodeError as e:
@@ -1902,181 +2127,57 @@ Only return valid JSON, nothing else."""
         }
 
 
-def search_google_places(lat: float, lon: float, place_type: str, radius: int, api_key: str):
-    """Search places using Google Places API with ALL available data"""
-    url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-    params = {
-        "location": f"{lat},{lon}",
-        "radius": radius,
-        "type": place_type,
-        "key": api_key
-    }
-    
+@app.get("/search-route-places")
+def search_route_places(
+    place_type: str = Query("restaurant", description="Place types or key=value OSM tags, comma-separated"),
+    polyline: Optional[str] = Query(None, description="Google encoded polyline of the route"),
+    waypoints: Optional[str] = Query(None, description="Route as lat,lon;lat,lon;..."),
+    buffer: int = Query(150, description="Max distance from the route in meters"),
+    limit: int = Query(50, description="Max number of places")
+):
+    """
+    Search places along a route (one corridor query instead of one per waypoint)
+    """
     try:
-        response = requests.get(url, params=params, timeout=30)
-        data = response.json()
-        
-        if data.get("status") not in ["OK", "ZERO_RESULTS"]:
-            print(f"⚠️ Google API status: {data.get('status')}")
-            return []
-        
-        places = []
-        for place in data.get("results", [])[:10]:
-            place_id = place.get("place_id")
-            
-            # Get detailed information
-            details = {}
-            if place_id:
-                detail_url = "https://maps.googleapis.com/maps/api/place/details/json"
-                detail_params = {
-                    "place_id": place_id,
-                    "fields": "name,formatted_address,formatted_phone_number,international_phone_number,website,opening_hours,price_level,rating,user_ratings_total,reviews,types,geometry,photos,business_status,url",
-                    "key": api_key
-                }
-                try:
-                    detail_response = requests.get(detail_url, params=detail_params, timeout=10)
-                    if detail_response.status_code == 200:
-                        details = detail_response.json().get("result", {})
-                except:
-                    pass
-            
-            place_info = {
-                "source": "Google Places",
-                "place_id": place_id,
-                "name": place.get("name", "Unknown"),
-                "coordinates": {
-                    "lat": place["geometry"]["location"]["lat"],
-                    "lon": place["geometry"]["location"]["lng"]
-                },
-                "address": details.get("formatted_address", place.get("vicinity", "N/A")),
-                "rating": place.get("rating", "N/A"),
-                "user_ratings_total": place.get("user_ratings_total", 0),
-                "price_level": place.get("price_level", "N/A"),
-                "types": place.get("types", []),
-                "business_status": place.get("business_status", "N/A"),
-                "phone": details.get("formatted_phone_number", "N/A"),
-                "international_phone": details.get("international_phone_number", "N/A"),
-                "website": details.get("website", "N/A"),
-                "url": details.get("url", "N/A"),
-                "opening_hours": details.get("opening_hours", {}).get("weekday_text", []),
-                "photos": details.get("photos", []),
-                "reviews": [
-                    {
-                        "author": r.get("author_name"),
-                        "rating": r.get("rating"),
-                        "text": r.get("text", "")[:200],
-                        "time": r.get("relative_time_description")
-                    }
-                    for r in details.get("reviews", [])[:3]
-                ]
-            }
-            places.append(place_info)
+        if polyline:
+            points = decode_polyline(polyline)
+        elif waypoints:
+            points = parse_waypoints(waypoints)
+        else:
+            return {"status": "error", "message": "Provide either polyline or waypoints"}
         
-        return places
+        if not points:
+            return {"status": "error", "message": "Route has no points"}
         
-    except Exception as e:
-        print(f"❌ Google Places API error: {e}")
-        return []
-
-
-def search_overpass_api(lat: float, lon: float, place_type: str, radius: int):
-    """Search places using Overpass API with ALL available OSM data"""
-    
-    type_mapping = {
-        "restaurant": "restaurant",
-        "cafe": "cafe",
-        "bar": "bar",
-        "pub": "pub",
-        "fast_food": "fast_food",
-        "museum": "museum",
-        "gallery": "gallery",
-        "cinema": "cinema",
-        "theatre": "theatre",
-        "nightclub": "nightclub",
-        "park": "park",
-        "hotel": "hotel",
-        "shop": "shop",
-        "gym": "gym",
-        "library": "library"
-    }
-    
-    amenity = type_mapping.get(place_type.lower(), place_type)
-    
-    url = "https://overpass-api.de/api/interpreter"
-    query = f"""
-    [out:json][timeout:25];
-    (
-      node(around:{radius},{lat},{lon})["amenity"="{amenity}"];
-      way(around:{radius},{lat},{lon})["amenity"="{amenity}"];
-    );
-    out body;
-    >;
-    out skel qt;
-    """
-    
-    try:
-        response = requests.post(url, data=query, timeout=30)
+        place_types = [t.strip() for t in place_type.split(",") if t.strip()]
+        osm_tags = normalize_tags([t if "=" in t else place_type_to_tag(t) for t in place_types])
         
-        if response.status_code != 200:
-            print(f"⚠️ Overpass API status: {response.status_code}")
-            return []
+        try:
+            located = search_along_route(points, buffer, osm_tags, limit)
+        except Exception as e:
+            # Don't report a failed Overpass query as "no places on this route"
+            return {"status": "error", "message": f"Place search failed: {e}", "osm_tags": osm_tags}
         
-        data = response.json()
         places = []
-        
-        for element in data.get("elements", [])[:10]:
-            if element.get("type") not in ["node", "way"]:
-                continue
-                
-            tags = element.get("tags", {})
-            
-            if element.get("type") == "node":
-                element_lat = element.get("lat")
-                element_lon = element.get("lon")
-            else:
-                element_lat = tags.get("lat") or element.get("lat")
-                element_lon = tags.get("lon") or element.get("lon")
-            
-            if not element_lat or not element_lon:
-                continue
-            
-            place_info = {
-                "source": "OpenStreetMap",
-                "osm_id": element.get("id"),
-                "osm_type": element.get("type"),
-                "name": tags.get("name", "Unknown"),
-                "coordinates": {
-                    "lat": element_lat,
-                    "lon": element_lon
-                },
-                "amenity": tags.get("amenity", "N/A"),
-                "cuisine": tags.get("cuisine", "N/A"),
-                "address": f"{tags.get('addr:street', '')} {tags.get('addr:housenumber', '')}".strip() or "N/A",
-                "city": tags.get("addr:city", "N/A"),
-                "postcode": tags.get("addr:postcode", "N/A"),
-                "phone": tags.get("phone") or tags.get("contact:phone", "N/A"),
-                "website": tags.get("website") or tags.get("contact:website", "N/A"),
-                "email": tags.get("email") or tags.get("contact:email", "N/A"),
-                "opening_hours": tags.get("opening_hours", "N/A"),
-                "wheelchair": tags.get("wheelchair", "N/A"),
-                "outdoor_seating": tags.get("outdoor_seating", "N/A"),
-                "delivery": tags.get("delivery", "N/A"),
-                "takeaway": tags.get("takeaway", "N/A"),
-                "smoking": tags.get("smoking", "N/A"),
-                "internet_access": tags.get("internet_access", "N/A"),
-                "wifi": tags.get("internet_access:fee", "N/A"),
-                "rating": "N/A",
-                "description": tags.get("description", "N/A"),
-                "brand": tags.get("brand", "N/A"),
-                "operator": tags.get("operator", "N/A"),
-                "capacity": tags.get("capacity", "N/A"),
-                "all_tags": tags
-            }
+        for place, along, offset in located:
+            place_info = place.to_dict()
+            place_info["distance_along_route_m"] = round(along)
+            place_info["distance_from_route_m"] = round(offset)
             places.append(place_info)
         
-        return places
-        
+        return {
+            "status": "success",
+            "route": {
+                "points": len(points),
+                "length_m": round(route_length_m(points)),
+                "buffer_m": buffer
+            },
+            "osm_tags": osm_tags,
+            "total_places": len(places),
+            "places": places
+        }
+    
+    except ValueError as e:
+        return {"status": "error", "message": f"Invalid route: {e}"}
     except Exception as e:
-        print(f"❌ Overpass API error: {e}")
-        return []
-
+        return {"status": "error", "message": str(e)}
@@ -0,0 +1,229 @@
+import json
+import math
+import os
+import threading
+import time
+from array import array
+from typing import List, Dict, Optional, Tuple
+from geo import EARTH_RADIUS_M
+from place_record import Place
+
+# OSM keys we search on (see overpass tag filters)
+INDEXED_KEYS = ("amenity", "tourism", "historic", "leisure", "shop")
+
+# Set to a regional extract (.json Overpass dump or .osm.pbf) to answer
+# Overpass queries locally instead of over the network
+OSM_EXTRACT_PATH = os.getenv("OSM_EXTRACT_PATH")
+
+
+def _unit_vector(lat: float, lon: float) -> Tuple[float, float, float]:
+    """Point on the unit sphere, chord distance grows with great-circle distance"""
+    phi, lmb = math.radians(lat), math.radians(lon)
+    return math.cos(phi) * math.cos(lmb), math.cos(phi) * math.sin(lmb), math.sin(phi)
+
+
+# ============================================================
+# 1. STATIC KD-TREE
+# ============================================================
+class KDTree:
+    """
+    Implicit 3D KD-tree over unit-sphere coordinates
+
+    Points live in flat arrays, ordered so that the median of every
+    [lo, hi) range is that subtree's split point; no node objects needed.
+    """
+
+    def __init__(self, points: List[Tuple[float, float, float]]):
+        order = list(range(len(points)))
+        self._build(order, points, 0, len(order), 0)
+        self.ids = array("l", order)
+        self.coords = [array("d", (points[i][axis] for i in order)) for axis in range(3)]
+
+    @classmethod
+    def _build(cls, order: List[int], points, lo: int, hi: int, depth: int):
+        stack = [(lo, hi, depth)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= 1:
+                continue
+            axis = depth % 3
+            order[lo:hi] = sorted(order[lo:hi], key=lambda i: points[i][axis])
+            mid = (lo + hi) // 2
+            stack.append((lo, mid, depth + 1))
+            stack.append((mid + 1, hi, depth + 1))
+
+    def within(self, point: Tuple[float, float, float], chord: float) -> List[Tuple[float, int]]:
+        """
+        Points within a chord distance
+
+        Returns:
+            (squared chord distance, original index) pairs
+        """
+        xs, ys, zs = self.coords
+        limit = chord * chord
+        found = []
+        stack = [(0, len(self.ids), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            dx, dy, dz = xs[mid] - point[0], ys[mid] - point[1], zs[mid] - point[2]
+            d2 = dx * dx + dy * dy + dz * dz
+            if d2 <= limit:
+                found.append((d2, self.ids[mid]))
+            diff = (dx, dy, dz)[depth % 3]
+            # Visit a side only if the query ball can reach across the split
+            if diff >= -chord:
+                stack.append((lo, mid, depth + 1))
+            if diff <= chord:
+                stack.append((mid + 1, hi, depth + 1))
+        return found
+
+
+# ============================================================
+# 2. OSM INDEX
+# ============================================================
+class OSMIndex:
+    """Radius + "key=value" (or bare "key") tag lookups over a local OSM extract"""
+
+    def __init__(self, elements: List[Dict]):
+        # Raw elements are converted once; the index only keeps compact records
+        self.places: List[Place] = []
+        by_tag: Dict[str, List[int]] = {}
+        points = []
+
+        for element in elements:
+            place = Place.from_osm_element(element)
+            if not place:
+                continue
+            tags = place.tags
+            # Every place is indexed under "key=value" and under the bare
+            # "key" ("shop" finds every kind of shop); empty values are skipped
+            keys = [tag for key in INDEXED_KEYS if tags.get(key) for tag in (f"{key}={tags[key]}", key)]
+            if not keys:
+                continue
+            position = len(self.places)
+            self.places.append(place)
+            points.append(_unit_vector(place.lat, place.lon))
+            for key in keys:
+                by_tag.setdefault(key, []).append(position)
+
+        # One small tree per tag keeps tag filtering out of the hot loop
+        self._trees: Dict[str, Tuple[KDTree, List[int]]] = {}
+        for tag, positions in by_tag.items():
+            self._trees[tag] = (KDTree([points[p] for p in positions]), positions)
+
+    def __len__(self):
+        return len(self.places)
+
+    def query(self, lat: float, lon: float, radius: float, tag: str) -> List[Place]:
+        """
+        Places carrying the "key=value" tag (or any value of a bare "key")
+        within radius of a point
+
+        Returns:
+            Place records, nearest first
+        """
+        entry = self._trees.get(tag)
+        if not entry:
+            return []
+        tree, positions = entry
+        chord = 2 * math.sin(min(radius / EARTH_RADIUS_M, math.pi) / 2)
+        hits = sorted(tree.within(_unit_vector(lat, lon), chord))
+        return [self.places[positions[i]] for _, i in hits]
+
+    # --------------------------------------------------------
+    # Loading
+    # --------------------------------------------------------
+    @classmethod
+    def from_file(cls, path: str) -> "OSMIndex":
+        """
+        Load an extract
+
+        Args:
+            path: Overpass JSON dump ({"elements": [...]}) or .osm.pbf
+                (the latter needs the optional `osmium` package)
+        """
+        if path.endswith(".pbf"):
+            return cls(_read_pbf(path))
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("elements", []) if isinstance(data, dict) else data)
+
+
+def _read_pbf(path: str) -> List[Dict]:
+    """Tagged nodes and ways (with their center) from an .osm.pbf file"""
+    try:
+        import osmium
+    except ImportError:
+        raise RuntimeError("Reading .osm.pbf extracts requires `pip install osmium`")
+
+    elements = []
+
+    class Handler(osmium.SimpleHandler):
+        def node(self, n):
+            tags = {t.k: t.v for t in n.tags}
+            if any(key in tags for key in INDEXED_KEYS):
+                elements.append({"type": "node", "id": n.id, "lat": n.location.lat, "lon": n.location.lon, "tags": tags})
+
+        def way(self, w):
+            tags = {t.k: t.v for t in w.tags}
+            if not any(key in tags for key in INDEXED_KEYS):
+                return
+            locations = [(nd.lat, nd.lon) for nd in w.nodes if nd.location.valid()]
+            if not locations:
+                return
+            center = {
+                "lat": sum(lat for lat, _ in locations) / len(locations),
+                "lon": sum(lon for _, lon in locations) / len(locations),
+            }
+            elements.append({"type": "way", "id": w.id, "center": center, "tags": tags})
+
+    Handler().apply_file(path, locations=True)
+    return elements
+
+
+_local_index: Optional[OSMIndex] = None
+_local_index_lock = threading.Lock()
+
+
+def get_local_index() -> Optional[OSMIndex]:
+    """The process-wide index for OSM_EXTRACT_PATH (None if not configured)"""
+    global _local_index
+    if not OSM_EXTRACT_PATH:
+        return None
+    with _local_index_lock:
+        if _local_index is None:
+            started = time.time()
+            _local_index = OSMIndex.from_file(OSM_EXTRACT_PATH)
+            print(f"🗺️ Loaded {len(_local_index)} places from {OSM_EXTRACT_PATH} in {time.time() - started:.1f}s")
+        return _local_index
+
+
+# ============================================================
+# 3. BENCHMARK
+# ============================================================
+if __name__ == "__main__":
+    import random
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else OSM_EXTRACT_PATH
+    if not path:
+        print("Usage: python osm_index.py <extract.json|extract.osm.pbf>")
+        sys.exit(1)
+
+    started = time.time()
+    index = OSMIndex.from_file(path)
+    print(f"✅ Indexed {len(index)} places in {time.time() - started:.2f}s")
+
+    # Random radius queries around Košice
+    rounds = 1000
+    started = time.perf_counter()
+    total = 0
+    for _ in range(rounds):
+        lat = 48.7164 + random.uniform(-0.02, 0.02)
+        lon = 21.2611 + random.uniform(-0.03, 0.03)
+        total += len(index.query(lat, lon, 500, "amenity=restaurant"))
+    elapsed = time.perf_counter() - started
+    print(f"⚡ {elapsed / rounds * 1e6:.0f} µs per query ({total / rounds:.1f} results on average)")
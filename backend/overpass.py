@@ -0,0 +1,360 @@
+import asyncio
+import codecs
+import json
+import os
+import httpx
+from typing import Callable, List, Dict, Optional, Tuple
+from rate_limit import acquire_async
+from overpass_endpoints import EndpointPool, overpass_endpoints
+from geo import element_coords
+from place_record import OSM_TAG_FIELDS
+
+OVERPASS_TIMEOUT = 30
+
+
+# ============================================================
+# 1. TAGS
+# ============================================================
+# Keys we accept in "key=value" tags (from place types or GPT osm_tags)
+SUPPORTED_KEYS = ("amenity", "tourism", "historic", "leisure", "shop")
+
+# Place types whose OSM tag is not simply amenity=<type>
+PLACE_TYPE_TAGS = {
+    "museum": "tourism=museum",
+    "gallery": "tourism=gallery",
+    "attraction": "tourism=attraction",
+    "viewpoint": "tourism=viewpoint",
+    "hotel": "tourism=hotel",
+    "hostel": "tourism=hostel",
+    "guest_house": "tourism=guest_house",
+    "park": "leisure=park",
+    "garden": "leisure=garden",
+    "gym": "leisure=fitness_centre",
+    "stadium": "leisure=stadium",
+    "monument": "historic=monument",
+    "castle": "historic=castle",
+    "shop": "shop",
+    "mall": "shop=mall",
+    "supermarket": "shop=supermarket",
+}
+
+
+def place_type_to_tag(place_type: str) -> str:
+    """Map a place type (restaurant, museum, park, ...) to an OSM "key=value" tag"""
+    place_type = place_type.strip().lower().replace(" ", "_")
+    if "=" in place_type:
+        return place_type
+    return PLACE_TYPE_TAGS.get(place_type, f"amenity={place_type}")
+
+
+def normalize_tags(tags: List[str]) -> List[str]:
+    """Drop malformed/unsupported tags and duplicates, keep order"""
+    result = []
+    for tag in tags:
+        key, _, value = tag.strip().partition("=")
+        if key not in SUPPORTED_KEYS:
+            print(f"⚠️ Ignoring unsupported OSM tag: {tag}")
+            continue
+        tag = f"{key}={value}" if value else key
+        if tag not in result:
+            result.append(tag)
+    return result
+
+
+# Only these tag keys are downloaded: names, the searchable keys and every
+# field Place maps from OSM. Set OVERPASS_TAG_PROJECTION=0 to get all tags.
+PROJECTED_KEYS = tuple(dict.fromkeys(
+    ("name", *SUPPORTED_KEYS, "addr:street", "addr:housenumber")
+    + tuple(key for keys in OSM_TAG_FIELDS.values() for key in keys)
+))
+PROJECT_TAGS = os.getenv("OVERPASS_TAG_PROJECTION", "1") != "0"
+# Projected (derived) elements carry their original type in this tag
+TYPE_TAG = "_osm_type"
+
+
+def element_matches(element: Dict, tag: str) -> bool:
+    """Whether an element carries "key=value" (or just "key")"""
+    key, _, value = tag.partition("=")
+    element_value = (element.get("tags") or {}).get(key)
+    return element_value is not None and (not value or element_value == value)
+
+
+def split_by_tag(elements: List[Dict], tags: List[str]) -> Dict[str, List[Dict]]:
+    """Split union query results back into one list per requested tag"""
+    result = {tag: [] for tag in tags}
+    for element in elements:
+        for tag in tags:
+            if element_matches(element, tag):
+                result[tag].append(element)
+    return result
+
+
+# ============================================================
+# 2. QUERY BUILDERS
+# ============================================================
+def _tag_filter(tag: str, named_only: bool = False) -> str:
+    """Turn "key=value" into an Overpass filter ["key"="value"]"""
+    key, _, value = tag.partition("=")
+    tag_filter = f'["{key}"="{value}"]' if value else f'["{key}"]'
+    return tag_filter + '["name"]' if named_only else tag_filter
+
+
+def _union(area: str, tags: List[str], named_only: bool = False) -> str:
+    """Union body: nodes and ways for every tag within the given area filter"""
+    lines = []
+    for tag in tags:
+        tag_filter = _tag_filter(tag, named_only)
+        lines.append(f"      node{tag_filter}{area};")
+        lines.append(f"      way{tag_filter}{area};")
+    return "\n".join(lines)
+
+
+def _output(limit: Optional[int], project: bool) -> str:
+    """
+    Output statement: tags and a single center point per element
+
+    Ways come back with a center instead of all their member nodes. With
+    projection, a convert statement keeps only PROJECTED_KEYS.
+    """
+    count = f" {limit}" if limit else ""
+    if not project:
+        return f"out tags center{count};"
+    fields = ", ".join(f'"{key}"=t["{key}"]' for key in PROJECTED_KEYS)
+    return (
+        f'convert item ::id=id(), ::geom=center(geom()), "{TYPE_TAG}"=type(), {fields};\n'
+        f"    out geom{count};"
+    )
+
+
+def _difference(area: str, excluded: str, tags: List[str], named_only: bool) -> str:
+    """Set difference body: matches within area minus those within excluded"""
+    inner = lambda union: "\n".join("  " + line for line in union.split("\n"))
+    return f"""      (
+{inner(_union(area, tags, named_only))}
+      );
+      -
+      (
+{inner(_union(excluded, tags, named_only))}
+      );"""
+
+
+def _query(
+    area: str,
+    tags: List[str],
+    limit: Optional[int],
+    named_only: bool,
+    project: bool,
+    excluded: Optional[str] = None
+) -> str:
+    """
+    Full query for the tags within an area filter
+
+    Without a limit all tags share one union and one output. With a limit,
+    every tag gets its own output statement so each one is capped
+    separately on the server. Elements within the excluded area filter
+    (if any) are subtracted on the server.
+    """
+    if isinstance(tags, str):
+        tags = [tags]
+    groups = [tags] if not limit else [[tag] for tag in tags]
+    blocks = [
+        f"""    (
+{_difference(area, excluded, group, named_only) if excluded else _union(area, group, named_only)}
+    );
+    {_output(limit, project)}"""
+        for group in groups
+    ]
+    return "\n    [out:json][timeout:25];\n" + "\n".join(blocks) + "\n    "
+
+
+def build_around_query(
+    lat: float,
+    lon: float,
+    radius: int,
+    tags: List[str],
+    limit: Optional[int] = None,
+    named_only: bool = False,
+    project: bool = PROJECT_TAGS,
+    inner_radius: Optional[int] = None
+) -> str:
+    """
+    Nodes and ways with any of the "key=value" tags within radius of a point
+
+    limit caps the output per tag; with inner_radius only the ring between
+    inner_radius and radius is returned.
+    """
+    excluded = f"(around:{inner_radius},{lat},{lon})" if inner_radius else None
+    return _query(f"(around:{radius},{lat},{lon})", tags, limit, named_only, project, excluded)
+
+
+def build_bbox_query(
+    bbox: Tuple[float, float, float, float],
+    tags: List[str],
+    limit: Optional[int] = None,
+    named_only: bool = False,
+    project: bool = PROJECT_TAGS
+) -> str:
+    """Nodes and ways with any of the "key=value" tags inside (south, west, north, east)"""
+    south, west, north, east = bbox
+    return _query(f"({south},{west},{north},{east})", tags, limit, named_only, project)
+
+
+def build_polyline_query(
+    points: List[Tuple[float, float]],
+    buffer: int,
+    tags: List[str],
+    project: bool = PROJECT_TAGS
+) -> str:
+    """Nodes and ways with any of the "key=value" tags within buffer meters of a polyline"""
+    coords = ",".join(f"{lat:.6f},{lon:.6f}" for lat, lon in points)
+    return _query(f"(around:{buffer},{coords})", tags, None, False, project)
+
+
+# ============================================================
+# 3. STREAMING PARSER
+# ============================================================
+class ElementStream:
+    """
+    Incremental parser for the "elements" array of an Overpass JSON response
+
+    Bytes are fed as they arrive and every complete element is returned
+    right away; consumed text is dropped, so memory stays at roughly one
+    element no matter how big the response is.
+    """
+
+    _SEPARATORS = " \t\r\n,"
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._in_elements = False
+        self.done = False
+
+    def feed(self, chunk: bytes) -> List[Dict]:
+        """Parse a chunk of the response, return the elements it completed"""
+        self._buffer += self._utf8.decode(chunk)
+        elements = []
+
+        if not self._in_elements:
+            key = self._buffer.find('"elements"')
+            bracket = self._buffer.find("[", key) if key >= 0 else -1
+            if bracket < 0:
+                return elements
+            self._buffer = self._buffer[bracket + 1:]
+            self._in_elements = True
+
+        buffer, pos = self._buffer, 0
+        while not self.done:
+            while pos < len(buffer) and buffer[pos] in self._SEPARATORS:
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                self.done = True
+                break
+            try:
+                element, pos = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # element not complete yet, wait for more bytes
+            elements.append(element)
+
+        self._buffer = buffer[pos:]
+        return elements
+
+
+def normalize_element(element: Dict) -> Dict:
+    """
+    Plain node/way shape for any element Overpass returns
+
+    Derived elements from the tag projection get their type back from
+    TYPE_TAG, empty projected tags are dropped and the position ends up in
+    lat/lon (nodes) or center (ways), whatever geometry format it came in.
+    """
+    tags = {key: value for key, value in (element.get("tags") or {}).items() if value != ""}
+    element_type = tags.pop(TYPE_TAG, None) or element.get("type")
+    normalized = {"type": element_type, "id": element.get("id"), "tags": tags}
+    coords = element_coords(element)
+    if coords:
+        if element_type == "node":
+            normalized["lat"], normalized["lon"] = coords
+        else:
+            normalized["center"] = {"lat": coords[0], "lon": coords[1]}
+    return normalized
+
+
+# ============================================================
+# 4. FETCHING
+# ============================================================
+async def _stream_elements(
+    client: httpx.AsyncClient,
+    url: str,
+    query: str,
+    accept: Optional[Callable[[Dict], bool]],
+    enough: Optional[Callable[[List[Dict]], bool]]
+) -> List[Dict]:
+    """Stream one query from one endpoint (errors propagate)"""
+    elements = []
+    parser = ElementStream()
+    async with client.stream("POST", url, data={"data": query}, timeout=OVERPASS_TIMEOUT) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            for element in parser.feed(chunk):
+                element = normalize_element(element)
+                if accept is None or accept(element):
+                    elements.append(element)
+                    if enough is not None and enough(elements):
+                        return elements
+            if parser.done:
+                break
+    return elements
+
+
+async def fetch_elements_async(
+    client: httpx.AsyncClient,
+    query: str,
+    raise_errors: bool = False,
+    accept: Optional[Callable[[Dict], bool]] = None,
+    enough: Optional[Callable[[List[Dict]], bool]] = None,
+    endpoints: Optional[EndpointPool] = None
+) -> List[Dict]:
+    """
+    Run an Overpass query, parsing the response while it streams in
+
+    The query goes to the fastest healthy mirror and is hedged to a second
+    one when it runs past that mirror's p90 latency (see EndpointPool).
+
+    Args:
+        client: Shared async HTTP client
+        query: Overpass QL query with [out:json]
+        raise_errors: Raise instead of returning [] (lets caches tell
+            "nothing there" apart from "request failed")
+        accept: Keep only elements for which this returns True
+        enough: Called after each kept element; once it returns True the
+            download is cut off and the connection closed
+        endpoints: Mirror pool (defaults to the OVERPASS_ENDPOINTS pool)
+
+    Returns:
+        Raw Overpass elements (empty list on error)
+    """
+    pool = endpoints or overpass_endpoints
+    try:
+        # One token per request actually sent, hedges included
+        return await pool.hedged(
+            lambda url: _stream_elements(client, url, query, accept, enough),
+            acquire=lambda: acquire_async("overpass")
+        )
+
+    except Exception as e:
+        print(f"❌ Overpass API error: {e}")
+        if raise_errors:
+            raise
+        return []
+
+
+def fetch_elements(query: str, raise_errors: bool = False) -> List[Dict]:
+    """Blocking wrapper around fetch_elements_async"""
+    async def run():
+        async with httpx.AsyncClient(timeout=OVERPASS_TIMEOUT) as client:
+            return await fetch_elements_async(client, query, raise_errors)
+    return asyncio.run(run())
@@ -0,0 +1,256 @@
+import asyncio
+import os
+import threading
+import time
+import httpx
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Comma-separated list, the first entry is preferred until we have latency data
+DEFAULT_ENDPOINTS = (
+    "https://overpass-api.de/api/interpreter",
+    "https://overpass.kumi.systems/api/interpreter",
+    "https://overpass.private.coffee/api/interpreter",
+)
+OVERPASS_ENDPOINTS = [
+    url.strip()
+    for url in os.getenv("OVERPASS_ENDPOINTS", ",".join(DEFAULT_ENDPOINTS)).split(",")
+    if url.strip()
+]
+
+# Hedge after the primary's p90 latency (this until enough samples exist)
+HEDGE_DEFAULT_DELAY = float(os.getenv("OVERPASS_HEDGE_DELAY", "3.0"))
+HEDGE_MIN_DELAY = 0.25
+HEDGE_MIN_SAMPLES = 5
+LATENCY_WINDOW = 50
+
+# Failing endpoints sit out for a while (doubling per consecutive failure)
+COOLDOWN_BASE = 5.0
+COOLDOWN_MAX = 300.0
+
+
+class EndpointStats:
+    """Latency samples and health of one Overpass endpoint"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.failures = 0
+        self.cooldown_until = 0.0
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Latency percentile in seconds (None until enough samples)"""
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+
+class EndpointPool:
+    """
+    Overpass mirrors with latency tracking and hedged requests
+
+    A request goes to the fastest healthy mirror. If it hasn't finished
+    by that mirror's p90 latency, a second (hedged) request is sent to the
+    next mirror; whichever finishes first wins and the other is cancelled.
+    Errors fail over to the next mirror immediately and put the failing
+    one in a cooldown. At most two requests are in flight at a time.
+    """
+
+    def __init__(self, urls: List[str] = OVERPASS_ENDPOINTS, default_delay: float = HEDGE_DEFAULT_DELAY):
+        if not urls:
+            raise ValueError("At least one Overpass endpoint is required")
+        self.default_delay = default_delay
+        self._stats: Dict[str, EndpointStats] = {url: EndpointStats(url) for url in urls}
+        self._order = list(urls)
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------
+    # Bookkeeping
+    # --------------------------------------------------------
+    def ranked(self) -> List[str]:
+        """Endpoints to try, best first (cooling-down ones last)"""
+        now = time.monotonic()
+        with self._lock:
+            def key(url):
+                stats = self._stats[url]
+                median = stats.percentile(0.5)
+                return (
+                    not stats.healthy(now),
+                    median if median is not None else self.default_delay,
+                    self._order.index(url)
+                )
+            return sorted(self._order, key=key)
+
+    def hedge_delay(self, url: str) -> float:
+        """How long to wait on an endpoint before hedging"""
+        with self._lock:
+            p90 = self._stats[url].percentile(0.9)
+        return max(p90 if p90 is not None else self.default_delay, HEDGE_MIN_DELAY)
+
+    def record_success(self, url: str, latency: float):
+        with self._lock:
+            stats = self._stats[url]
+            stats.latencies.append(latency)
+            stats.failures = 0
+            stats.cooldown_until = 0.0
+
+    def record_censored(self, url: str, elapsed: float):
+        """
+        A request that was cancelled before it answered (it lost a hedge race)
+
+        Its latency is at least `elapsed`. Recording that (but never less
+        than the endpoint's current median) lets a mirror that has become
+        slow drift down the ranking even though it never finishes a race.
+        """
+        with self._lock:
+            stats = self._stats[url]
+            median = stats.percentile(0.5)
+            stats.latencies.append(max(elapsed, median or 0.0))
+
+    def record_failure(self, url: str):
+        with self._lock:
+            stats = self._stats[url]
+            stats.failures += 1
+            cooldown = min(COOLDOWN_BASE * 2 ** (stats.failures - 1), COOLDOWN_MAX)
+            stats.cooldown_until = time.monotonic() + cooldown
+
+    def status(self) -> List[Dict]:
+        """Per-endpoint health and latency (for logging/diagnostics)"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "url": url,
+                    "healthy": stats.healthy(now),
+                    "failures": stats.failures,
+                    "samples": len(stats.latencies),
+                    "p50": stats.percentile(0.5),
+                    "p90": stats.percentile(0.9),
+                }
+                for url, stats in self._stats.items()
+            ]
+
+    # --------------------------------------------------------
+    # Requests
+    # --------------------------------------------------------
+    async def _timed(
+        self,
+        url: str,
+        fetch: Callable[[str], Awaitable[T]],
+        acquire: Optional[Callable[[], Awaitable]] = None,
+        sent: Optional[asyncio.Future] = None
+    ) -> T:
+        if acquire is not None:
+            await acquire()  # rate limit wait isn't the mirror's latency
+        started = time.monotonic()
+        if sent is not None:
+            sent.set_result(started)
+        try:
+            result = await fetch(url)
+        except asyncio.CancelledError:
+            # Lost the race: not a failure, but it was at least this slow
+            self.record_censored(url, time.monotonic() - started)
+            raise
+        except httpx.HTTPStatusError as e:
+            # 4xx (except 429) is our query's fault, not the mirror's
+            if e.response.status_code == 429 or e.response.status_code >= 500:
+                self.record_failure(url)
+            raise
+        except Exception:
+            self.record_failure(url)
+            raise
+        self.record_success(url, time.monotonic() - started)
+        return result
+
+    async def hedged(
+        self,
+        fetch: Callable[[str], Awaitable[T]],
+        acquire: Optional[Callable[[], Awaitable]] = None
+    ) -> T:
+        """
+        Run fetch(url) against the best endpoint, hedging on slow responses
+
+        Args:
+            fetch: Coroutine function doing the actual request for one URL
+            acquire: Awaited before every request actually sent (rate limit);
+                the hedge delay only starts once it returns
+
+        Returns:
+            The first successful result
+
+        Raises:
+            The last error if every endpoint failed
+        """
+        candidates = self.ranked()
+        pending: Dict[asyncio.Task, str] = {}
+        # When each request actually went out (after acquire())
+        sent_at: Dict[asyncio.Task, asyncio.Future] = {}
+        last_error: Optional[BaseException] = None
+        attempts = 0
+
+        def launch():
+            nonlocal attempts
+            url = candidates[attempts]
+            attempts += 1
+            sent = asyncio.get_running_loop().create_future()
+            task = asyncio.ensure_future(self._timed(url, fetch, acquire, sent))
+            pending[task] = url
+            sent_at[task] = sent
+
+        launch()
+        try:
+            while pending:
+                can_hedge = len(pending) < 2 and attempts < len(candidates)
+                primary = next(iter(pending))
+                sent = sent_at[primary]
+                if can_hedge and not sent.done():
+                    # The hedge delay starts once the primary is sent, not
+                    # while it's still waiting in acquire()
+                    done, _ = await asyncio.wait([*pending, sent], return_when=asyncio.FIRST_COMPLETED)
+                    done.discard(sent)
+                    if not done:
+                        continue
+                else:
+                    timeout = None
+                    if can_hedge:
+                        waited = time.monotonic() - sent.result()
+                        timeout = max(self.hedge_delay(pending[primary]) - waited, 0)
+                    done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    print(f"⏱️ Overpass slow, hedging to {candidates[attempts]}")
+                    launch()
+                    continue
+
+                for task in done:
+                    url = pending.pop(task)
+                    del sent_at[task]
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    print(f"⚠️ Overpass endpoint {url} failed: {error}")
+                    last_error = error
+                    if isinstance(error, httpx.HTTPStatusError) and 400 <= error.response.status_code < 500 \
+                            and error.response.status_code != 429:
+                        raise error  # a bad query fails on every mirror
+
+                # Fail over right away instead of waiting for a hedge delay
+                if not pending and attempts < len(candidates):
+                    launch()
+
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+
+# Process-wide pool shared by every Overpass query
+overpass_endpoints = EndpointPool()
@@ -0,0 +1,279 @@
+import math
+import sys
+from typing import Any, Dict, List, Optional
+from geo import element_coords
+
+NA = "N/A"
+NAN = float("nan")
+
+MISSING_VALUES = (NA, None, "", [], {})
+
+# Optional fields read straight from OSM tags: field -> tag keys to try in order
+OSM_TAG_FIELDS = {
+    "amenity": ("amenity",),
+    "cuisine": ("cuisine",),
+    "city": ("addr:city",),
+    "postcode": ("addr:postcode",),
+    "phone": ("phone", "contact:phone"),
+    "website": ("website", "contact:website"),
+    "email": ("email", "contact:email"),
+    "opening_hours": ("opening_hours",),
+    "wheelchair": ("wheelchair",),
+    "outdoor_seating": ("outdoor_seating",),
+    "delivery": ("delivery",),
+    "takeaway": ("takeaway",),
+    "smoking": ("smoking",),
+    "internet_access": ("internet_access",),
+    "wifi": ("internet_access:fee",),
+    "description": ("description",),
+    "brand": ("brand",),
+    "operator": ("operator",),
+    "capacity": ("capacity",),
+}
+
+# Marks a key absent from the extra dict (None is a valid value there)
+_MISSING = object()
+
+# Short tag values ("yes", "restaurant", "italian") repeat a lot, share them
+_INTERN_MAX_LEN = 24
+
+
+def _compact_tags(tags: Dict[str, str]) -> Dict[str, str]:
+    """Copy of the tags with interned keys and short values"""
+    return {
+        sys.intern(key): sys.intern(value) if isinstance(value, str) and len(value) <= _INTERN_MAX_LEN else value
+        for key, value in tags.items()
+    }
+
+
+class Place:
+    """
+    Compact in-memory place record
+
+    Only the core fields are stored; everything optional is derived on
+    demand from the OSM tags (stored once, with interned strings) or from
+    a provider-specific `extra` dict that only exists when needed. Ratings
+    are floats (NaN when unknown) so sorting never compares strings.
+
+    Read access mirrors the old place dicts (`place.get("website")`,
+    `place["name"]`), and `to_dict()` produces the existing JSON shape at
+    the API boundary.
+    """
+
+    __slots__ = (
+        "name", "lat", "lon", "source", "rating", "user_ratings_total",
+        "osm_id", "osm_type", "category", "tags", "sources", "_extra"
+    )
+
+    def __init__(
+        self,
+        name: str,
+        lat: float,
+        lon: float,
+        source: str,
+        rating: float = NAN,
+        user_ratings_total: int = 0,
+        osm_id: Optional[int] = None,
+        osm_type: Optional[str] = None,
+        tags: Optional[Dict[str, str]] = None,
+        extra: Optional[Dict[str, Any]] = None
+    ):
+        self.name = name
+        self.lat = lat
+        self.lon = lon
+        self.source = source
+        self.rating = rating
+        self.user_ratings_total = user_ratings_total
+        self.osm_id = osm_id
+        self.osm_type = osm_type
+        self.category = None
+        self.tags = tags
+        self.sources = None
+        self._extra = extra or None
+
+    # --------------------------------------------------------
+    # Construction
+    # --------------------------------------------------------
+    @classmethod
+    def from_osm_element(cls, element: Dict) -> Optional["Place"]:
+        """Place from a raw Overpass element (None if it has no position)"""
+        if element.get("type") not in ["node", "way"]:
+            return None
+        coords = element_coords(element)
+        if not coords:
+            return None
+        tags = _compact_tags(element.get("tags") or {})
+        return cls(
+            name=tags.get("name", "Unknown"),
+            lat=coords[0],
+            lon=coords[1],
+            source="OpenStreetMap",
+            osm_id=element.get("id"),
+            osm_type=sys.intern(element.get("type")),
+            tags=tags
+        )
+
+    @classmethod
+    def from_google(cls, result: Dict, details: Dict) -> "Place":
+        """Place from a Nearby Search result and its Place Details"""
+        rating = result.get("rating")
+        return cls(
+            name=result.get("name", "Unknown"),
+            lat=result["geometry"]["location"]["lat"],
+            lon=result["geometry"]["location"]["lng"],
+            source="Google Places",
+            rating=float(rating) if rating is not None else NAN,
+            user_ratings_total=result.get("user_ratings_total", 0),
+            extra={
+                "place_id": result.get("place_id"),
+                "address": details.get("formatted_address", result.get("vicinity", NA)),
+                "price_level": result.get("price_level", NA),
+                "types": result.get("types", []),
+                "business_status": result.get("business_status", NA),
+                "phone": details.get("formatted_phone_number", NA),
+                "international_phone": details.get("international_phone_number", NA),
+                "website": details.get("website", NA),
+                "url": details.get("url", NA),
+                "opening_hours": details.get("opening_hours", {}).get("weekday_text", []),
+                "photos": details.get("photos", []),
+                "reviews": [
+                    {
+                        "author": r.get("author_name"),
+                        "rating": r.get("rating"),
+                        "text": r.get("text", "")[:200],
+                        "time": r.get("relative_time_description")
+                    }
+                    for r in details.get("reviews", [])[:3]
+                ]
+            }
+        )
+
+    def with_category(self, category: str) -> "Place":
+        """Shallow copy labelled with the query category (cached records stay untouched)"""
+        copy = Place.__new__(Place)
+        for slot in Place.__slots__:
+            setattr(copy, slot, getattr(self, slot))
+        copy.category = category
+        return copy
+
+    @classmethod
+    def merge(cls, records: List["Place"]) -> "Place":
+        """
+        One record from several records of the same real place
+
+        The first record is the base; missing fields are filled from the others.
+        """
+        base = records[0].with_category(records[0].category)
+        for record in records[1:]:
+            if math.isnan(base.rating) and not math.isnan(record.rating):
+                base.rating = record.rating
+                base.user_ratings_total = record.user_ratings_total
+            if base.osm_id is None and record.osm_id is not None:
+                base.osm_id, base.osm_type = record.osm_id, record.osm_type
+            if record.tags:
+                base.tags = {**record.tags, **(base.tags or {})}
+            if record._extra:
+                extra = dict(base._extra or {})
+                for key, value in record._extra.items():
+                    if extra.get(key) in MISSING_VALUES:
+                        extra[key] = value
+                base._extra = extra
+            base.category = base.category or record.category
+
+        sources = []
+        for record in records:
+            for source in record.sources or [record.source]:
+                if source not in sources:
+                    sources.append(source)
+        base.sources = sources
+        return base
+
+    # --------------------------------------------------------
+    # Tag helpers
+    # --------------------------------------------------------
+    def matches(self, tag: str) -> bool:
+        """Whether the OSM tags contain "key=value" (or just "key")"""
+        key, _, value = tag.partition("=")
+        found = (self.tags or {}).get(key)
+        return found is not None and (not value or found == value)
+
+    def _osm_field(self, field: str) -> Any:
+        tags = self.tags or {}
+        if field == "address":
+            return f"{tags.get('addr:street', '')} {tags.get('addr:housenumber', '')}".strip() or NA
+        for key in OSM_TAG_FIELDS[field]:
+            if tags.get(key):
+                return tags[key]
+        return NA
+
+    # --------------------------------------------------------
+    # Dict-style read access and serialization
+    # --------------------------------------------------------
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Read a field like the old place dicts did
+
+        Looks the one field up in the slots, the extra dict or the OSM tags,
+        with the same precedence as to_dict(), without serializing the record.
+        """
+        if key in ("name", "lat", "lon", "source"):
+            return getattr(self, key)
+        if key == "rating":
+            return NA if math.isnan(self.rating) else self.rating
+        if key == "coordinates":
+            return {"lat": self.lat, "lon": self.lon}
+        if key in ("osm_id", "osm_type") and self.osm_id is not None:
+            return getattr(self, key)
+        if key == "user_ratings_total" and self._extra and "place_id" in self._extra:
+            return self.user_ratings_total
+        if key == "all_tags" and self.tags is not None:
+            return dict(self.tags)
+        if key == "category" and self.category:
+            return self.category
+        if key == "sources" and self.sources:
+            return list(self.sources)
+
+        value = self._extra.get(key, _MISSING) if self._extra else _MISSING
+        if self.tags is not None and (key == "address" or key in OSM_TAG_FIELDS) \
+                and (value is _MISSING or value in MISSING_VALUES):
+            return self._osm_field(key)
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, KeyError)
+        if value is KeyError:
+            raise KeyError(key)
+        return value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to the JSON shape the API has always returned"""
+        data = {"source": self.source}
+        if self.osm_id is not None:
+            data["osm_id"] = self.osm_id
+            data["osm_type"] = self.osm_type
+        if self._extra and "place_id" in self._extra:
+            data["place_id"] = self._extra["place_id"]
+        data["name"] = self.name
+        data["coordinates"] = {"lat": self.lat, "lon": self.lon}
+
+        if self._extra:
+            for key, value in self._extra.items():
+                data.setdefault(key, value)
+        if self.tags is not None:
+            for field in ("address", *OSM_TAG_FIELDS):
+                if data.get(field) in MISSING_VALUES:
+                    data[field] = self._osm_field(field)
+
+        data["rating"] = NA if math.isnan(self.rating) else self.rating
+        if self._extra and "place_id" in self._extra:
+            data["user_ratings_total"] = self.user_ratings_total
+        if self.tags is not None:
+            data["all_tags"] = dict(self.tags)
+        if self.category:
+            data["category"] = self.category
+        if self.sources:
+            data["sources"] = list(self.sources)
+        return data
+
+    def __repr__(self):
+        return f"Place({self.name!r}, {self.lat:.5f}, {self.lon:.5f}, {self.source!r})"
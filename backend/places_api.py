@@ -1,45 +1,84 @@
-import requests
+import asyncio
+import os
 import time
-from typing import List, Dict, Optional
+import httpx
+from dataclasses import dataclass
+from typing import Awaitable, Callable, FrozenSet, List, Dict, Optional, Tuple
+from rate_limit import acquire_async
+from tile_cache import overpass_tile_cache
+from overpass import place_type_to_tag
+from entity_resolution import resolve_entities, place_coords
+from geo import haversine_m
+from ranking import rank_places
+from geocoding import geocoding_service
+from google_places import iter_nearby_results_async
+from deadline import Deadline
+from provider_stats import provider_stats, region_for
+from query_cache import query_cache, normalize_place_type
+
+# Expanding search: rings grow by this factor up to the max radius
+EXPAND_FACTOR = 2
+EXPAND_MAX_RADIUS = 5000
+
+# Shared settings for the async HTTP client used by all providers
+HTTP_TIMEOUT = 30
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+
+
+def _new_client() -> httpx.AsyncClient:
+    """Create the async HTTP client shared by all providers of one search"""
+    return httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+
+
+async def _with_client(fetch, *args):
+    """Run a single provider coroutine with its own short-lived client"""
+    async with _new_client() as client:
+        return await fetch(client, *args)
+
 
 # ============================================================
 # 1. OVERPASS API (OpenStreetMap) - NO API KEY NEEDED
 # ============================================================
-def find_places_osm(lat: float, lon: float, radius: int, amenity: str) -> List[Dict]:
+async def find_places_osm_async(
+    client: httpx.AsyncClient,
+    lat: float,
+    lon: float,
+    radius: int,
+    amenity: str,
+    inner_radius: int = 0,
+    raise_errors: bool = False
+) -> List[Dict]:
     """
     Search for places using Overpass API (OpenStreetMap)
     
     Args:
+        client: Shared async HTTP client
         lat: Latitude
         lon: Longitude
         radius: Search radius in meters
         amenity: Type of place (restaurant, cafe, bar, museum, etc.)
+        inner_radius: Only return places farther than this (ring search)
+        raise_errors: Raise instead of returning [] when Overpass fails
     
     Returns:
         List of places with details
     """
-    url = "https://overpass-api.de/api/interpreter"
-    query = f"""
-    [out:json];
-    node(around:{radius},{lat},{lon})[amenity={amenity}];
-    out body;
-    """
-    
     try:
-        response = requests.get(url, params={"data": query}, timeout=30)
-        
-        if response.status_code != 200:
-            return []
-        
-        data = response.json()
+        # Served from the geo-tile cache, only missing tiles hit Overpass
+        tag = place_type_to_tag(amenity)
+        records = await overpass_tile_cache.query_async(
+            client, lat, lon, radius, tag, inner_radius, raise_errors
+        )
         
         places = []
-        for element in data.get("elements", []):
-            tags = element.get("tags", {})
+        for record in records:
+            tags = record.tags or {}
             places.append({
-                "name": tags.get("name", "Unknown"),
-                "lat": element["lat"],
-                "lon": element["lon"],
+                # The tag queried, for ranking and entity resolution
+                "category": tag,
+                "name": record.name,
+                "lat": record.lat,
+                "lon": record.lon,
                 "cuisine": tags.get("cuisine", "N/A"),
                 "description": tags.get("description", "N/A"),
                 "website": tags.get("website", "N/A"),
@@ -54,42 +93,51 @@ def find_places_osm(lat: float, lon: float, radius: int, amenity: str) -> List[D
     
     except Exception as e:
         print(f"❌ OSM Error: {e}")
+        if raise_errors:
+            raise
         return []
 
 
+def find_places_osm(lat: float, lon: float, radius: int, amenity: str) -> List[Dict]:
+    """Blocking wrapper around find_places_osm_async"""
+    return asyncio.run(_with_client(find_places_osm_async, lat, lon, radius, amenity))
+
+
 # ============================================================
 # 2. NOMINATIM API (OpenStreetMap Geocoding) - NO API KEY NEEDED
 # ============================================================
-def find_places_nominatim(lat: float, lon: float, amenity: str, limit: int = 20) -> List[Dict]:
+async def find_places_nominatim_async(
+    client: httpx.AsyncClient,
+    lat: float,
+    lon: float,
+    amenity: str,
+    limit: int = 20,
+    raise_errors: bool = False
+) -> List[Dict]:
     """
     Search for places using Nominatim API
     
     Args:
+        client: Shared async HTTP client
         lat: Latitude
         lon: Longitude
         amenity: Type of place (restaurant, cafe, bar, etc.)
         limit: Maximum number of results
+        raise_errors: Raise instead of returning [] when Nominatim fails
     
     Returns:
         List of places with details
     """
-    url = "https://nominatim.openstreetmap.org/search"
-    params = {
-        "format": "json",
-        "q": f"{amenity} near {lat},{lon}",
-        "limit": limit,
-        "addressdetails": 1,
-        "extratags": 1
-    }
-    headers = {"User-Agent": "TripPlannerApp/1.0"}
-    
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=30)
-        data = response.json()
+        # Same cached Nominatim path as every other geocoding call site
+        data = await geocoding_service.search_async(
+            client, f"{amenity} near {lat},{lon}", limit=limit, raise_errors=raise_errors,
+            addressdetails=1, extratags=1
+        )
         
         places = []
         for place in data:
-            extratags = place.get("extratags", {})
+            extratags = place.get("extratags") or {}
             address = place.get("address", {})
             places.append({
                 "name": place.get("display_name", "Unknown").split(",")[0],
@@ -110,69 +158,684 @@ def find_places_nominatim(lat: float, lon: float, amenity: str, limit: int = 20)
     
     except Exception as e:
         print(f"❌ Nominatim Error: {e}")
+        if raise_errors:
+            raise
         return []
 
 
+def find_places_nominatim(lat: float, lon: float, amenity: str, limit: int = 20) -> List[Dict]:
+    """Blocking wrapper around find_places_nominatim_async"""
+    return asyncio.run(_with_client(find_places_nominatim_async, lat, lon, amenity, limit))
+
+
 # ============================================================
 # 3. GOOGLE PLACES API - REQUIRES API KEY
 # ============================================================
-def find_places_google(lat: float, lon: float, radius: int, place_type: str, api_key: str) -> List[Dict]:
+async def find_places_google_async(
+    client: httpx.AsyncClient,
+    lat: float,
+    lon: float,
+    radius: int,
+    place_type: str,
+    api_key: str,
+    limit: int = 20,
+    raise_errors: bool = False
+) -> List[Dict]:
     """
     Search for places using Google Places API
     
+    Further result pages (up to 60 places) are only fetched when limit
+    asks for more than the pages so far returned.
+    
     Args:
+        client: Shared async HTTP client
         lat: Latitude
         lon: Longitude
         radius: Search radius in meters
         place_type: Type of place (restaurant, cafe, bar, museum, etc.)
         api_key: Google Places API key
+        limit: Maximum number of places
+        raise_errors: Raise when a page request fails instead of returning what arrived
     
     Returns:
         List of places with details
     """
-    url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-    params = {
-        "location": f"{lat},{lon}",
-        "radius": radius,
-        "type": place_type,
-        "key": api_key
-    }
+    places = []
+    if limit <= 0:
+        return places
+    
+    async for place in iter_nearby_results_async(client, lat, lon, radius, place_type, api_key, raise_errors=raise_errors):
+        places.append({
+            "name": place.get("name"),
+            "lat": place["geometry"]["location"]["lat"],
+            "lon": place["geometry"]["location"]["lng"],
+            "rating": place.get("rating", "N/A"),
+            "user_ratings_total": place.get("user_ratings_total", 0),
+            "price_level": place.get("price_level", "N/A"),
+            "address": place.get("vicinity", ""),
+            "types": place.get("types", []),
+            "phone": "N/A",
+            "website": "N/A",
+            "opening_hours": "N/A",
+            "source": "Google Places"
+        })
+        if len(places) >= limit:
+            break
+    
+    return places
+
+
+def find_places_google(lat: float, lon: float, radius: int, place_type: str, api_key: str, limit: int = 20) -> List[Dict]:
+    """Blocking wrapper around find_places_google_async"""
+    return asyncio.run(_with_client(find_places_google_async, lat, lon, radius, place_type, api_key, limit))
+
+
+# ============================================================
+# 4. FOURSQUARE PLACES API - REQUIRES API KEY
+# ============================================================
+async def find_places_foursquare_async(client: httpx.AsyncClient, lat: float, lon: float, radius: int, query: str, api_key: str, limit: int = 20) -> List[Dict]:
+    """
+    Search for places using Foursquare Places API
+    
+    Args:
+        client: Shared async HTTP client
+        lat: Latitude
+        lon: Longitude
+        radius: Search radius in meters
+        query: Type of place (restaurant, cafe, bar, etc.)
+        api_key: Foursquare API key
+        limit: Maximum number of results
     
+    Returns:
+        List of places with details
+    """
+    await acquire_async("foursquare")
+    response = await client.get(
+        "https://api.foursquare.com/v3/places/search",
+        headers={"Accept": "application/json", "Authorization": api_key},
+        params={
+            "ll": f"{lat},{lon}",
+            "radius": radius,
+            "query": query,
+            "limit": min(limit, 50),
+            "fields": "name,geocodes,categories,rating,stats,description,tel,website,location,hours"
+        }
+    )
+    response.raise_for_status()
+    
+    places = []
+    for place in response.json().get("results", []):
+        location = place.get("location", {})
+        geocode = place.get("geocodes", {}).get("main")
+        if not geocode:
+            continue
+        rating = place.get("rating")
+        places.append({
+            "name": place.get("name"),
+            "lat": geocode["latitude"],
+            "lon": geocode["longitude"],
+            "category": (place.get("categories") or [{}])[0].get("name", "Unknown"),
+            # Foursquare rates 0-10, everyone else 0-5
+            "rating": round(rating / 2, 1) if rating is not None else "N/A",
+            "user_ratings_total": place.get("stats", {}).get("total_ratings", 0),
+            "description": place.get("description", "N/A"),
+            "phone": place.get("tel", "N/A"),
+            "website": place.get("website", "N/A"),
+            "opening_hours": place.get("hours", {}).get("display", "N/A"),
+            "address": location.get("address", "N/A"),
+            "city": location.get("locality", "N/A"),
+            "source": "Foursquare"
+        })
+    
+    return places
+
+
+# ============================================================
+# 5. OPENTRIPMAP API - REQUIRES API KEY
+# ============================================================
+# Our place types -> OpenTripMap "kinds"
+OPENTRIPMAP_KINDS = {
+    "restaurant": "restaurants",
+    "cafe": "cafes",
+    "bar": "bars",
+    "pub": "pubs",
+    "fast_food": "fast_food",
+    "museum": "museums",
+    "theatre": "theatres_and_entertainments",
+    "gallery": "museums",
+    "park": "gardens_and_parks",
+    "garden": "gardens_and_parks",
+    "viewpoint": "view_points",
+    "hotel": "accomodations",
+    "hostel": "accomodations",
+}
+
+
+async def find_places_opentripmap_async(client: httpx.AsyncClient, lat: float, lon: float, radius: int, place_type: str, api_key: str, limit: int = 20) -> List[Dict]:
+    """
+    Search for places using OpenTripMap API
+    
+    Only the radius listing is used: per-place details cost one extra
+    request each, which doesn't fit a latency budget.
+    
+    Args:
+        client: Shared async HTTP client
+        lat: Latitude
+        lon: Longitude
+        radius: Search radius in meters
+        place_type: Type of place (restaurant, cafe, museum, etc.)
+        api_key: OpenTripMap API key
+        limit: Maximum number of results
+    
+    Returns:
+        List of places with details
+    """
+    await acquire_async("opentripmap")
+    response = await client.get(
+        "https://api.opentripmap.com/0.1/en/places/radius",
+        params={
+            "radius": radius,
+            "lon": lon,
+            "lat": lat,
+            "kinds": OPENTRIPMAP_KINDS.get(place_type, "interesting_places"),
+            "apikey": api_key,
+            "limit": limit
+        }
+    )
+    response.raise_for_status()
+    
+    places = []
+    for feature in response.json().get("features", []):
+        props = feature.get("properties", {})
+        if not props.get("name"):
+            continue
+        places.append({
+            "name": props["name"],
+            "lat": feature["geometry"]["coordinates"][1],
+            "lon": feature["geometry"]["coordinates"][0],
+            "kinds": props.get("kinds", ""),
+            "wikidata": props.get("wikidata", "N/A"),
+            "rating": "N/A",  # "rate" is popularity, not a user rating
+            "source": "OpenTripMap"
+        })
+    
+    return places
+
+
+# ============================================================
+# 6. HERE API - REQUIRES API KEY
+# ============================================================
+async def find_places_here_async(client: httpx.AsyncClient, lat: float, lon: float, radius: int, place_type: str, api_key: str, limit: int = 20) -> List[Dict]:
+    """
+    Search for places using HERE Geocoding & Search (discover)
+    
+    Args:
+        client: Shared async HTTP client
+        lat: Latitude
+        lon: Longitude
+        radius: Search radius in meters
+        place_type: Type of place (restaurant, cafe, museum, etc.)
+        api_key: HERE API key
+        limit: Maximum number of results
+    
+    Returns:
+        List of places with details
+    """
+    await acquire_async("here")
+    response = await client.get(
+        "https://discover.search.hereapi.com/v1/discover",
+        params={
+            "in": f"circle:{lat},{lon};r={radius}",
+            "q": place_type.replace("_", " "),
+            "limit": min(limit, 100),
+            "apiKey": api_key
+        }
+    )
+    response.raise_for_status()
+    
+    places = []
+    for item in response.json().get("items", []):
+        address = item.get("address", {})
+        contacts = item.get("contacts", [{}])[0] if item.get("contacts") else {}
+        opening_hours = item.get("openingHours", [{}])[0].get("text", "N/A") if item.get("openingHours") else "N/A"
+        places.append({
+            "name": item.get("title"),
+            "lat": item["position"]["lat"],
+            "lon": item["position"]["lng"],
+            "category": (item.get("categories") or [{}])[0].get("name", "Unknown"),
+            "address": address.get("label", "N/A"),
+            "city": address.get("city", "N/A"),
+            "postcode": address.get("postalCode", "N/A"),
+            "phone": contacts.get("phone", [{}])[0].get("value", "N/A") if contacts.get("phone") else "N/A",
+            "website": contacts.get("www", [{}])[0].get("value", "N/A") if contacts.get("www") else "N/A",
+            "opening_hours": opening_hours,
+            "rating": "N/A",
+            "source": "HERE"
+        })
+    
+    return places
+
+
+# ============================================================
+# 7. YELP FUSION API - REQUIRES API KEY
+# ============================================================
+async def find_places_yelp_async(client: httpx.AsyncClient, lat: float, lon: float, radius: int, term: str, api_key: str, limit: int = 20) -> List[Dict]:
+    """
+    Search for places using Yelp Fusion API
+    
+    Args:
+        client: Shared async HTTP client
+        lat: Latitude
+        lon: Longitude
+        radius: Search radius in meters (Yelp caps it at 40 km)
+        term: Type of place (restaurant, cafe, bar, etc.)
+        api_key: Yelp API key
+        limit: Maximum number of results
+    
+    Returns:
+        List of places with details
+    """
+    await acquire_async("yelp")
+    response = await client.get(
+        "https://api.yelp.com/v3/businesses/search",
+        headers={"Authorization": f"Bearer {api_key}"},
+        params={
+            "latitude": lat,
+            "longitude": lon,
+            "term": term,
+            "radius": min(radius, 40000),
+            "limit": min(limit, 50)
+        }
+    )
+    response.raise_for_status()
+    
+    places = []
+    for business in response.json().get("businesses", []):
+        location = business.get("location", {})
+        places.append({
+            "name": business.get("name"),
+            "lat": business["coordinates"]["latitude"],
+            "lon": business["coordinates"]["longitude"],
+            "rating": business.get("rating", "N/A"),
+            "user_ratings_total": business.get("review_count", 0),
+            "price_level": business.get("price", "N/A"),
+            "phone": business.get("phone") or "N/A",
+            "types": [category["alias"] for category in business.get("categories", [])],
+            "address": ", ".join(location.get("display_address", [])) or "N/A",
+            "city": location.get("city", "N/A"),
+            "url": business.get("url", "N/A"),
+            "source": "Yelp"
+        })
+    
+    return places
+
+
+# ============================================================
+# 8. PROVIDER REGISTRY
+# ============================================================
+@dataclass(frozen=True)
+class ProviderSpec:
+    """
+    A place provider the search engine can fan out to
+    
+    fetch is called as fetch(client, lat, lon, radius, place_type, limit, api_key)
+    and should raise on errors rather than return []; providers with rings=True also accept inner_radius= and then only
+    return places in the ring between inner_radius and radius.
+    """
+    name: str
+    fetch: Callable[..., Awaitable[List[Dict]]]
+    # Place type categories it covers (see get_place_types), None = all
+    categories: Optional[FrozenSet[str]]
+    # Data it contributes: "ratings", "reviews", "contact", "opening_hours", ...
+    features: FrozenSet[str]
+    # Approximate USD per 1000 requests beyond free quotas (0 = free)
+    cost: float
+    # Results arriving later than this are dropped
+    latency_budget: float
+    # Environment variable with the API key (None = no key needed)
+    api_key_env: Optional[str] = None
+    # Paid providers only run when asked for explicitly
+    opt_in: bool = False
+    # Can query a ring instead of the full circle (see search_places_async expand)
+    rings: bool = False
+    # Returns every match in the area, however many (limit is ignored)
+    uncapped: bool = False
+
+
+# Adapters let errors through, so _run_provider can tell a failure from "nothing there"
+async def _osm(client, lat, lon, radius, place_type, limit, api_key, inner_radius=0):
+    return await find_places_osm_async(client, lat, lon, radius, place_type, inner_radius, raise_errors=True)
+
+
+async def _nominatim(client, lat, lon, radius, place_type, limit, api_key):
+    return await find_places_nominatim_async(client, lat, lon, place_type, limit, raise_errors=True)
+
+
+async def _google(client, lat, lon, radius, place_type, limit, api_key):
+    return await find_places_google_async(client, lat, lon, radius, place_type, api_key, limit, raise_errors=True)
+
+
+PROVIDERS: Dict[str, ProviderSpec] = {}
+
+
+def register_provider(spec: ProviderSpec):
+    """Add (or replace) a provider in the registry"""
+    PROVIDERS[spec.name] = spec
+
+
+# Dropping OSM over its budget doesn't waste the download: tile cache fills
+# finish in the background, so the next search in the area is served from it
+register_provider(ProviderSpec(
+    "OSM", _osm, None, frozenset({"contact", "opening_hours", "tags"}), cost=0, latency_budget=8.0, rings=True,
+    uncapped=True
+))
+register_provider(ProviderSpec(
+    "Nominatim", _nominatim, None, frozenset({"contact", "address"}), cost=0, latency_budget=5.0
+))
+register_provider(ProviderSpec(
+    "Google Places", _google, None, frozenset({"ratings", "reviews", "address"}), cost=32, latency_budget=6.0,
+    api_key_env="GOOGLE_PLACES_API_KEY", opt_in=True
+))
+register_provider(ProviderSpec(
+    "Foursquare", find_places_foursquare_async, None, frozenset({"ratings", "contact", "opening_hours"}),
+    cost=15, latency_budget=4.0, api_key_env="FOURSQUARE_API_KEY"
+))
+register_provider(ProviderSpec(
+    "OpenTripMap", find_places_opentripmap_async, frozenset({"food", "culture", "nature", "accommodation"}),
+    frozenset({"tourism"}), cost=0, latency_budget=4.0, api_key_env="OPENTRIPMAP_API_KEY"
+))
+register_provider(ProviderSpec(
+    "HERE", find_places_here_async, None, frozenset({"contact", "opening_hours", "address"}),
+    cost=0, latency_budget=4.0, api_key_env="HERE_API_KEY"
+))
+register_provider(ProviderSpec(
+    "Yelp", find_places_yelp_async, frozenset({"food", "shopping", "entertainment", "accommodation", "services"}),
+    frozenset({"ratings", "reviews"}), cost=0, latency_budget=4.0, api_key_env="YELP_API_KEY"
+))
+
+
+def place_type_category(place_type: str) -> Optional[str]:
+    """Category of a place type in get_place_types() (None if unknown)"""
+    for category, place_types in get_place_types().items():
+        if place_type in place_types:
+            return category
+    return None
+
+
+def select_providers(
+    place_type: str,
+    names: Optional[List[str]] = None,
+    api_keys: Optional[Dict[str, str]] = None,
+    max_cost: Optional[float] = None
+) -> List[Tuple[ProviderSpec, Optional[str]]]:
+    """
+    Providers to query for a place type
+    
+    A provider is skipped if it needs a key we don't have, doesn't cover
+    the place type's category, costs more than max_cost or is opt-in and
+    wasn't named explicitly.
+    
+    Args:
+        place_type: Type of place
+        names: Explicit provider names (None = every default provider)
+        api_keys: {provider name: key}, falls back to each api_key_env
+        max_cost: Max cost per 1000 requests
+    
+    Returns:
+        [(spec, api key or None), ...]
+    """
+    api_keys = api_keys or {}
+    category = place_type_category(place_type)
+    selected = []
+    for spec in PROVIDERS.values():
+        if names is not None and spec.name not in names:
+            continue
+        if names is None and spec.opt_in:
+            continue
+        if max_cost is not None and spec.cost > max_cost:
+            continue
+        if spec.categories is not None and category is not None and category not in spec.categories:
+            continue
+        api_key = None
+        if spec.api_key_env:
+            api_key = api_keys.get(spec.name) or os.getenv(spec.api_key_env)
+            if not api_key:
+                continue
+        selected.append((spec, api_key))
+    return selected
+
+
+# ============================================================
+# 9. UNIVERSAL SEARCH FUNCTION
+# ============================================================
+async def _run_provider(spec: ProviderSpec, coro, deadline: Deadline, stats_key: Tuple[str, str]) -> tuple:
+    """
+    Await one provider within its latency budget and tag the result with its name
+    
+    Latency and yield are recorded in provider_stats under stats_key
+    (category, region); runs cut short by the request deadline are not.
+    
+    Returns:
+        (provider name, places, whether the provider answered in full)
+    """
+    started = time.monotonic()
+    answered = True
     try:
-        response = requests.get(url, params=params, timeout=30)
-        data = response.json()
-        
-        if data.get("status") != "OK":
-            print(f"❌ Google API status: {data.get('status')}")
-            return []
+        places = await asyncio.wait_for(coro, timeout=deadline.timeout(spec.latency_budget))
+    except asyncio.TimeoutError:
+        if deadline.expired():
+            deadline.cut(spec.name)
+            return spec.name, [], False
+        print(f"⏱️ {spec.name} dropped: over its {spec.latency_budget:g}s budget")
+        # Reported with the deadline cuts, the results miss this provider
+        deadline.cut(spec.name)
+        places, answered = [], False
+    except Exception as e:
+        print(f"⚠️ {spec.name} failed: {e}")
+        places, answered = [], False
+    provider_stats.record(spec.name, *stats_key, time.monotonic() - started, len(places))
+    return spec.name, places, answered
+
+
+def expansion_rings(radius: int, max_radius: int) -> List[int]:
+    """Radii of an expanding search: radius, radius * EXPAND_FACTOR, ... capped at max_radius"""
+    rings = [min(radius, max_radius)]
+    while rings[-1] < max_radius:
+        rings.append(min(rings[-1] * EXPAND_FACTOR, max_radius))
+    return rings
+
+
+def _good_places(places: List[Dict]) -> int:
+    """Number of distinct, named places with coordinates"""
+    return sum(
+        1 for place in resolve_entities(places)
+        if place.get("name") and place.get("name") != "Unknown" and place_coords(place)
+    )
+
+
+def _outside(place: Dict, lat: float, lon: float, inner_radius: int) -> bool:
+    """Whether a place lies beyond inner_radius (places without coordinates are kept)"""
+    coords = place_coords(place)
+    return coords is None or haversine_m(lat, lon, *coords) > inner_radius
+
+
+async def _search_ring(
+    client: httpx.AsyncClient,
+    lat: float,
+    lon: float,
+    radius: int,
+    inner_radius: int,
+    place_type: str,
+    limit: int,
+    specs: Dict[str, Tuple[ProviderSpec, Optional[str]]],
+    waves: Tuple[List[str], List[str]],
+    deadline: Deadline,
+    stats_key: Tuple[str, str]
+) -> Tuple[List[Dict], bool]:
+    """
+    Places between inner_radius and radius from every wave that's needed
+    
+    Ring-capable providers only query the ring; the results of the others
+    are cut to it here, since the inner part was covered already.
+    
+    Returns:
+        (places, whether some provider may have had more than it returned:
+        it hit the limit, failed or was dropped)
+    """
+    all_places = []
+    partial = False
+    for wave_index, wave in enumerate(waves):
+        if not wave:
+            continue
+        if wave_index > 0:
+            if len(resolve_entities(all_places)) >= limit:
+                break
+            if deadline.expired():
+                deadline.cut("second_wave")
+                break
+            print(f"➕ Not enough places yet, asking {wave}")
         
-        places = []
-        for place in data.get("results", []):
-            places.append({
-                "name": place.get("name"),
-                "lat": place["geometry"]["location"]["lat"],
-                "lon": place["geometry"]["location"]["lng"],
-                "rating": place.get("rating", "N/A"),
-                "user_ratings_total": place.get("user_ratings_total", 0),
-                "price_level": place.get("price_level", "N/A"),
-                "address": place.get("vicinity", ""),
-                "types": place.get("types", []),
-                "phone": "N/A",
-                "website": "N/A",
-                "opening_hours": "N/A",
-                "source": "Google Places"
-            })
+        # Fan out: every provider of the wave runs at the same time on the shared client
+        pending = []
+        for spec, api_key in (specs[name] for name in wave):
+            if inner_radius and spec.rings:
+                coro = spec.fetch(client, lat, lon, radius, place_type, limit, api_key, inner_radius=inner_radius)
+            else:
+                coro = spec.fetch(client, lat, lon, radius, place_type, limit, api_key)
+            pending.append(_run_provider(spec, coro, deadline, stats_key))
         
-        return places
+        # Collect results as they arrive
+        for finished in asyncio.as_completed(pending):
+            name, places, answered = await finished
+            partial = partial or not answered or (len(places) >= limit and not specs[name][0].uncapped)
+            if inner_radius and not specs[name][0].rings:
+                places = [place for place in places if _outside(place, lat, lon, inner_radius)]
+            print(f"✅ {name}: Found {len(places)} places")
+            all_places.extend(places)
+    return all_places, partial
+
+
+async def search_places_async(
+    lat: float,
+    lon: float,
+    radius: int = 500,
+    place_type: str = "restaurant",
+    limit: int = 20,
+    use_google: bool = False,
+    google_api_key: Optional[str] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    providers: Optional[List[str]] = None,
+    max_cost: Optional[float] = None,
+    deadline: Optional[Deadline] = None,
+    expand: bool = False,
+    max_radius: int = EXPAND_MAX_RADIUS
+) -> List[Dict]:
+    """
+    Query the selected providers concurrently and merge results as they arrive
     
-    except Exception as e:
-        print(f"❌ Google Places Error: {e}")
-        return []
+    Every provider runs under its own latency budget, so adding coverage
+    never makes the search slower than the slowest budget. Unless providers
+    are named explicitly, the observed per-category/per-region stats decide
+    which providers run first; the rest only run if the first wave comes
+    up short of limit.
+    
+    With expand=True, radius is only the first ring: the search widens
+    (x EXPAND_FACTOR) until limit good places are found or max_radius is
+    reached, and each step only asks for the new ring, so sparse areas
+    get results without dense areas paying for a big radius.
+    
+    Results are kept in query_cache: a search inside the circle of an
+    earlier one (same providers, same normalized place type) is answered
+    from it without touching the network.
+    
+    Args:
+        lat: Latitude
+        lon: Longitude
+        radius: Search radius in meters (the starting radius when expanding)
+        place_type: Type of place (restaurant, cafe, museum, park, etc.)
+        limit: Maximum number of results
+        use_google: Whether to use Google Places API (requires API key)
+        google_api_key: Google Places API key (optional)
+        client: Shared async HTTP client (a new one is created if omitted)
+        providers: Provider names to query (None = every configured default provider)
+        max_cost: Skip providers costing more per 1000 requests
+        deadline: Overall time budget; providers still running when it
+            expires are dropped and recorded in deadline.truncated
+        expand: Widen the radius in rings until limit places are found
+        max_radius: Largest radius an expanding search goes to
+    
+    Returns:
+        List of places with combined results from multiple sources
+    """
+    if client is None:
+        async with _new_client() as own_client:
+            return await search_places_async(
+                lat, lon, radius, place_type, limit, use_google, google_api_key, own_client, providers, max_cost,
+                deadline, expand, max_radius
+            )
+    
+    deadline = deadline or Deadline()
+    place_type = normalize_place_type(place_type, get_place_types())
+    names = providers
+    if names is None and use_google:
+        names = [spec.name for spec in PROVIDERS.values() if not spec.opt_in] + ["Google Places"]
+    api_keys = {"Google Places": google_api_key} if google_api_key else {}
+    selected = select_providers(place_type, names, api_keys, max_cost)
+    
+    # Plan: providers that reached `limit` fastest here before go first
+    stats_key = (place_type, region_for(lat, lon))
+    specs = {spec.name: (spec, api_key) for spec, api_key in selected}
+    if providers is None:
+        waves = provider_stats.plan(list(specs), *stats_key, limit)
+    else:
+        waves = (list(specs), [])
+    
+    rings = expansion_rings(radius, max_radius) if expand else [radius]
+    scope = "places_api:" + ",".join(sorted(specs))
+    
+    # Cached searches containing ours answer it; when expanding, every ring
+    # they cover is skipped
+    all_places = []
+    inner_radius = 0
+    for ring in rings:
+        cached = query_cache.get(scope, place_type, lat, lon, ring, limit)
+        if cached is None:
+            break
+        all_places = cached["places"]
+        radius = inner_radius = ring
+        if not expand or _good_places(all_places) >= limit or ring == rings[-1]:
+            return rank_places(all_places, lat, lon, radius, limit, [place_type])
+    
+    cuts_before = len(deadline.truncated)
+    partial = False
+    for ring in rings:
+        if ring <= inner_radius:
+            continue
+        if inner_radius:
+            if _good_places(all_places) >= limit:
+                break
+            if deadline.expired():
+                deadline.cut("expansion")
+                break
+            print(f"🔍 Only {_good_places(all_places)} places within {inner_radius}m, widening to {ring}m")
+        ring_places, ring_partial = await _search_ring(
+            client, lat, lon, ring, inner_radius, place_type, limit, specs, waves, deadline, stats_key
+        )
+        all_places.extend(ring_places)
+        partial = partial or ring_partial
+        radius = inner_radius = ring
+    
+    # Merge records of the same real place across providers
+    unique_places = resolve_entities(all_places)
+    query_cache.set(
+        scope, place_type, lat, lon, radius, {"places": unique_places},
+        complete=not partial and len(deadline.truncated) == cuts_before, limit=limit
+    )
+    
+    # Rank by distance, rating, reviews and category (vectorized, top-k only)
+    return rank_places(unique_places, lat, lon, radius, limit, [place_type])
 
 
-# ============================================================
-# 4. UNIVERSAL SEARCH FUNCTION
-# ============================================================
 def search_places(
     lat: float,
     lon: float,
@@ -180,75 +843,44 @@ def search_places(
     place_type: str = "restaurant",
     limit: int = 20,
     use_google: bool = False,
-    google_api_key: Optional[str] = None
+    google_api_key: Optional[str] = None,
+    providers: Optional[List[str]] = None,
+    deadline_ms: Optional[int] = None,
+    expand: bool = False,
+    max_radius: int = EXPAND_MAX_RADIUS
 ) -> List[Dict]:
     """
     Universal function to search for places using multiple APIs
     
+    All providers are queried concurrently (see search_places_async), so the
+    latency is bounded by the slowest provider instead of their sum.
+    
     Args:
         lat: Latitude
         lon: Longitude
-        radius: Search radius in meters
-        place_type: Type of place (restaurant, cafe, bar, museum, park, etc.)
+        radius: Search radius in meters (the starting radius when expanding)
+        place_type: Type of place (restaurant, cafe, museum, park, etc.)
         limit: Maximum number of results
         use_google: Whether to use Google Places API (requires API key)
         google_api_key: Google Places API key (optional)
+        providers: Provider names to query (None = every configured default provider)
+        deadline_ms: Time budget; whatever arrived by then is returned
+        expand: Start at radius and widen in rings until limit places are found
+        max_radius: Largest radius an expanding search goes to
     
     Returns:
         List of places with combined results from multiple sources
     """
-    all_places = []
-    
-    # Try OpenStreetMap Overpass API first (no API key needed)
-    try:
-        osm_places = find_places_osm(lat, lon, radius, place_type)
-        all_places.extend(osm_places)
-        print(f"✅ OSM: Found {len(osm_places)} places")
-    except Exception as e:
-        print(f"⚠️ OSM failed: {e}")
-    
-    # Try Nominatim API (no API key needed)
-    if len(all_places) < limit:
-        try:
-            time.sleep(1)  # Rate limiting
-            nominatim_places = find_places_nominatim(lat, lon, place_type, limit)
-            all_places.extend(nominatim_places)
-            print(f"✅ Nominatim: Found {len(nominatim_places)} places")
-        except Exception as e:
-            print(f"⚠️ Nominatim failed: {e}")
-    
-    # Try Google Places API if enabled and API key provided
-    if use_google and google_api_key and len(all_places) < limit:
-        try:
-            time.sleep(0.5)
-            google_places = find_places_google(lat, lon, radius, place_type, google_api_key)
-            all_places.extend(google_places)
-            print(f"✅ Google Places: Found {len(google_places)} places")
-        except Exception as e:
-            print(f"⚠️ Google Places failed: {e}")
-    
-    # Remove duplicates based on name and location
-    unique_places = []
-    seen = set()
-    
-    for place in all_places:
-        key = (place["name"], round(place["lat"], 4), round(place["lon"], 4))
-        if key not in seen:
-            seen.add(key)
-            unique_places.append(place)
-    
-    # Sort by rating if available
-    def get_rating(place):
-        rating = place.get("rating", "N/A")
-        return float(rating) if rating != "N/A" else 0
-    
-    unique_places.sort(key=get_rating, reverse=True)
-    
-    return unique_places[:limit]
+    return asyncio.run(
+        search_places_async(
+            lat, lon, radius, place_type, limit, use_google, google_api_key,
+            providers=providers, deadline=Deadline(deadline_ms), expand=expand, max_radius=max_radius
+        )
+    )
 
 
 # ============================================================
-# 5. HELPER FUNCTIONS
+# 10. HELPER FUNCTIONS
 # ============================================================
 def get_place_types():
     """
@@ -306,7 +938,7 @@ def format_place_for_display(place: Dict) -> str:
 
 
 # ============================================================
-# 6. TESTING FUNCTION
+# 11. TESTING FUNCTION
 # ============================================================
 def test_search():
     """Test the search functionality"""
@@ -329,8 +961,6 @@ def test_search():
             print(f"{i}.")
             print(format_place_for_display(place))
             print()
-        
-        time.sleep(2)  # Rate limiting
 
 
 if __name__ == "__main__":
@@ -0,0 +1,159 @@
+import os
+import random
+import threading
+import time
+from cachetools import TTLCache
+from typing import Dict, List, Optional, Tuple
+from geo import tile_for
+from sqlite_cache import SqliteCache
+
+PROVIDER_STATS_PATH = os.getenv("PROVIDER_STATS_PATH", os.path.join("cache", "provider_stats.sqlite3"))
+PROVIDER_STATS_TTL = 90 * 86400
+# Re-read averages from SQLite this often to pick up other workers' observations
+PROVIDER_STATS_REFRESH = 60
+PROVIDER_STATS_MEMORY_SIZE = 4096
+
+# Regions are zoom-8 tiles (~100 km across in central Europe)
+REGION_ZOOM = 8
+# Weight of the newest observation in the moving averages
+EWMA_ALPHA = 0.3
+# Below this many observations a provider is always tried (exploration)
+MIN_SAMPLES = 3
+# Plan for more results than needed: providers overlap after merging
+YIELD_MARGIN = 1.5
+# Share of plans that move the least-observed fallback provider into the
+# first wave, so fallbacks keep getting fresh samples
+EXPLORE_RATE = 0.1
+
+
+def region_for(lat: float, lon: float) -> str:
+    """Coarse region key of a search centre"""
+    x, y = tile_for(lat, lon, REGION_ZOOM)
+    return f"{REGION_ZOOM}/{x}/{y}"
+
+
+class ProviderStats:
+    """
+    Observed latency and yield per (provider, category, region)
+
+    Kept as exponentially weighted moving averages in SQLite (updated in
+    place by each worker, so they survive restarts and combine every
+    worker's observations) and cached in memory for plan() for
+    PROVIDER_STATS_REFRESH seconds.
+    Used by plan() to decide which providers to query first.
+    """
+
+    def __init__(
+        self,
+        store: SqliteCache,
+        refresh: float = PROVIDER_STATS_REFRESH,
+        explore_rate: float = EXPLORE_RATE,
+        timer=time.monotonic
+    ):
+        self.store = store
+        self.explore_rate = explore_rate
+        self._memory = TTLCache(maxsize=PROVIDER_STATS_MEMORY_SIZE, ttl=refresh, timer=timer)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(provider: str, category: str, region: str) -> str:
+        return f"{provider}|{category}|{region}"
+
+    def get(self, provider: str, category: str, region: str) -> Optional[Dict]:
+        """{"latency", "yield", "samples"} or None if never observed"""
+        key = self._key(provider, category, region)
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is None:
+            entry = self.store.get(key)
+            if entry is not None:
+                with self._lock:
+                    self._memory[key] = entry
+        return entry
+
+    def record(self, provider: str, category: str, region: str, latency: float, count: int):
+        """Add one observation: how long the provider took and how many places it returned"""
+        key = self._key(provider, category, region)
+
+        def observe(previous: Optional[Dict]) -> Dict:
+            if previous is None:
+                return {"latency": latency, "yield": float(count), "samples": 1}
+            return {
+                "latency": (1 - EWMA_ALPHA) * previous["latency"] + EWMA_ALPHA * latency,
+                "yield": (1 - EWMA_ALPHA) * previous["yield"] + EWMA_ALPHA * count,
+                "samples": previous["samples"] + 1
+            }
+
+        # Re-read and update the row in one transaction, so observations
+        # recorded by other workers in the meantime aren't overwritten
+        entry = self.store.update(key, observe)
+        if entry is None:
+            # Store unavailable: keep this worker's average going
+            entry = observe(self.get(provider, category, region))
+        with self._lock:
+            self._memory[key] = entry
+
+    def plan(
+        self,
+        providers: List[str],
+        category: str,
+        region: str,
+        limit: int
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Split providers into a first wave and a fallback wave
+
+        Providers are ordered by expected places per second. The first wave
+        takes providers in that order until their expected yield covers
+        limit (with a margin); providers with too few observations always
+        go in the first wave so their stats get filled in. Once in a while
+        (explore_rate) the least-observed fallback joins the first wave too.
+
+        Args:
+            providers: Provider names
+            category: Place type searched for
+            region: region_for() of the search centre
+            limit: Number of places wanted
+
+        Returns:
+            (first wave names, second wave names)
+        """
+        scored = []
+        samples = {}
+        for name in providers:
+            entry = self.get(name, category, region)
+            samples[name] = entry["samples"] if entry else 0
+            if entry is None or entry["samples"] < MIN_SAMPLES:
+                scored.append((name, None, None))
+            else:
+                scored.append((name, entry["latency"], entry["yield"]))
+
+        first, second = [], []
+        expected = 0.0
+        known = sorted(
+            (item for item in scored if item[1] is not None),
+            key=lambda item: item[2] / max(item[1], 0.05),
+            reverse=True
+        )
+        for name, latency, expected_yield in scored:
+            if latency is None:
+                first.append(name)
+        for name, latency, expected_yield in known:
+            if expected < limit * YIELD_MARGIN and expected_yield > 0:
+                first.append(name)
+                expected += expected_yield
+            else:
+                second.append(name)
+
+        # Nothing looks promising: ask everyone
+        if not first:
+            return second, []
+
+        if second and random.random() < self.explore_rate:
+            explored = min(second, key=samples.get)
+            second.remove(explored)
+            first.append(explored)
+        return first, second
+
+
+provider_stats = ProviderStats(SqliteCache(PROVIDER_STATS_PATH, table="provider_stats", ttl=PROVIDER_STATS_TTL))
@@ -0,0 +1,234 @@
+import os
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+from geo import haversine_m, tile_for
+from entity_resolution import place_coords
+from sqlite_cache import SqliteCache
+
+QUERY_CACHE_PATH = os.getenv("QUERY_CACHE_PATH", os.path.join("cache", "place_queries.sqlite3"))
+QUERY_CACHE_TTL = 6 * 3600
+
+# Entries are bucketed by the zoom-11 tile of their centre (~13 km across in
+# central Europe); a lookup checks its own tile and the 8 around it, so any
+# search up to MAX_CACHED_RADIUS can be found by the searches it contains
+BUCKET_ZOOM = 11
+MAX_CACHED_RADIUS = 5000
+MAX_ENTRIES_PER_BUCKET = 20
+# Incomplete results only answer the same search (centre this close)
+SAME_CENTRE_M = 25
+
+# Spellings people use for the types in get_place_types()
+TYPE_SYNONYMS = {
+    "coffee": "cafe",
+    "coffee_shop": "cafe",
+    "coffeehouse": "cafe",
+    "kaviaren": "cafe",
+    "restaurace": "restaurant",
+    "restauracia": "restaurant",
+    "eatery": "restaurant",
+    "diner": "restaurant",
+    "burger": "fast_food",
+    "fastfood": "fast_food",
+    "theater": "theatre",
+    "movie_theater": "cinema",
+    "movies": "cinema",
+    "art_gallery": "gallery",
+    "supermarket": "market",
+    "store": "shop",
+    "motel": "hotel",
+    "guesthouse": "guest_house",
+    "hospital_emergency": "hospital",
+    "drugstore": "pharmacy",
+    "chemist": "pharmacy",
+    "club": "nightclub",
+    "railway_station": "train_station",
+    "bus_stop": "bus_station",
+}
+
+
+def fold_text(text: str) -> str:
+    """Lowercase, strip diacritics and join words with "_" ("Café Bar" -> "cafe_bar")"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    plain = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return "_".join(plain.lower().replace("-", " ").split())
+
+
+def normalize_place_type(place_type: str, place_types: Dict[str, List[str]]) -> str:
+    """
+    Canonical spelling of a place type
+
+    Folds case and diacritics, maps synonyms and plurals onto the types of
+    get_place_types() ("Café", "cafes", "coffee shop" -> "cafe"). A trailing
+    "s"/"es" is only dropped when what's left is a known type or synonym, so
+    unknown types are returned folded as they are ("bus" stays "bus").
+
+    Args:
+        place_type: Place type as typed by the user
+        place_types: get_place_types() of the caller
+    """
+    known = {name for names in place_types.values() for name in names}
+
+    def canonical(name: str) -> Optional[str]:
+        if name in known:
+            return name
+        return TYPE_SYNONYMS.get(name)
+
+    folded = fold_text(place_type)
+    exact = canonical(folded)
+    if exact:
+        return exact
+    singulars = []
+    if folded.endswith("es") and len(folded) > 3:
+        singulars.append(folded[:-2])
+    if folded.endswith("s") and len(folded) > 2:
+        singulars.append(folded[:-1])
+    for singular in singulars:
+        match = canonical(singular)
+        if match:
+            return match
+    return folded
+
+
+class QueryCache:
+    """
+    Cache of place search results that also answers contained searches
+
+    A search covers a circle. Any later search whose circle lies inside a
+    cached one (same scope and place type) is answered by filtering the
+    cached places by distance instead of going back to the providers.
+    This only holds for complete results (nothing capped by a limit or
+    cut by a deadline); incomplete ones are reused for the same search only.
+
+    Entries live in SQLite, so they survive restarts and are shared by workers.
+    """
+
+    def __init__(self, store: SqliteCache):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _bucket(scope: str, place_type: str, x: int, y: int) -> str:
+        return f"{scope}|{place_type}|{BUCKET_ZOOM}/{x}/{y}"
+
+    @staticmethod
+    def _filter(places: Iterable[Dict], lat: float, lon: float, radius: float) -> List[Dict]:
+        """Places within radius of the point (places without coordinates are dropped)"""
+        kept = []
+        for place in places:
+            coords = place_coords(place)
+            if coords and haversine_m(lat, lon, *coords) <= radius:
+                kept.append(place)
+        return kept
+
+    def get(
+        self,
+        scope: str,
+        place_type: str,
+        lat: float,
+        lon: float,
+        radius: float,
+        limit: Optional[int] = None
+    ) -> Optional[Dict[str, List[Dict]]]:
+        """
+        Cached results for a search, filtered down to its circle
+
+        Args:
+            scope: What produced the results (endpoint, provider set, ...)
+            place_type: normalize_place_type() of the searched type
+            lat: Latitude
+            lon: Longitude
+            radius: Search radius in meters
+            limit: Results the caller needs (incomplete entries must have had as many)
+
+        Returns:
+            {group: [place dicts]} in the shape they were stored, or None on a miss
+        """
+        now = time.time()
+        x, y = tile_for(lat, lon, BUCKET_ZOOM)
+        best = None
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for entry in self.store.get(self._bucket(scope, place_type, x + dx, y + dy)) or []:
+                    if entry["expires"] < now:
+                        continue
+                    distance = haversine_m(lat, lon, entry["lat"], entry["lon"])
+                    if entry["complete"]:
+                        usable = distance + radius <= entry["radius"]
+                    else:
+                        usable = (
+                            distance <= SAME_CENTRE_M
+                            and radius == entry["radius"]
+                            and (entry["limit"] is None or (limit is not None and limit <= entry["limit"]))
+                        )
+                    # Prefer the tightest fit: least filtering work
+                    if usable and (best is None or entry["radius"] < best["radius"]):
+                        best = entry
+
+        if best is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        print(f"♻️ Query cache: {place_type} within {radius}m answered from a {best['radius']}m search")
+        return {
+            group: self._filter(places, lat, lon, radius)
+            for group, places in best["results"].items()
+        }
+
+    def set(
+        self,
+        scope: str,
+        place_type: str,
+        lat: float,
+        lon: float,
+        radius: float,
+        results: Dict[str, List[Dict]],
+        complete: bool,
+        limit: Optional[int] = None
+    ):
+        """
+        Store the results of a search
+
+        Args:
+            scope: What produced the results (endpoint, provider set, ...)
+            place_type: normalize_place_type() of the searched type
+            lat: Latitude
+            lon: Longitude
+            radius: Search radius in meters
+            results: {group: [JSON-serializable place dicts]}
+            complete: Every place in the circle is included (nothing capped or cut)
+            limit: Results the search was capped at
+        """
+        if radius > MAX_CACHED_RADIUS:
+            return
+        x, y = tile_for(lat, lon, BUCKET_ZOOM)
+        key = self._bucket(scope, place_type, x, y)
+        now = time.time()
+        entry = {
+            "lat": lat,
+            "lon": lon,
+            "radius": radius,
+            "limit": limit,
+            "complete": complete,
+            "results": results,
+            "expires": now + QUERY_CACHE_TTL
+        }
+
+        def merge(stored: Optional[List[Dict]]) -> List[Dict]:
+            entries = [entry]
+            for other in stored or []:
+                if other["expires"] < now:
+                    continue
+                # Searches the new one contains are redundant now
+                if complete and haversine_m(lat, lon, other["lat"], other["lon"]) + other["radius"] <= radius:
+                    continue
+                entries.append(other)
+            return entries[:MAX_ENTRIES_PER_BUCKET]
+
+        # Read and write the bucket in one transaction: workers storing into
+        # the same bucket at once would otherwise drop each other's entries
+        self.store.update(key, merge)
+
+
+query_cache = QueryCache(SqliteCache(QUERY_CACHE_PATH, table="place_queries", ttl=QUERY_CACHE_TTL))
@@ -0,0 +1,195 @@
+import math
+import numpy as np
+from typing import Iterable, List, Optional, Sequence
+from geo import EARTH_RADIUS_M
+from entity_resolution import place_coords
+from overpass import place_type_to_tag
+
+# Score = weighted sum of components that are all scaled to 0.0-1.0
+DISTANCE_WEIGHT = 0.40
+RATING_WEIGHT = 0.35
+REVIEWS_WEIGHT = 0.10
+CATEGORY_WEIGHT = 0.15
+
+# Unrated places (all of OSM) get this rating instead of sinking to the bottom;
+# rated ones are pulled towards it until they have enough reviews
+RATING_PRIOR = 3.5
+RATING_PRIOR_WEIGHT = 10
+# Review counts saturate here (log scale)
+REVIEWS_SATURATION = 1000
+
+
+# ============================================================
+# 1. VECTORIZED DISTANCES
+# ============================================================
+def haversine_m_many(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Great-circle distances from one point to many points in one pass
+
+    Returns:
+        Distances in meters (NaN where the input is NaN)
+    """
+    phi1 = math.radians(lat)
+    phi2 = np.radians(lats)
+    dphi = phi2 - phi1
+    dlmb = np.radians(lons - lon)
+    a = np.sin(dphi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+# ============================================================
+# 2. FEATURES
+# ============================================================
+def _rating_of(place) -> float:
+    """Numeric rating of a Place or place dict (NaN if unknown)"""
+    rating = getattr(place, "rating", None)
+    if isinstance(rating, float):
+        return rating
+    rating = place.get("rating")
+    try:
+        return float(rating)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _reviews_of(place) -> int:
+    reviews = getattr(place, "user_ratings_total", None)
+    if reviews is None:
+        reviews = place.get("user_ratings_total")
+    try:
+        return int(reviews or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _category_terms(categories: Iterable[str]) -> tuple:
+    """Requested categories as bare types ("cafe") and OSM tags ("amenity=cafe")"""
+    types, tags = set(), set()
+    for category in categories:
+        category = (category or "").strip().lower()
+        if not category:
+            continue
+        if "=" in category:
+            tags.add(category)
+            types.add(category.partition("=")[2])
+        else:
+            types.add(category)
+            tags.add(place_type_to_tag(category))
+    return types, tags
+
+
+def _matches_category(place, types: set, tags: set) -> bool:
+    """
+    Whether a place belongs to one of the requested categories
+
+    Every provider's fields are checked (OSM tags, query category, Google
+    types, ...), so a matching place gets the same credit whoever returned it.
+    """
+    if hasattr(place, "matches") and any(place.matches(tag) for tag in tags):
+        return True
+    category = place.get("category")
+    if isinstance(category, str) and (category in tags or category.lower().replace(" ", "_") in types):
+        return True
+    if place.get("type") in types:
+        return True
+    return bool(types.intersection(place.get("types") or ()))
+
+
+# ============================================================
+# 3. RANKING
+# ============================================================
+def score_places(
+    places: Sequence,
+    lat: float,
+    lon: float,
+    radius: float,
+    categories: Optional[Iterable[str]] = None
+) -> np.ndarray:
+    """
+    Relevance score of every place, higher is better
+
+    Combines distance from the search centre, a review-weighted rating,
+    the number of reviews and whether the place matches a requested
+    category. Places without coordinates get no distance credit.
+
+    Returns:
+        One score per place
+    """
+    count = len(places)
+    lats = np.full(count, np.nan)
+    lons = np.full(count, np.nan)
+    ratings = np.full(count, np.nan)
+    reviews = np.zeros(count)
+    for i, place in enumerate(places):
+        coords = place_coords(place)
+        if coords:
+            lats[i], lons[i] = coords
+        ratings[i] = _rating_of(place)
+        reviews[i] = _reviews_of(place)
+
+    # Distance: 1.0 at the centre, 0.5 at the radius, smoothly decaying beyond
+    distances = haversine_m_many(lat, lon, lats, lons)
+    distance_score = np.nan_to_num(1.0 / (1.0 + distances / max(radius, 1.0)), nan=0.0)
+
+    # Rating: Bayesian average towards the prior, scaled from 1-5 to 0-1
+    rated = ~np.isnan(ratings)
+    weight = np.where(rated, reviews, 0.0)
+    average = (np.where(rated, ratings, 0.0) * weight + RATING_PRIOR * RATING_PRIOR_WEIGHT) / (weight + RATING_PRIOR_WEIGHT)
+    # A rating without a review count still counts as one review
+    average = np.where(rated & (reviews == 0), (ratings + RATING_PRIOR * RATING_PRIOR_WEIGHT) / (1 + RATING_PRIOR_WEIGHT), average)
+    rating_score = np.clip((average - 1.0) / 4.0, 0.0, 1.0)
+
+    reviews_score = np.minimum(np.log1p(reviews) / math.log1p(REVIEWS_SATURATION), 1.0)
+
+    category_score = np.zeros(count)
+    if categories:
+        types, tags = _category_terms(categories)
+        category_score = np.fromiter(
+            (1.0 if _matches_category(place, types, tags) else 0.0 for place in places),
+            dtype=float,
+            count=count
+        )
+
+    return (
+        DISTANCE_WEIGHT * distance_score
+        + RATING_WEIGHT * rating_score
+        + REVIEWS_WEIGHT * reviews_score
+        + CATEGORY_WEIGHT * category_score
+    )
+
+
+def rank_places(
+    places: Sequence,
+    lat: float,
+    lon: float,
+    radius: float,
+    limit: int,
+    categories: Optional[Iterable[str]] = None
+) -> List:
+    """
+    Best `limit` places, best first
+
+    Only the top-k are sorted: np.argpartition selects them in O(n), so
+    large candidate sets never pay for a full sort.
+
+    Args:
+        places: Place records or place dicts from any provider
+        lat: Search centre latitude
+        lon: Search centre longitude
+        radius: Search radius in meters
+        limit: Number of places to return
+        categories: Requested place types or "key=value" OSM tags
+
+    Returns:
+        Up to `limit` places
+    """
+    if not places or limit <= 0:
+        return []
+    scores = score_places(places, lat, lon, radius, categories)
+    if limit < len(places):
+        top = np.argpartition(-scores, limit - 1)[:limit]
+    else:
+        top = np.arange(len(places))
+    # Stable tie-break on the original order
+    top = top[np.lexsort((top, -scores[top]))]
+    return [places[i] for i in top]
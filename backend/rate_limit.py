@@ -0,0 +1,197 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Tuple
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# ============================================================
+# 1. PROVIDER POLICIES
+# ============================================================
+# provider: (tokens per second, burst size)
+PROVIDER_POLICIES: Dict[str, Tuple[float, int]] = {
+    "nominatim": (1.0, 1),   # Nominatim usage policy: max 1 request per second
+    "overpass": (1.0, 2),    # overpass-api.de gives ~2 query slots per IP
+    "google": (10.0, 10),    # Google Places allows far more, keep bursts sane
+    "foursquare": (10.0, 10),
+    "opentripmap": (5.0, 5),
+    "here": (5.0, 5),
+    "yelp": (5.0, 5),
+}
+
+# Reservations are queued at most this far ahead; callers beyond that wait
+# for the queue to drain before reserving (bounds the debt a burst of
+# abandoned requests can leave behind)
+MAX_QUEUE_SECONDS = 30.0
+
+# Bucket state lives in small files so every uvicorn worker shares it
+STATE_DIR = os.getenv(
+    "RATE_LIMIT_DIR",
+    os.path.join(tempfile.gettempdir(), "tripplanner-ratelimit")
+)
+
+
+# ============================================================
+# 2. FILE LOCK (works across threads and processes)
+# ============================================================
+class _FileLock:
+    """Exclusive lock on an open file, using flock on POSIX and msvcrt on Windows"""
+
+    def __init__(self, handle):
+        self.handle = handle
+
+    def __enter__(self):
+        if fcntl:
+            fcntl.flock(self.handle.fileno(), fcntl.LOCK_EX)
+        else:
+            self.handle.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self.handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10s, keep waiting
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+        else:
+            self.handle.seek(0)
+            msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# ============================================================
+# 3. TOKEN BUCKET
+# ============================================================
+class TokenBucket:
+    """
+    Token bucket whose state is stored in a file shared by all processes
+
+    A caller reserves a token under the file lock and is told how long to
+    wait for it; the actual waiting happens outside the lock, so requests
+    are spaced exactly as the provider policy needs and never serialized
+    behind each other's sleeps. A caller cancelled while waiting gives its
+    token back, and the balance never drops below MAX_QUEUE_SECONDS worth
+    of queued reservations.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, state_dir: str = STATE_DIR):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        os.makedirs(state_dir, exist_ok=True)
+        self.path = os.path.join(state_dir, f"{name}.json")
+        self._thread_lock = threading.Lock()
+
+    def _update(self, change: Callable[[float], float]) -> float:
+        """Refill the bucket, apply change(tokens) under the file lock, return the new balance"""
+        with self._thread_lock, open(self.path, "a+") as handle, _FileLock(handle):
+            handle.seek(0)
+            try:
+                state = json.loads(handle.read() or "{}")
+            except ValueError:
+                state = {}
+
+            now = time.time()
+            tokens = state.get("tokens", float(self.burst))
+            updated = state.get("updated", now)
+            tokens = change(min(float(self.burst), tokens + max(0.0, now - updated) * self.rate))
+
+            handle.seek(0)
+            handle.truncate()
+            handle.write(json.dumps({"tokens": tokens, "updated": now}))
+            handle.flush()
+        return tokens
+
+    def reserve(self) -> Tuple[bool, float]:
+        """
+        Take one token from the bucket, unless the reservation queue is full
+
+        Returns:
+            (taken, seconds): if taken, how long the caller must wait before
+            sending its request; if not, how long until it can try again
+        """
+        floor = -self.rate * MAX_QUEUE_SECONDS
+        taken = False
+
+        def take(tokens: float) -> float:
+            nonlocal taken
+            # May go negative = queued reservation, but not past the floor
+            if tokens - 1.0 < floor:
+                return tokens
+            taken = True
+            return tokens - 1.0
+
+        tokens = self._update(take)
+        if not taken:
+            return False, (floor + 1.0 - tokens) / self.rate
+        return True, 0.0 if tokens >= 0 else -tokens / self.rate
+
+    def release(self):
+        """Give back a reserved token whose request was never sent"""
+        self._update(lambda tokens: min(float(self.burst), tokens + 1.0))
+
+    def acquire(self):
+        """Block the calling thread until a token is available"""
+        while True:
+            taken, wait = self.reserve()
+            if wait > 0:
+                time.sleep(wait)
+            if taken:
+                return
+
+    async def acquire_async(self):
+        """Wait for a token without blocking the event loop (refunded if cancelled)"""
+        while True:
+            reservation = asyncio.ensure_future(asyncio.to_thread(self.reserve))
+            try:
+                taken, wait = await asyncio.shield(reservation)
+            except asyncio.CancelledError:
+                # The reservation still completes in its thread, refund it then
+                reservation.add_done_callback(self._refund_reservation)
+                raise
+            try:
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                if taken:
+                    await asyncio.to_thread(self.release)
+                raise
+            if taken:
+                return
+
+    def _refund_reservation(self, reservation: asyncio.Future):
+        if not reservation.cancelled() and reservation.exception() is None and reservation.result()[0]:
+            threading.Thread(target=self.release, daemon=True).start()
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> TokenBucket:
+    """Get (or create) the shared bucket for a provider"""
+    with _buckets_lock:
+        if provider not in _buckets:
+            rate, burst = PROVIDER_POLICIES[provider]
+            _buckets[provider] = TokenBucket(provider, rate, burst)
+        return _buckets[provider]
+
+
+def acquire(provider: str):
+    """Wait (blocking) until a request to the provider is allowed"""
+    get_limiter(provider).acquire()
+
+
+async def acquire_async(provider: str):
+    """Wait (async) until a request to the provider is allowed"""
+    await get_limiter(provider).acquire_async()
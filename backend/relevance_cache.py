@@ -0,0 +1,91 @@
+import atexit
+import os
+import threading
+import time
+from typing import Dict, Optional
+from crawl_frontier import normalize_url
+from sqlite_cache import SqliteCache
+
+RELEVANCE_CACHE_PATH = os.getenv("RELEVANCE_CACHE_PATH", os.path.join("cache", "url_relevance.sqlite3"))
+# Sites change their structure rarely
+RELEVANCE_CACHE_TTL = 30 * 86400
+# Counters are kept much longer than the scores they count
+RELEVANCE_STATS_TTL = 365 * 86400
+# Counts are kept in memory and added to SQLite at most this often
+STATS_FLUSH_INTERVAL = 30
+
+
+class RelevanceCache:
+    """
+    AI relevance scores of URLs per context, shared by every worker
+
+    Keyed by (prompt, context key, normalized URL) so crawling the same
+    site again, for another place or request with the same kind of
+    context, skips the GPT calls. The prompt names the prompt kind and its
+    version ("single-v1", "batch-v1"): scores from a different or reworded
+    prompt aren't reused. Hits, misses and the time spent on GPT for the misses are
+    counted in SQLite as well, so stats() shows what the cache saves
+    across all workers. Each process counts in memory and adds its counts
+    to SQLite every STATS_FLUSH_INTERVAL seconds, so lookups stay reads.
+    """
+
+    def __init__(self, scores: SqliteCache, counters: SqliteCache):
+        self.scores = scores
+        self.counters = counters
+        self._pending: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._flushed = time.monotonic()
+
+    def _count(self, name: str, amount: float = 1):
+        with self._lock:
+            self._pending[name] = self._pending.get(name, 0) + amount
+            due = time.monotonic() - self._flushed >= STATS_FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Add this process's pending counts to the shared counters"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed = time.monotonic()
+        for name, amount in pending.items():
+            self.counters.increment(name, amount)
+
+    @staticmethod
+    def _key(url: str, context_key: str, prompt: str) -> str:
+        return f"{prompt}|{context_key}|{normalize_url(url)}"
+
+    def get(self, url: str, context_key: str, prompt: str) -> Optional[float]:
+        """Cached score, or None (counted as a hit or a miss)"""
+        score = self.scores.get(self._key(url, context_key, prompt))
+        self._count("hits" if score is not None else "misses")
+        return score
+
+    def set(self, url: str, context_key: str, prompt: str, score: float, llm_seconds: float = 0.0):
+        """Store a GPT score; llm_seconds is its share of the GPT call's latency"""
+        self.scores.set(self._key(url, context_key, prompt), score)
+        self._count("llm_seconds", llm_seconds)
+        self._count("llm_scores")
+
+    def stats(self) -> Dict:
+        """Totals across workers, with the GPT time the hits saved (estimated)"""
+        self.flush()
+        hits = self.counters.get("hits") or 0
+        misses = self.counters.get("misses") or 0
+        llm_seconds = self.counters.get("llm_seconds") or 0.0
+        llm_scores = self.counters.get("llm_scores") or 0
+        average = llm_seconds / llm_scores if llm_scores else None
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+            "avg_llm_seconds_per_url": round(average, 3) if average is not None else None,
+            "estimated_llm_seconds_saved": round(hits * average, 1) if average is not None else None
+        }
+
+
+url_relevance_cache = RelevanceCache(
+    SqliteCache(RELEVANCE_CACHE_PATH, table="url_relevance", ttl=RELEVANCE_CACHE_TTL),
+    SqliteCache(RELEVANCE_CACHE_PATH, table="url_relevance_stats", ttl=RELEVANCE_STATS_TTL)
+)
+atexit.register(url_relevance_cache.flush)
@@ -0,0 +1,125 @@
+import math
+from typing import List, Optional, Tuple
+from geo import haversine_m, project_onto_route
+from osm_index import get_local_index
+from overpass import build_polyline_query, fetch_elements, normalize_tags
+from place_record import Place
+from entity_resolution import resolve_entities
+
+# Overpass accepts long around: polylines, but keep queries reasonably small
+MAX_ROUTE_POINTS = 250
+MAX_BUFFER_M = 1000
+
+
+# ============================================================
+# 1. ROUTE HELPERS
+# ============================================================
+def parse_waypoints(waypoints: str) -> List[Tuple[float, float]]:
+    """Parse "lat,lon;lat,lon;..." into [(lat, lon), ...]"""
+    points = []
+    for pair in waypoints.split(";"):
+        if not pair.strip():
+            continue
+        lat, lon = pair.split(",")
+        points.append((float(lat), float(lon)))
+    return points
+
+
+def simplify_route(points: List[Tuple[float, float]], max_points: int = MAX_ROUTE_POINTS) -> List[Tuple[float, float]]:
+    """Evenly thin out a long polyline, always keeping both ends"""
+    if len(points) <= max_points:
+        return points
+    step = (len(points) - 1) / (max_points - 1)
+    return [points[round(i * step)] for i in range(max_points)]
+
+
+def _sample_route(points: List[Tuple[float, float]], spacing: float) -> List[Tuple[float, float]]:
+    """Points along the polyline at most `spacing` meters apart"""
+    samples = [points[0]]
+    for (lat1, lon1), (lat2, lon2) in zip(points, points[1:]):
+        steps = max(1, math.ceil(haversine_m(lat1, lon1, lat2, lon2) / spacing))
+        for i in range(1, steps + 1):
+            samples.append((lat1 + (lat2 - lat1) * i / steps, lon1 + (lon2 - lon1) * i / steps))
+    return samples
+
+
+# ============================================================
+# 2. CORRIDOR SEARCH
+# ============================================================
+def _local_candidates(points: List[Tuple[float, float]], buffer: int, tags: List[str]) -> List[Place]:
+    """Corridor lookup against the local OSM index (circles along the route)"""
+    local_index = get_local_index()
+    # Circles every `buffer` meters with this radius cover the whole corridor
+    radius = buffer * math.sqrt(1.25)
+    seen = set()
+    places = []
+    for lat, lon in _sample_route(points, buffer):
+        for tag in tags:
+            for place in local_index.query(lat, lon, radius, tag):
+                if (id(place), tag) not in seen:
+                    seen.add((id(place), tag))
+                    places.append(place.with_category(tag))
+    return places
+
+
+def _overpass_candidates(points: List[Tuple[float, float]], buffer: int, tags: List[str]) -> List[Place]:
+    """Corridor lookup with a single Overpass around: polyline query (Overpass errors raise)"""
+    elements = fetch_elements(build_polyline_query(simplify_route(points), buffer, tags), raise_errors=True)
+    places = []
+    for element in elements:
+        place = Place.from_osm_element(element)
+        if not place:
+            continue
+        for tag in tags:
+            if place.matches(tag):
+                places.append(place.with_category(tag))
+                break
+    return places
+
+
+def search_along_route(
+    points: List[Tuple[float, float]],
+    buffer: int,
+    tags: List[str],
+    limit: Optional[int] = None
+) -> List[Tuple[Place, float, float]]:
+    """
+    Places within `buffer` meters of a route, in the order they are passed
+
+    One Overpass polyline query (or local-index lookups) replaces a radius
+    search per waypoint, so overlapping circles are never fetched twice.
+    Duplicate records of the same place are merged.
+
+    Args:
+        points: Route as [(lat, lon), ...]
+        buffer: Max distance from the route in meters
+        tags: "key=value" OSM tags to search for
+        limit: Max number of places (the ones closest to the route are kept)
+
+    Returns:
+        [(place, distance along the route, distance from the route), ...]
+
+    Raises:
+        The Overpass error when the corridor query fails (an empty list
+        always means nothing is there)
+    """
+    tags = normalize_tags(tags)
+    if not points or not tags:
+        return []
+    buffer = min(max(int(buffer), 1), MAX_BUFFER_M)
+
+    if get_local_index() is not None:
+        candidates = _local_candidates(points, buffer, tags)
+    else:
+        candidates = _overpass_candidates(points, buffer, tags)
+
+    located = []
+    for place in resolve_entities(candidates):
+        along, offset = project_onto_route(place.lat, place.lon, points)
+        if offset <= buffer:
+            located.append((place, along, offset))
+
+    if limit is not None and len(located) > limit:
+        located = sorted(located, key=lambda item: item[2])[:limit]
+    located.sort(key=lambda item: item[1])
+    return located
@@ -0,0 +1,119 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+class SqliteCache:
+    """
+    Small persistent key/value cache with TTL, stored in SQLite
+
+    Survives restarts and is shared by every worker process that points at
+    the same file (WAL mode lets readers and a writer work concurrently).
+    Values are stored as JSON.
+    """
+
+    def __init__(self, path: str, table: str = "cache", ttl: float = 86400):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections aren't thread-safe)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value, or None if missing or expired"""
+        try:
+            row = self._connect().execute(
+                f"SELECT value, expires FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️ Cache read failed ({self.path}): {e}")
+            return None
+        if not row or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a JSON-serializable value"""
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires)
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️ Cache write failed ({self.path}): {e}")
+
+    def update(self, key: str, fn: Callable[[Optional[Any]], Any], ttl: Optional[float] = None) -> Optional[Any]:
+        """
+        Atomically replace a value with fn(current value)
+
+        The read and the write happen in one BEGIN IMMEDIATE transaction, so
+        concurrent read-modify-writes from other workers can't be lost.
+        fn gets None if the key is missing or expired.
+
+        Returns:
+            The stored value (None if the write failed)
+        """
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    f"SELECT value, expires FROM {self.table} WHERE key = ?", (key,)
+                ).fetchone()
+                current = json.loads(row[0]) if row and row[1] >= now else None
+                value = fn(current)
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires)
+                )
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+            return value
+        except sqlite3.Error as e:
+            print(f"⚠️ Cache write failed ({self.path}): {e}")
+            return None
+
+    def increment(self, key: str, amount: float = 1, ttl: Optional[float] = None):
+        """Atomically add to a numeric value (missing or expired counts as 0)"""
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    f"INSERT INTO {self.table} (key, value, expires) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET "
+                    "value = CASE WHEN expires < ? THEN excluded.value ELSE value + excluded.value END, "
+                    "expires = excluded.expires",
+                    (key, json.dumps(amount), expires, now)
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️ Cache write failed ({self.path}): {e}")
+
+    def purge_expired(self):
+        """Delete expired rows"""
+        with self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE expires < ?", (time.time(),))
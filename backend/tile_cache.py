@@ -0,0 +1,278 @@
+import asyncio
+import os
+import threading
+import httpx
+from cachetools import TTLCache
+from typing import Callable, List, Dict, Optional, Tuple
+from geo import haversine_m, tile_for, tile_bounds, tiles_covering, element_coords
+from osm_index import get_local_index
+from place_record import Place
+from overpass import build_around_query, build_bbox_query, fetch_elements_async, element_matches, OVERPASS_TIMEOUT
+
+# Zoom 16 tiles are ~400 m wide at Košice's latitude
+TILE_ZOOM = 16
+# Larger searches skip the cache and go straight to an around: query
+MAX_TILES_PER_QUERY = 49
+
+TILE_CACHE_SIZE = int(os.getenv("TILE_CACHE_SIZE", "4096"))
+TILE_CACHE_TTL = int(os.getenv("TILE_CACHE_TTL", "3600"))
+
+
+class _FillLoop:
+    """
+    Event loop thread that tile fills run on
+
+    A fill outlives the request that started it: when a provider is
+    dropped over its latency budget (or the caller's asyncio.run ends), the
+    download still completes and lands in the cache for the next search.
+    Fills share one HTTP client owned by this loop.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="tile-fill", daemon=True).start()
+            return self._loop
+
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client for fills (only call from the fill loop)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=OVERPASS_TIMEOUT)
+        return self._client
+
+    async def run(self, coro):
+        """Run coro on the fill loop; cancelling the caller doesn't cancel it"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+
+_fill_loop = _FillLoop()
+
+
+class TileCache:
+    """
+    Overpass results cached per (slippy tile, OSM tag)
+
+    Entries hold compact Place records, not raw Overpass elements.
+    A radius query is answered from every tile its bounding box touches;
+    only tiles that are missing (or expired) are fetched, with a single
+    bbox query covering them. TTLCache gives us both TTL and LRU eviction.
+    Fills run on a background loop (see _FillLoop), so a caller giving up
+    doesn't throw the download away.
+    """
+
+    def __init__(self, maxsize: int = TILE_CACHE_SIZE, ttl: int = TILE_CACHE_TTL, zoom: int = TILE_ZOOM):
+        self.zoom = zoom
+        self._tiles = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key) -> Optional[List[Place]]:
+        with self._lock:
+            return self._tiles.get(key)
+
+    def _put_many(self, items: Dict):
+        with self._lock:
+            for key, elements in items.items():
+                self._tiles[key] = elements
+
+    def _bucket(self, places: List[Place], tiles: List[Tuple[int, int]], tags: List[str]) -> Dict:
+        """Split fetched places into their (tile, tag) entries (empty ones get [])"""
+        buckets = {(self.zoom, x, y, tag): [] for x, y in tiles for tag in tags}
+        for place in places:
+            x, y = tile_for(place.lat, place.lon, self.zoom)
+            for tag in tags:
+                key = (self.zoom, x, y, tag)
+                if key in buckets and place.matches(tag):
+                    buckets[key].append(place)
+        return buckets
+
+    async def _fill(self, bbox: Tuple[float, float, float, float], rectangle: List[Tuple[int, int]], tags: List[str]) -> Dict:
+        """Fetch the tiles of a rectangle and cache them (runs on the fill loop)"""
+        fetched = await fetch_elements_async(_fill_loop.client(), build_bbox_query(bbox, tags), raise_errors=True)
+        buckets = self._bucket(_to_places(fetched), rectangle, tags)
+        self._put_many(buckets)
+        return buckets
+
+    async def query_many_async(
+        self,
+        client: httpx.AsyncClient,
+        lat: float,
+        lon: float,
+        radius: int,
+        tags: List[str],
+        limit_per_tag: Optional[int] = None,
+        inner_radius: int = 0,
+        raise_errors: bool = False
+    ) -> Dict[str, List[Place]]:
+        """
+        Places for several "key=value" tags within radius of a point
+
+        Everything missing from the cache, across all tags, is fetched
+        with a single Overpass union query. With inner_radius only the ring
+        beyond it is returned: the inner tiles are usually cached by an
+        earlier, smaller search, and direct queries subtract the inner
+        circle on the server.
+
+        Args:
+            client: Shared async HTTP client
+            lat: Latitude
+            lon: Longitude
+            radius: Search radius in meters
+            tags: OSM tags in "key=value" form
+            limit_per_tag: For searches too large for the cache, ask the
+                server for at most this many named places per tag (and
+                stop downloading once every tag has them)
+            inner_radius: Skip places this close to the point
+            raise_errors: Raise when Overpass fails instead of answering
+                with whatever the cache had
+
+        Returns:
+            Compact Place records per tag, nearest first
+        """
+        # Offline mode: a loaded OSM extract answers without any network
+        local_index = get_local_index()
+        if local_index is not None:
+            return {
+                tag: self._within(local_index.query(lat, lon, radius, tag), lat, lon, radius, inner_radius)
+                for tag in tags
+            }
+
+        tiles = tiles_covering(lat, lon, radius, self.zoom)
+
+        if len(tiles) > MAX_TILES_PER_QUERY:
+            # Capped per tag on the server, so big radii don't download everything
+            elements = await fetch_elements_async(
+                client,
+                build_around_query(
+                    lat, lon, radius, tags, limit=limit_per_tag, named_only=True, inner_radius=inner_radius
+                ),
+                raise_errors=raise_errors,
+                accept=lambda element: bool((element.get("tags") or {}).get("name")) and element_coords(element) is not None,
+                enough=_per_tag_quota(tags, limit_per_tag) if limit_per_tag else None
+            )
+            places = _to_places(elements)
+            return {
+                tag: self._within([place for place in places if place.matches(tag)], lat, lon, radius, inner_radius)
+                for tag in tags
+            }
+
+        found = {tag: [] for tag in tags}
+        missing_by_tag = {}
+        for tag in tags:
+            for x, y in tiles:
+                cached = self._get((self.zoom, x, y, tag))
+                if cached is None:
+                    missing_by_tag.setdefault(tag, []).append((x, y))
+                    self.misses += 1
+                else:
+                    found[tag].extend(cached)
+                    self.hits += 1
+
+        if missing_by_tag:
+            # One union bbox query over the rectangle spanned by all missing tiles
+            missing_tags = list(missing_by_tag)
+            xs = [x for tag_tiles in missing_by_tag.values() for x, _ in tag_tiles]
+            ys = [y for tag_tiles in missing_by_tag.values() for _, y in tag_tiles]
+            south, west, _, _ = tile_bounds(min(xs), max(ys), self.zoom)
+            _, _, north, east = tile_bounds(max(xs), min(ys), self.zoom)
+            rectangle = [(x, y) for x in range(min(xs), max(xs) + 1) for y in range(min(ys), max(ys) + 1)]
+            try:
+                buckets = await _fill_loop.run(self._fill((south, west, north, east), rectangle, missing_tags))
+            except Exception:
+                # Don't cache failures as empty tiles, answer with what we have
+                if raise_errors:
+                    raise
+                return {tag: self._within(found[tag], lat, lon, radius, inner_radius) for tag in tags}
+
+            for tag, tag_tiles in missing_by_tag.items():
+                for x, y in tag_tiles:
+                    found[tag].extend(buckets[(self.zoom, x, y, tag)])
+
+        return {tag: self._within(found[tag], lat, lon, radius, inner_radius) for tag in tags}
+
+    async def query_async(
+        self,
+        client: httpx.AsyncClient,
+        lat: float,
+        lon: float,
+        radius: int,
+        tag: str,
+        inner_radius: int = 0,
+        raise_errors: bool = False
+    ) -> List[Place]:
+        """Places with a single "key=value" tag within radius of a point, nearest first"""
+        places = await self.query_many_async(
+            client, lat, lon, radius, [tag], inner_radius=inner_radius, raise_errors=raise_errors
+        )
+        return places[tag]
+
+    def query_many(
+        self,
+        lat: float,
+        lon: float,
+        radius: int,
+        tags: List[str],
+        limit_per_tag: Optional[int] = None,
+        timeout: Optional[float] = None,
+        raise_errors: bool = False
+    ) -> Dict[str, List[Place]]:
+        """Blocking wrapper around query_many_async (asyncio.TimeoutError past timeout)"""
+        async def run():
+            async with httpx.AsyncClient(timeout=OVERPASS_TIMEOUT) as client:
+                return await self.query_many_async(
+                    client, lat, lon, radius, tags, limit_per_tag, raise_errors=raise_errors
+                )
+        return asyncio.run(asyncio.wait_for(run(), timeout))
+
+    def query(self, lat: float, lon: float, radius: int, tag: str) -> List[Place]:
+        """Blocking wrapper around query_async"""
+        return self.query_many(lat, lon, radius, [tag])[tag]
+
+    @staticmethod
+    def _within(places: List[Place], lat: float, lon: float, radius: int, inner_radius: int = 0) -> List[Place]:
+        """Keep places inside the circle (outside inner_radius), nearest first"""
+        ranked = []
+        for place in places:
+            distance = haversine_m(lat, lon, place.lat, place.lon)
+            if distance <= radius and (not inner_radius or distance > inner_radius):
+                ranked.append((distance, place))
+        ranked.sort(key=lambda item: item[0])
+        return [place for _, place in ranked]
+
+
+def _per_tag_quota(tags: List[str], limit_per_tag: int) -> Callable[[List[Dict]], bool]:
+    """enough() callback for fetch_elements_async: True once every tag has limit_per_tag elements"""
+    counts = {tag: 0 for tag in tags}
+
+    def enough(elements: List[Dict]) -> bool:
+        for tag in tags:
+            counts[tag] += element_matches(elements[-1], tag)
+        return all(count >= limit_per_tag for count in counts.values())
+    return enough
+
+
+def _to_places(elements: List[Dict]) -> List[Place]:
+    """Compact records for raw Overpass elements (unusable and repeated ones dropped)"""
+    places = []
+    seen = set()
+    for element in elements:
+        key = (element.get("type"), element.get("id"))
+        if key in seen:
+            continue
+        seen.add(key)
+        place = Place.from_osm_element(element)
+        if place:
+            places.append(place)
+    return places
+
+
+# Process-wide cache used by places_api and main
+overpass_tile_cache = TileCache()
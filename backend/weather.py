@@ -5,26 +5,21 @@ from dateparser.search import search_dates
 from openai import OpenAI
 from dotenv import load_dotenv
 import re
+from geocoding import geocoding_service
 
 load_dotenv()
 openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-# --- Geocode place using OpenStreetMap ---
+# --- Geocode place using OpenStreetMap (cached, see geocoding.py) ---
 def geocode(place: str):
 
     print(place)
-    url = f"https://nominatim.openstreetmap.org/search?format=json&q={place}&limit=1"
-    resp = requests.get(url, headers={"User-Agent": "weather-assistant/1.0"})
-    data = resp.json()
-    print(float(data[0]["lat"]))
-    print(float(data[0]["lon"]))
-    if not data:
+    loc = geocoding_service.geocode(place)
+    if not loc:
         raise ValueError(f"Location not found: {place}")
-    return {
-        "lat": float(data[0]["lat"]),
-        "lon": float(data[0]["lon"]),
-        "display_name": data[0]["display_name"]
-    }
+    print(loc["lat"])
+    print(loc["lon"])
+    return loc
 
 # --- Fetch hourly weather from Open-Meteo ---
 def fetch_weather(lat: float, lon: float):
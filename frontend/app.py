@@ -7,6 +7,8 @@ import base64
 
 # Backend URL
 BACKEND_URL = "http://127.0.0.1:8000"
+# Smart search returns partial results after this long instead of hanging
+SEARCH_DEADLINE_MS = 25000
 
 st.set_page_config(
     page_title="Place Image Finder",
@@ -719,18 +721,23 @@ else:  # AI Chat Assistant
                         "lon": lon,
                         "radius": radius,
                         "limit": max_places,
-                        "images_per_place": images_per_place
+                        "images_per_place": images_per_place,
+                        "deadline_ms": SEARCH_DEADLINE_MS
                     },
-                    timeout=120
+                    # Backend answers by its deadline, leave room for the transfer
+                    timeout=SEARCH_DEADLINE_MS / 1000 + 10
                 )
                 
                 if response.status_code == 200:
                     data = response.json()
                     
                     if data.get("status") == "success":
+                        content = f"Found {data.get('total_places', 0)} places!"
+                        if data.get("truncated"):
+                            content += f" (partial results, cut short: {', '.join(data.get('truncated_stages', []))})"
                         st.session_state.chat_history.append({
                             "role": "assistant",
-                            "content": f"Found {data.get('total_places', 0)} places!",
+                            "content": content,
                             "parsed_context": data.get("parsed_context", {}),
                             "places": data.get("places", [])
                         })
@@ -0,0 +1,85 @@
+import http.server
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, List, Tuple
+
+import pytest
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND)
+
+# Keep caches, stats and rate-limit state of the tests out of the real ones
+_state = tempfile.mkdtemp(prefix="tripplanner-tests-")
+for name, filename in (
+    ("GEOCODE_CACHE_PATH", "geocode.sqlite3"),
+    ("PROVIDER_STATS_PATH", "provider_stats.sqlite3"),
+    ("QUERY_CACHE_PATH", "place_queries.sqlite3"),
+    ("RELEVANCE_CACHE_PATH", "url_relevance.sqlite3"),
+):
+    os.environ.setdefault(name, os.path.join(_state, filename))
+os.environ.setdefault("RATE_LIMIT_DIR", os.path.join(_state, "ratelimit"))
+
+
+class LocalServer(http.server.ThreadingHTTPServer):
+    """
+    Stand-in HTTP endpoint on localhost
+
+    answer(path) -> (status, body) decides every reply (dicts and lists
+    are sent as JSON); delay slows every reply down and requests keeps the
+    paths asked for.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, answer: Callable[[str], Tuple[int, Any]]):
+        super().__init__(("127.0.0.1", 0), _LocalHandler)
+        self.answer = answer
+        self.delay = 0.0
+        self.requests: List[str] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/"
+
+
+class _LocalHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        time.sleep(self.server.delay)
+        status, body = self.server.answer(self.path)
+        content_type = "text/plain"
+        if isinstance(body, (dict, list)):
+            body, content_type = json.dumps(body), "application/json"
+        body = body.encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up on this request (e.g. lost a hedge)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    """Start LocalServers: local_server(answer) -> running server, shut down after the test"""
+    started = []
+
+    def start(answer: Callable[[str], Tuple[int, Any]]) -> LocalServer:
+        server = LocalServer(answer)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        started.append(server)
+        return server
+
+    yield start
+    for server in started:
+        server.shutdown()
+        server.server_close()
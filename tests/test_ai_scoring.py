@@ -0,0 +1,105 @@
+import importlib
+import os
+import re
+import types
+
+import pytest
+
+from relevance_cache import RelevanceCache
+from sqlite_cache import SqliteCache
+
+
+@pytest.fixture(scope="module")
+def main(tmp_path_factory):
+    """The app module (it reads api_key.txt from the working directory on import)"""
+    directory = tmp_path_factory.mktemp("app")
+    (directory / "api_key.txt").write_text("sk-test")
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        return importlib.import_module("main")
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def gpt(main, monkeypatch, tmp_path):
+    """
+    Stubbed OpenAI client answering batch prompts with gpt.answer(listing)
+
+    listing is the [(number, url)] list of the prompt; every prompt sent is
+    kept in gpt.prompts. The relevance cache is a fresh one per test.
+    """
+    def create(messages, **kwargs):
+        prompt = messages[-1]["content"]
+        gpt.prompts.append(prompt)
+        if gpt.error:
+            raise gpt.error
+        listing = [(int(number), url) for number, url in re.findall(r"^(\d+)\. URL: (\S+)", prompt, re.M)]
+        message = types.SimpleNamespace(content=gpt.answer(listing))
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+    gpt.prompts = []
+    gpt.error = None
+    gpt.answer = lambda listing: "\n".join(f"{number}: 0.5" for number, _ in listing)
+    chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=create))
+    monkeypatch.setattr(main, "openai", types.SimpleNamespace(chat=chat))
+    path = str(tmp_path / "relevance.sqlite3")
+    monkeypatch.setattr(main, "url_relevance_cache", RelevanceCache(
+        SqliteCache(path, table="url_relevance"), SqliteCache(path, table="url_relevance_stats")
+    ))
+    return gpt
+
+
+LINKS = [
+    ("https://cafe.example/gallery/", "Gallery"),
+    ("https://cafe.example/contact/", "Contact"),
+    ("https://cafe.example/menu/", "Menu"),
+]
+
+
+def test_scores_are_mapped_back_to_their_urls(main, gpt):
+    gpt.answer = lambda listing: "1: 0.9\n2. 0.0\n3) 0.6"
+    scores = main.ai_score_urls_batch(LINKS, "interior photos", "Cafe")
+    assert scores == {
+        "https://cafe.example/gallery/": 0.9,
+        "https://cafe.example/contact/": 0.0,
+        "https://cafe.example/menu/": 0.6,
+    }
+
+
+def test_scores_are_clamped_and_unknown_numbers_ignored(main, gpt):
+    gpt.answer = lambda listing: "1: 1.7\n7: 0.9\n3: 0.4"
+    scores = main.ai_score_urls_batch(LINKS, "interior photos")
+    assert scores == {"https://cafe.example/gallery/": 1.0, "https://cafe.example/menu/": 0.4}
+
+
+def test_malformed_answer_leaves_links_unscored(main, gpt):
+    gpt.answer = lambda listing: "Sorry, I can't rate these links."
+    assert main.ai_score_urls_batch(LINKS, "interior photos") == {}
+    # Nothing was cached, so the next crawl asks again
+    gpt.answer = lambda listing: "1: 0.9"
+    assert main.ai_score_urls_batch(LINKS, "interior photos") == {"https://cafe.example/gallery/": 0.9}
+    assert len(gpt.prompts) == 2
+
+
+def test_failed_call_leaves_links_unscored(main, gpt):
+    gpt.error = RuntimeError("OpenAI down")
+    assert main.ai_score_urls_batch(LINKS, "interior photos") == {}
+
+
+def test_cached_scores_skip_gpt(main, gpt):
+    main.ai_score_urls_batch(LINKS[:2], "interior photos")
+    scores = main.ai_score_urls_batch(LINKS, "interior photos")
+    assert len(scores) == 3
+    assert len(gpt.prompts) == 2
+    assert "1. URL: https://cafe.example/menu/" in gpt.prompts[1]
+    assert "cafe.example/gallery/" not in gpt.prompts[1]
+
+
+def test_large_pages_are_scored_in_batches(main, gpt):
+    links = [(f"https://cafe.example/page/{i}", "") for i in range(main.AI_SCORE_BATCH_SIZE + 5)]
+    gpt.answer = lambda listing: "\n".join(f"{number}: {int(url.rsplit('/', 1)[1]) / 100}" for number, url in listing)
+    scores = main.ai_score_urls_batch(links, "interior photos")
+    assert len(gpt.prompts) == 2
+    assert scores == {url: int(url.rsplit("/", 1)[1]) / 100 for url, _ in links}
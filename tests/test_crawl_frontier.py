@@ -0,0 +1,62 @@
+from crawl_frontier import CrawlFrontier, normalize_url
+
+
+def _drain(frontier):
+    popped = []
+    while frontier:
+        popped.append(frontier.pop())
+    return popped
+
+
+def test_pops_best_priority_first_then_insertion_order():
+    frontier = CrawlFrontier()
+    for url, priority in (("https://a.sk/low", 0.2), ("https://a.sk/high", 0.9), ("https://a.sk/tie1", 0.5),
+                          ("https://a.sk/tie2", 0.5)):
+        frontier.push(url, priority)
+    assert [entry[0] for entry in _drain(frontier)] == [
+        "https://a.sk/high", "https://a.sk/tie1", "https://a.sk/tie2", "https://a.sk/low"
+    ]
+    assert frontier.pop() is None
+
+
+def test_duplicates_are_deduplicated_by_normalized_url():
+    frontier = CrawlFrontier()
+    assert frontier.push("https://a.sk/menu", 0.5)
+    assert not frontier.push("https://a.sk/menu/", 0.5)
+    assert not frontier.push("https://a.sk/menu#drinks", 0.3)
+    assert len(frontier) == 1
+    assert "https://a.sk/menu/#top" in frontier
+
+
+def test_rediscovered_url_moves_up_and_keeps_new_metadata():
+    frontier = CrawlFrontier()
+    frontier.push("https://a.sk/gallery", 0.1, "old title")
+    frontier.push("https://a.sk/about", 0.5, "about")
+    assert frontier.push("https://a.sk/gallery/", 0.8, "new title")
+    assert len(frontier) == 2
+    assert _drain(frontier) == [("https://a.sk/gallery/", 0.8, "new title"), ("https://a.sk/about", 0.5, "about")]
+
+
+def test_popped_urls_are_never_queued_again():
+    frontier = CrawlFrontier()
+    frontier.push("https://a.sk/", 1.0)
+    frontier.pop()
+    assert frontier.seen("https://a.sk")
+    assert not frontier.push("https://a.sk", 2.0)
+    assert not frontier
+
+
+def test_compaction_drops_superseded_entries_only():
+    frontier = CrawlFrontier()
+    for step in range(500):
+        frontier.push(f"https://a.sk/{step % 10}", step / 500)
+    assert len(frontier) == 10
+    assert len(frontier._heap) < 500
+    popped = _drain(frontier)
+    assert [entry[0] for entry in popped] == [f"https://a.sk/{i}" for i in range(9, -1, -1)]
+
+
+def test_custom_normalization():
+    frontier = CrawlFrontier(lambda url: normalize_url(url).lower())
+    frontier.push("https://a.sk/Menu", 0.5)
+    assert not frontier.push("https://a.sk/menu", 0.5)
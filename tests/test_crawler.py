@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+from crawler import PageStore, crawl
+from deadline import Deadline
+
+
+def test_page_store_keeps_the_best_pages():
+    store = PageStore(size=2)
+    store.offer("https://a.sk/one", 0.3, b"one")
+    store.offer("https://a.sk/two", 0.9, b"two")
+    store.offer("https://a.sk/three", 0.5, b"three")  # pushes out "one"
+    store.offer("https://a.sk/four", 0.1, b"four")    # worse than everything kept
+    assert store.get("https://a.sk/one") is None
+    assert store.get("https://a.sk/two") == b"two"
+    assert store.get("https://a.sk/three") == b"three"
+    assert store.get("https://a.sk/four") is None
+
+
+def test_page_store_looks_up_by_normalized_url():
+    store = PageStore(size=2)
+    store.offer("https://a.sk/menu/", 0.5, b"menu")
+    store.offer("https://a.sk/menu#top", 0.9, b"other copy")  # same page, first copy stays
+    assert store.get("https://a.sk/menu") == b"menu"
+
+
+def test_page_store_of_size_zero_keeps_nothing():
+    store = PageStore(size=0)
+    store.offer("https://a.sk/", 1.0, b"page")
+    assert store.get("https://a.sk/") is None
+
+
+def test_crawl_follows_links_best_first_up_to_max_pages():
+    links = {
+        "https://a.sk": [("https://a.sk/low", 0.1), ("https://a.sk/high", 0.9)],
+        "https://a.sk/high": [("https://a.sk/high/child", 0.8)],
+    }
+    visited = []
+
+    async def visit(item):
+        visited.append(item[0])
+        return links.get(item[0], [])
+
+    started = asyncio.run(crawl([("https://a.sk", 1.0)], visit, max_pages=3, width=1))
+    assert started == 3
+    assert visited == ["https://a.sk", "https://a.sk/high", "https://a.sk/high/child"]
+
+
+def test_crawl_stops_at_its_deadline():
+    async def visit(item):
+        await asyncio.sleep(0.2)
+        return [(f"{item[0]}/{i}", 0.5) for i in range(3)]
+
+    deadline = Deadline(500)
+    started = time.monotonic()
+    asyncio.run(crawl([("https://a.sk", 1.0)], visit, max_pages=100, width=2, deadline=deadline))
+    assert time.monotonic() - started < 0.8
+    assert deadline.truncated == ["crawl"]
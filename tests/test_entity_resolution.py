@@ -0,0 +1,47 @@
+from entity_resolution import name_similarity, normalize_name, resolve_entities
+from place_record import Place
+
+
+def _google(name, lat, lon, types):
+    return {"name": name, "lat": lat, "lon": lon, "source": "Google Places", "rating": 4.5, "types": types}
+
+
+def _osm(name, lat, lon, **tags):
+    return Place.from_osm_element({"type": "node", "id": 1, "lat": lat, "lon": lon, "tags": {"name": name, **tags}})
+
+
+def test_same_place_from_two_providers_is_merged():
+    google = _google("Kaviareň Slávia", 48.72000, 21.25800, ["cafe", "food", "establishment"])
+    osm = {"name": "Kaviaren Slavia", "lat": 48.72030, "lon": 21.25810, "source": "OpenStreetMap",
+           "website": "https://slavia.sk"}
+    merged = resolve_entities([google, osm])
+    assert len(merged) == 1
+    assert merged[0]["rating"] == 4.5
+    assert merged[0]["website"] == "https://slavia.sk"
+    assert merged[0]["sources"] == ["Google Places", "OpenStreetMap"]
+
+
+def test_longer_name_containing_the_other_is_merged():
+    assert name_similarity(normalize_name("Napoli Centrum"), normalize_name("Pizzeria Napoli Centrum Košice")) >= 0.8
+
+
+def test_one_shared_word_is_not_enough():
+    cafe = _google("Cafe Central", 48.72000, 21.25800, ["cafe"])
+    park = {"name": "Central Park", "lat": 48.72009, "lon": 21.25800, "source": "OpenStreetMap"}
+    assert len(resolve_entities([cafe, park])) == 2
+
+
+def test_incompatible_kinds_are_not_merged():
+    # Same name, 10 m apart, but one is a restaurant and the other a hotel
+    restaurant = _google("Hotel Bristol", 48.72000, 21.25800, ["restaurant", "food"])
+    hotel = _osm("Bristol", 48.72009, 21.25800, tourism="hotel")
+    assert len(resolve_entities([restaurant, hotel])) == 2
+    # Providers' kinds within one family still merge (Google "restaurant" vs OSM "fast_food")
+    fast_food = _osm("Bristol", 48.72009, 21.25800, amenity="fast_food")
+    assert len(resolve_entities([restaurant, fast_food])) == 1
+
+
+def test_branches_far_apart_stay_separate():
+    first = _google("Starbucks", 48.72000, 21.25800, ["cafe"])
+    second = _osm("Starbucks", 48.73000, 21.25800, amenity="cafe")  # ~1.1 km north
+    assert len(resolve_entities([first, second])) == 2
@@ -0,0 +1,103 @@
+import types
+
+import pytest
+
+import geocoding
+import sqlite_cache
+from geocoding import GEOCODE_NOT_FOUND_TTL, GEOCODE_TTL, GeocodingService, normalize_query
+from sqlite_cache import SqliteCache
+
+KOSICE = [{"lat": "48.7164", "lon": "21.2611", "display_name": "Košice, Slovakia"}]
+
+
+class _Response:
+    def __init__(self, results):
+        self.results = results
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.results
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake time shared by the memory cache and the SQLite store"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(sqlite_cache, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def nominatim(monkeypatch):
+    """Fake Nominatim answering from a dict, counting requests"""
+    calls = []
+
+    def get(url, params=None, **kwargs):
+        calls.append(params["q"])
+        if nominatim.error:
+            raise nominatim.error
+        return _Response(nominatim.answers.get(params["q"], []))
+
+    nominatim.answers = {}
+    nominatim.error = None
+    nominatim.calls = calls
+    monkeypatch.setattr(geocoding.requests, "get", get)
+    monkeypatch.setattr(geocoding, "acquire", lambda name: None)
+    return nominatim
+
+
+@pytest.fixture
+def service(tmp_path, clock):
+    return GeocodingService(SqliteCache(str(tmp_path / "geocode.sqlite3"), table="geocode"), timer=lambda: clock[0])
+
+
+def test_normalize_query():
+    assert normalize_query("  KOŠICE,  Slovakia. ") == "kosice, slovakia"
+
+
+def test_repeated_lookups_are_served_from_memory(service, nominatim):
+    nominatim.answers["Košice"] = KOSICE
+    assert service.geocode("Košice")["lat"] == 48.7164
+    assert service.geocode(" košice ")["display_name"] == "Košice, Slovakia"
+    assert nominatim.calls == ["Košice"]
+
+
+def test_store_is_shared_between_services(service, nominatim, clock):
+    nominatim.answers["Košice"] = KOSICE
+    service.geocode("Košice")
+    other = GeocodingService(service.store, timer=lambda: clock[0])
+    assert other.geocode("Košice") is not None
+    assert len(nominatim.calls) == 1
+
+
+def test_not_found_is_retried_after_its_ttl(service, nominatim, clock):
+    assert service.geocode("Atlantis") is None
+    assert service.geocode("Atlantis") is None
+    assert len(nominatim.calls) == 1
+
+    nominatim.answers["Atlantis"] = KOSICE
+    clock[0] += GEOCODE_NOT_FOUND_TTL + 1
+    assert service.geocode("Atlantis") is not None
+    assert len(nominatim.calls) == 2
+
+
+def test_found_results_outlive_the_not_found_ttl(service, nominatim, clock):
+    nominatim.answers["Košice"] = KOSICE
+    service.geocode("Košice")
+    clock[0] += GEOCODE_NOT_FOUND_TTL + 1
+    service.geocode("Košice")
+    assert len(nominatim.calls) == 1
+    clock[0] += GEOCODE_TTL
+    service.geocode("Košice")
+    assert len(nominatim.calls) == 2
+
+
+def test_errors_are_not_cached(service, nominatim):
+    nominatim.answers["Košice"] = KOSICE
+    nominatim.error = ConnectionError("Nominatim down")
+    assert service.search("Košice") == []
+    nominatim.error = None
+    assert service.search("Košice") == KOSICE
+    assert len(nominatim.calls) == 2
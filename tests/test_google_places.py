@@ -0,0 +1,56 @@
+from itertools import islice
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import google_places
+from google_places import iter_nearby_results
+
+
+def _page(start, token=None):
+    page = {"status": "OK", "results": [{"name": f"place {i}"} for i in range(start, start + 20)]}
+    if token:
+        page["next_page_token"] = token
+    return page
+
+
+@pytest.fixture
+def nearby(local_server, monkeypatch):
+    """Stand-in Nearby Search endpoint serving two pages"""
+    def answer(path):
+        token = parse_qs(urlparse(path).query).get("pagetoken", [None])[0]
+        return 200, server.pages[token]
+
+    server = local_server(answer)
+    server.pages = {None: _page(0, "second"), "second": _page(20)}
+    monkeypatch.setattr(google_places, "GOOGLE_NEARBY_URL", server.url)
+    monkeypatch.setattr(google_places, "NEXT_PAGE_DELAY", 0.05)
+    return server
+
+
+def _results(**kwargs):
+    return iter_nearby_results(48.72, 21.26, 500, "cafe", "key", **kwargs)
+
+
+def test_next_page_is_only_fetched_when_needed(nearby):
+    assert len(list(islice(_results(), 20))) == 20
+    assert len(nearby.requests) == 1
+
+
+def test_pages_are_followed_until_no_token(nearby):
+    names = [result["name"] for result in _results()]
+    assert names == [f"place {i}" for i in range(40)]
+    tokens = [parse_qs(urlparse(path).query).get("pagetoken") for path in nearby.requests]
+    assert tokens == [None, ["second"]]
+
+
+def test_error_status_ends_results_or_raises(nearby):
+    nearby.pages["second"] = {"status": "OVER_QUERY_LIMIT"}
+    assert len(list(_results())) == 20
+    with pytest.raises(RuntimeError):
+        list(_results(raise_errors=True))
+
+
+def test_zero_results_never_raises(nearby):
+    nearby.pages[None] = {"status": "ZERO_RESULTS", "results": []}
+    assert list(_results(raise_errors=True)) == []
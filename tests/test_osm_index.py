@@ -0,0 +1,87 @@
+import json
+import random
+
+import pytest
+
+from geo import haversine_m
+from osm_index import KDTree, OSMIndex, _unit_vector
+
+LAT, LON = 48.7164, 21.2611
+VALUES = {"amenity": ["cafe", "restaurant", "bar"], "shop": ["bakery", "books"], "tourism": ["museum"]}
+
+
+def _elements(count=2000, seed=7):
+    rng = random.Random(seed)
+    elements = []
+    for i in range(count):
+        key = rng.choice(list(VALUES))
+        element = {"id": i, "tags": {"name": f"place {i}", key: rng.choice(VALUES[key])}}
+        lat, lon = LAT + rng.uniform(-0.05, 0.05), LON + rng.uniform(-0.07, 0.07)
+        if i % 5:
+            element.update(type="node", lat=lat, lon=lon)
+        else:
+            element.update(type="way", center={"lat": lat, "lon": lon})
+        elements.append(element)
+    # Untagged for our keys: never indexed
+    elements.append({"type": "node", "id": -1, "lat": LAT, "lon": LON, "tags": {"name": "bench", "leisure": ""}})
+    return elements
+
+
+@pytest.fixture(scope="module")
+def index():
+    return OSMIndex(_elements())
+
+
+def _brute_force(elements, lat, lon, radius, tag):
+    key, _, value = tag.partition("=")
+    found = []
+    for element in elements:
+        point = element.get("center") or element
+        if key in element["tags"] and (not value or element["tags"][key] == value) \
+                and element["tags"][key] and haversine_m(lat, lon, point["lat"], point["lon"]) <= radius:
+            found.append(element["id"])
+    return sorted(found)
+
+
+@pytest.mark.parametrize("tag", ["amenity=cafe", "shop=books", "tourism=museum", "shop", "amenity"])
+@pytest.mark.parametrize("radius", [50, 400, 2500])
+def test_matches_brute_force_haversine(index, tag, radius):
+    rng = random.Random(radius)
+    for _ in range(5):
+        lat, lon = LAT + rng.uniform(-0.03, 0.03), LON + rng.uniform(-0.04, 0.04)
+        found = sorted(place.osm_id for place in index.query(lat, lon, radius, tag))
+        assert found == _brute_force(_elements(), lat, lon, radius, tag)
+
+
+def test_results_are_nearest_first(index):
+    places = index.query(LAT, LON, 2000, "amenity")
+    distances = [haversine_m(LAT, LON, place.lat, place.lon) for place in places]
+    assert places and distances == sorted(distances)
+
+
+def test_bare_key_finds_every_value(index):
+    shops = {place.osm_id for place in index.query(LAT, LON, 3000, "shop")}
+    by_value = set()
+    for value in VALUES["shop"]:
+        by_value |= {place.osm_id for place in index.query(LAT, LON, 3000, f"shop={value}")}
+    assert shops and shops == by_value
+
+
+def test_unknown_tag_finds_nothing(index):
+    assert index.query(LAT, LON, 5000, "amenity=casino") == []
+    assert index.query(LAT, LON, 5000, "leisure") == []
+
+
+def test_kd_tree_radius_edge():
+    points = [_unit_vector(LAT, LON + i * 0.001) for i in range(100)]
+    tree = KDTree(points)
+    # ~73.5 m per 0.001° of longitude here: 10 steps are ~735 m
+    hits = tree.within(_unit_vector(LAT, LON), 740 / 6371000)
+    assert sorted(i for _, i in hits) == list(range(11))
+    assert KDTree([]).within(_unit_vector(LAT, LON), 1.0) == []
+
+
+def test_loads_overpass_json_dump(tmp_path):
+    path = tmp_path / "extract.json"
+    path.write_text(json.dumps({"elements": _elements(50)}), encoding="utf-8")
+    assert len(OSMIndex.from_file(str(path))) == 50
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from overpass import ElementStream, build_around_query, split_by_tag
+
+
+RESPONSE = json.dumps({
+    "version": 0.6,
+    "osm3s": {"timestamp_osm_base": "2024-01-01T00:00:00Z"},
+    "elements": [
+        {"type": "node", "id": 1, "lat": 48.72, "lon": 21.26, "tags": {"name": "Kaviareň Slávia", "amenity": "cafe"}},
+        {"type": "way", "id": 2, "center": {"lat": 48.71, "lon": 21.25}, "tags": {"name": "Park [north]"}},
+        {"type": "node", "id": 3, "lat": 48.70, "lon": 21.24, "tags": {"name": "\"Quoted\" ], bar"}},
+    ]
+}, ensure_ascii=False).encode()
+
+
+def _parse(chunk_size):
+    stream = ElementStream()
+    elements = []
+    for start in range(0, len(RESPONSE), chunk_size):
+        elements.extend(stream.feed(RESPONSE[start:start + chunk_size]))
+    return stream, elements
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, len(RESPONSE)])
+def test_chunked_input_yields_every_element(chunk_size):
+    stream, elements = _parse(chunk_size)
+    assert elements == json.loads(RESPONSE)["elements"]
+    assert stream.done
+
+
+def test_multibyte_characters_split_across_chunks():
+    # One byte at a time splits every non-ASCII character of the names
+    _, elements = _parse(1)
+    assert elements[0]["tags"]["name"] == "Kaviareň Slávia"
+
+
+def test_elements_are_returned_as_soon_as_complete():
+    stream = ElementStream()
+    first_end = RESPONSE.index(b'"id": 2') - len(b'{"type": "way", ')
+    assert [element["id"] for element in stream.feed(RESPONSE[:first_end])] == [1]
+    assert not stream.done
+    assert [element["id"] for element in stream.feed(RESPONSE[first_end:])] == [2, 3]
+
+
+def test_empty_elements_array():
+    stream = ElementStream()
+    assert stream.feed(b'{"elements": []}') == []
+    assert stream.done
+
+
+def test_union_query_covers_every_tag_once():
+    query = build_around_query(48.7, 21.2, 500, ["amenity=cafe", "tourism"], project=False)
+    for line in (
+        'node["amenity"="cafe"](around:500,48.7,21.2);',
+        'way["amenity"="cafe"](around:500,48.7,21.2);',
+        'node["tourism"](around:500,48.7,21.2);',
+        'way["tourism"](around:500,48.7,21.2);',
+    ):
+        assert query.count(line) == 1
+    # One union, one output for all tags
+    assert query.count("out tags center;") == 1
+
+
+def test_union_results_split_back_per_tag():
+    cafe = {"type": "node", "id": 1, "tags": {"amenity": "cafe", "tourism": "attraction"}}
+    museum = {"type": "node", "id": 2, "tags": {"tourism": "museum"}}
+    bar = {"type": "node", "id": 3, "tags": {"amenity": "bar"}}
+    split = split_by_tag([cafe, museum, bar], ["amenity=cafe", "tourism"])
+    assert split == {"amenity=cafe": [cafe], "tourism": [cafe, museum]}
+
+
+def test_ring_query_subtracts_the_inner_circle():
+    query = build_around_query(48.7, 21.2, 500, ["amenity=cafe"], project=False, inner_radius=200)
+    outer, _, inner = query.partition("\n      -\n")
+    assert 'node["amenity"="cafe"](around:500,48.7,21.2);' in outer
+    assert 'node["amenity"="cafe"](around:200,48.7,21.2);' in inner
+    assert "around:500" not in inner
+
+
+def test_ring_query_without_inner_radius_is_the_full_circle():
+    full = build_around_query(48.7, 21.2, 500, ["amenity=cafe"], project=False)
+    assert build_around_query(48.7, 21.2, 500, ["amenity=cafe"], project=False, inner_radius=0) == full
+    assert "-" not in full.replace("out tags center", "")
+
+
+def test_ring_query_with_limit_caps_each_tag_separately():
+    query = build_around_query(
+        48.7, 21.2, 500, ["amenity=cafe", "tourism"], limit=5, project=False, inner_radius=200
+    )
+    assert query.count("\n      -\n") == 2
+    assert query.count("out tags center 5;") == 2
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from overpass_endpoints import EndpointPool
+
+
+@pytest.fixture
+def servers(local_server):
+    """Two stand-in Overpass mirrors answering with their name, adjustable delay/status"""
+    started = {}
+    for name in ("A", "B"):
+        started[name] = local_server(lambda path, name=name: (started[name].status, name))
+        started[name].status = 200
+    return started
+
+
+def _query(pool, acquire=None):
+    async def run():
+        async with httpx.AsyncClient(timeout=10) as client:
+            async def fetch(url):
+                response = await client.get(url)
+                response.raise_for_status()
+                return response.text
+            return await pool.hedged(fetch, acquire)
+    return asyncio.run(run())
+
+
+def test_fast_primary_wins_without_hedging(servers):
+    pool = EndpointPool([servers["A"].url, servers["B"].url], default_delay=0.5)
+    assert _query(pool) == "A"
+    assert pool.status()[1]["samples"] == 0
+
+
+def test_slow_primary_is_hedged(servers):
+    servers["A"].delay = 1.0
+    pool = EndpointPool([servers["A"].url, servers["B"].url], default_delay=0.1)
+    started = time.monotonic()
+    assert _query(pool) == "B"
+    assert time.monotonic() - started < 0.9
+
+
+def test_hedge_delay_starts_after_acquire(servers):
+    servers["A"].delay = 0.1
+    pool = EndpointPool([servers["A"].url, servers["B"].url], default_delay=0.3)
+    waits = [0.5]
+
+    async def acquire():
+        # Only the first request waits for the rate limit
+        await asyncio.sleep(waits.pop() if waits else 0)
+
+    assert _query(pool, acquire) == "A"
+
+
+def test_error_fails_over_immediately(servers):
+    servers["A"].status = 503
+    pool = EndpointPool([servers["A"].url, servers["B"].url], default_delay=5.0)
+    started = time.monotonic()
+    assert _query(pool) == "B"
+    assert time.monotonic() - started < 2.0
+    assert pool.ranked()[0] == servers["B"].url
+
+
+def test_bad_query_is_not_retried(servers):
+    servers["A"].status = 400
+    pool = EndpointPool([servers["A"].url, servers["B"].url], default_delay=5.0)
+    with pytest.raises(httpx.HTTPStatusError):
+        _query(pool)
+
+
+def test_mirror_that_slowed_down_loses_its_rank(servers):
+    a, b = servers["A"].url, servers["B"].url
+    pool = EndpointPool([a, b], default_delay=0.05)
+    for _ in range(6):
+        pool.record_success(a, 0.01)
+
+    servers["A"].delay = 1.0
+    servers["B"].delay = 0.05
+    for _ in range(10):
+        assert _query(pool) == "B"
+
+    # Lost races count as (censored) samples, so A no longer looks fast
+    assert pool.ranked()[0] == b
@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+
+import places_api
+import tile_cache
+from deadline import Deadline
+from places_api import ProviderSpec, search_places_async, select_providers
+from tile_cache import TileCache
+
+LAT, LON = 48.72, 21.26
+
+
+def _provider(name, delay=0.0, budget=1.0, error=None, **spec):
+    async def fetch(client, lat, lon, radius, place_type, limit, api_key):
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return [{"name": f"{name} place", "lat": lat, "lon": lon, "source": name}]
+    return ProviderSpec(name, fetch, spec.pop("categories", None), frozenset(), latency_budget=budget,
+                        cost=spec.pop("cost", 0), **spec)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    providers = {}
+    monkeypatch.setattr(places_api, "PROVIDERS", providers)
+    return providers
+
+
+def _register(registry, *specs):
+    for spec in specs:
+        registry[spec.name] = spec
+
+
+def test_select_providers_filters(registry, monkeypatch):
+    monkeypatch.delenv("TEST_PROVIDER_KEY", raising=False)
+    _register(
+        registry,
+        _provider("Free"),
+        _provider("Paid", cost=30),
+        _provider("Keyed", api_key_env="TEST_PROVIDER_KEY"),
+        _provider("Culture only", categories=frozenset({"culture"})),
+        _provider("Opt-in", opt_in=True),
+    )
+    names = lambda selected: [spec.name for spec, _ in selected]
+    assert names(select_providers("cafe")) == ["Free", "Paid"]
+    assert names(select_providers("museum", max_cost=10)) == ["Free", "Culture only"]
+    assert names(select_providers("cafe", ["Opt-in", "Keyed"], {"Keyed": "secret"})) == ["Keyed", "Opt-in"]
+    assert select_providers("cafe", ["Keyed"], {"Keyed": "secret"})[0][1] == "secret"
+
+
+def test_provider_over_its_budget_is_dropped_and_reported(registry):
+    _register(registry, _provider("Fast", delay=0.01), _provider("Slow", delay=5.0, budget=0.2))
+    deadline = Deadline()
+    started = time.monotonic()
+    places = asyncio.run(search_places_async(
+        LAT, LON, 300, "cafe", 10, providers=["Fast", "Slow"], deadline=deadline
+    ))
+    assert time.monotonic() - started < 2.0
+    assert [place["source"] for place in places] == ["Fast"]
+    assert deadline.report()["truncated_stages"] == ["Slow"]
+
+
+def test_failed_provider_doesnt_sink_the_search(registry):
+    _register(registry, _provider("Good"), _provider("Broken", error=RuntimeError("boom")))
+    places = asyncio.run(search_places_async(LAT + 0.01, LON, 300, "cafe", 10, providers=["Good", "Broken"]))
+    assert [place["source"] for place in places] == ["Good"]
+
+
+def test_tile_fill_survives_a_cancelled_caller(monkeypatch):
+    async def slow_fetch(client, query, raise_errors=False, **kwargs):
+        await asyncio.sleep(0.3)
+        return [{"type": "node", "id": 1, "lat": LAT, "lon": LON, "tags": {"name": "Slávia", "amenity": "cafe"}}]
+
+    monkeypatch.setattr(tile_cache, "fetch_elements_async", slow_fetch)
+    cache = TileCache()
+
+    async def give_up_early():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(cache.query_async(None, LAT, LON, 100, "amenity=cafe"), 0.05)
+
+    asyncio.run(give_up_early())
+    time.sleep(0.5)
+    misses = cache.misses
+    places = asyncio.run(cache.query_async(None, LAT, LON, 100, "amenity=cafe"))
+    assert [place.name for place in places] == ["Slávia"]
+    assert cache.misses == misses  # answered from the tiles the abandoned fill stored
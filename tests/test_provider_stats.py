@@ -0,0 +1,67 @@
+import pytest
+
+from provider_stats import MIN_SAMPLES, ProviderStats, region_for
+from sqlite_cache import SqliteCache
+
+REGION = region_for(48.72, 21.26)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SqliteCache(str(tmp_path / "provider_stats.sqlite3"), table="provider_stats")
+
+
+def _observe(stats, provider, latency, count, times=MIN_SAMPLES):
+    for _ in range(times):
+        stats.record(provider, "cafe", REGION, latency, count)
+
+
+def test_plan_orders_by_places_per_second_and_splits_waves(store):
+    stats = ProviderStats(store, explore_rate=0)
+    _observe(stats, "slow", 2.0, 10)
+    _observe(stats, "fast", 0.5, 10)
+    _observe(stats, "medium", 1.0, 10)
+    first, second = stats.plan(["slow", "fast", "medium"], "cafe", REGION, limit=5)
+    assert first == ["fast"]
+    assert second == ["medium", "slow"]
+    # A bigger limit needs more of the ranking in the first wave
+    first, second = stats.plan(["slow", "fast", "medium"], "cafe", REGION, limit=10)
+    assert first == ["fast", "medium"]
+    assert second == ["slow"]
+
+
+def test_providers_with_few_samples_always_go_first(store):
+    stats = ProviderStats(store, explore_rate=0)
+    _observe(stats, "fast", 0.5, 10)
+    _observe(stats, "new", 5.0, 0, times=MIN_SAMPLES - 1)
+    first, second = stats.plan(["fast", "new", "unseen"], "cafe", REGION, limit=5)
+    assert first == ["new", "unseen", "fast"]
+    assert second == []
+
+
+def test_everyone_is_asked_when_nothing_yields(store):
+    stats = ProviderStats(store, explore_rate=0)
+    _observe(stats, "a", 1.0, 0)
+    _observe(stats, "b", 2.0, 0)
+    assert stats.plan(["a", "b"], "cafe", REGION, limit=5) == (["a", "b"], [])
+
+
+def test_exploration_moves_the_least_observed_fallback_forward(store):
+    stats = ProviderStats(store, explore_rate=1)
+    _observe(stats, "fast", 0.5, 10)
+    _observe(stats, "medium", 1.0, 10, times=MIN_SAMPLES + 2)
+    _observe(stats, "slow", 2.0, 10)
+    first, second = stats.plan(["fast", "medium", "slow"], "cafe", REGION, limit=5)
+    assert first == ["fast", "slow"]
+    assert second == ["medium"]
+
+
+def test_memory_is_refreshed_with_other_workers_observations(store):
+    now = [0.0]
+    mine = ProviderStats(store, refresh=60, timer=lambda: now[0])
+    other = ProviderStats(store, refresh=60, timer=lambda: now[0])
+    mine.record("osm", "cafe", REGION, 1.0, 10)
+    other.record("osm", "cafe", REGION, 1.0, 10)
+    assert mine.get("osm", "cafe", REGION)["samples"] == 1
+    now[0] += 61
+    assert mine.get("osm", "cafe", REGION)["samples"] == 2
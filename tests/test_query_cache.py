@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+from geo import tile_for
+from query_cache import BUCKET_ZOOM, QueryCache, normalize_place_type
+from sqlite_cache import SqliteCache
+
+LAT, LON = 48.72, 21.26
+PLACE_TYPES = {"food": ["restaurant", "cafe", "bar"], "transport": ["bus_station"]}
+
+
+def _at(north_m, east_m=0.0):
+    return LAT + north_m / 111320.0, LON + east_m / 73500.0
+
+
+def _place(name, north_m, east_m=0.0):
+    lat, lon = _at(north_m, east_m)
+    return {"name": name, "lat": lat, "lon": lon}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return QueryCache(SqliteCache(str(tmp_path / "queries.sqlite3"), table="place_queries"))
+
+
+def test_complete_search_answers_searches_inside_it(cache):
+    places = [_place("centre", 0), _place("400 m", 400), _place("900 m", 900)]
+    cache.set("test", "cafe", LAT, LON, 1000, {"places": places}, complete=True)
+
+    inner = cache.get("test", "cafe", *_at(100), 500)
+    assert [p["name"] for p in inner["places"]] == ["centre", "400 m"]
+
+
+def test_circle_reaching_outside_is_a_miss(cache):
+    cache.set("test", "cafe", LAT, LON, 1000, {"places": []}, complete=True)
+    assert cache.get("test", "cafe", *_at(600), 500) is None
+    assert cache.get("test", "cafe", LAT, LON, 1500) is None
+
+
+def test_other_type_or_scope_is_a_miss(cache):
+    cache.set("test", "cafe", LAT, LON, 1000, {"places": []}, complete=True)
+    assert cache.get("test", "bar", LAT, LON, 500) is None
+    assert cache.get("other", "cafe", LAT, LON, 500) is None
+
+
+def test_incomplete_search_only_answers_the_same_search(cache):
+    cache.set("test", "cafe", LAT, LON, 1000, {"places": [_place("a", 0)]}, complete=False, limit=10)
+    assert cache.get("test", "cafe", LAT, LON, 500, limit=10) is None
+    assert cache.get("test", "cafe", *_at(10), 1000, limit=10) is not None
+    # Capped at 10: can't answer a search that needs more
+    assert cache.get("test", "cafe", LAT, LON, 1000, limit=20) is None
+
+
+def test_searches_in_neighbouring_buckets_are_found(cache):
+    # ~3 km east: a different bucket than the lookup, still contained
+    centre = _at(0, 3000)
+    assert tile_for(*centre, BUCKET_ZOOM) != tile_for(LAT, LON, BUCKET_ZOOM)
+    cache.set("test", "cafe", *centre, 5000, {"places": [_place("here", 0)]}, complete=True)
+    assert cache.get("test", "cafe", LAT, LON, 1000)["places"][0]["name"] == "here"
+
+
+def test_concurrent_writers_keep_every_entry(cache):
+    def store(index):
+        # One cache (and connection) per writer, like separate workers
+        writer = QueryCache(SqliteCache(cache.store.path, table=cache.store.table))
+        writer.set("test", "cafe", *_at(index * 50), 100, {"places": []}, complete=True)
+
+    threads = [threading.Thread(target=store, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for index in range(8):
+        assert cache.get("test", "cafe", *_at(index * 50), 100) is not None
+
+
+def test_place_type_spellings():
+    assert normalize_place_type("Cafés", PLACE_TYPES) == "cafe"
+    assert normalize_place_type("coffee shop", PLACE_TYPES) == "cafe"
+    assert normalize_place_type("Bus", PLACE_TYPES) == "bus"
+    assert normalize_place_type("bus stop", PLACE_TYPES) == "bus_station"
@@ -0,0 +1,91 @@
+import math
+
+import pytest
+
+from place_record import Place
+from ranking import CATEGORY_WEIGHT, rank_places, score_places
+
+LAT, LON = 48.72, 21.26
+
+
+def _place(name, north_m, rating=None, reviews=0, **extra):
+    return {
+        "name": name,
+        "lat": LAT + north_m / 111320.0,
+        "lon": LON,
+        "rating": rating if rating is not None else "N/A",
+        "user_ratings_total": reviews,
+        **extra
+    }
+
+
+def test_closer_place_ranks_first_when_otherwise_equal():
+    far, near = _place("far", 900), _place("near", 100)
+    assert [p["name"] for p in rank_places([far, near], LAT, LON, 1000, 2)] == ["near", "far"]
+
+
+def test_well_reviewed_place_beats_a_slightly_closer_one():
+    unrated = _place("unrated", 100)
+    loved = _place("loved", 200, rating=4.8, reviews=800)
+    assert rank_places([unrated, loved], LAT, LON, 1000, 1)[0]["name"] == "loved"
+
+
+def test_few_reviews_are_pulled_towards_the_prior():
+    one_review = _place("one review", 300, rating=5.0, reviews=1)
+    many_reviews = _place("many reviews", 300, rating=4.6, reviews=500)
+    assert [p["name"] for p in rank_places([one_review, many_reviews], LAT, LON, 1000, 2)] == [
+        "many reviews", "one review"
+    ]
+
+
+def test_requested_category_is_preferred():
+    bar = _place("bar", 300, types=["bar"])
+    cafe = _place("cafe", 300, types=["cafe"])
+    assert rank_places([bar, cafe], LAT, LON, 1000, 1, categories=["cafe"])[0]["name"] == "cafe"
+
+
+def test_top_k_matches_a_full_sort_and_keeps_ties_in_order():
+    places = [_place(f"p{i}", (i * 37) % 900, rating=3 + (i % 3) * 0.5, reviews=i * 10) for i in range(50)]
+    places += [_place("tie a", 450), _place("tie b", 450)]
+    scores = score_places(places, LAT, LON, 1000)
+    full = sorted(range(len(places)), key=lambda i: (-scores[i], i))
+    ranked = rank_places(places, LAT, LON, 1000, 10)
+    assert [places.index(p) for p in ranked] == full[:10]
+    everything = rank_places(places, LAT, LON, 1000, len(places))
+    assert everything.index(places[-2]) < everything.index(places[-1])
+
+
+def test_place_records_and_dicts_rank_together():
+    record = Place.from_osm_element({"type": "node", "id": 1, "lat": LAT, "lon": LON, "tags": {"name": "record"}})
+    assert math.isnan(record.rating)
+    ranked = rank_places([_place("dict", 800), record], LAT, LON, 1000, 2)
+    assert [p.get("name") for p in ranked] == ["record", "dict"]
+
+
+def _google_record(name, types):
+    return Place.from_google(
+        {"name": name, "geometry": {"location": {"lat": LAT + 300 / 111320.0, "lng": LON}}, "place_id": name,
+         "types": types},
+        {}
+    )
+
+
+def _osm_record(name, **tags):
+    element = {"type": "node", "id": 1, "lat": LAT + 300 / 111320.0, "lon": LON, "tags": {"name": name, **tags}}
+    return Place.from_osm_element(element)
+
+
+def test_category_credit_is_the_same_for_every_provider():
+    google = _google_record("google", ["cafe", "food"])
+    osm = _osm_record("osm", amenity="cafe")
+    # Shape find_places_osm_async returns: no tags, the queried tag as category
+    osm_dict = _place("osm dict", 300, category="amenity=cafe")
+    scores = score_places([google, osm, osm_dict], LAT, LON, 1000, categories=["cafe"])
+    unmatched = score_places([google, osm, osm_dict], LAT, LON, 1000, categories=["bar"])
+    assert scores == pytest.approx(unmatched + CATEGORY_WEIGHT)
+
+
+def test_google_record_in_category_beats_one_outside():
+    inside = _google_record("inside", ["cafe"])
+    outside = _google_record("outside", ["bar"])
+    assert rank_places([outside, inside], LAT, LON, 1000, 1, categories=["cafe"])[0].name == "inside"
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+import rate_limit
+from rate_limit import TokenBucket
+
+
+@pytest.fixture
+def bucket(tmp_path):
+    return TokenBucket("test", rate=1.0, burst=1, state_dir=str(tmp_path))
+
+
+def test_cancelled_wait_refunds_token(bucket):
+    assert bucket.reserve() == (True, 0.0)
+
+    async def cancel_while_waiting():
+        task = asyncio.ensure_future(bucket.acquire_async())
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_while_waiting())
+    # Only the first reservation is still queued ahead of us
+    taken, wait = bucket.reserve()
+    assert taken and wait < 1.0
+
+
+def test_debt_is_capped(bucket, monkeypatch):
+    monkeypatch.setattr(rate_limit, "MAX_QUEUE_SECONDS", 2.0)
+    reservations = [bucket.reserve() for _ in range(4)]
+    assert [taken for taken, _ in reservations] == [True, True, True, False]
+    # Told to retry once the queue has room again, not to queue further
+    assert 0 < reservations[-1][1] <= 1.0
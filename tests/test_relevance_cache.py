@@ -0,0 +1,51 @@
+import types
+
+import pytest
+
+import sqlite_cache
+from relevance_cache import RELEVANCE_CACHE_TTL, RelevanceCache
+from sqlite_cache import SqliteCache
+
+URL = "https://cafe.example/gallery/"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(sqlite_cache, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    path = str(tmp_path / "relevance.sqlite3")
+    return RelevanceCache(
+        SqliteCache(path, table="url_relevance", ttl=RELEVANCE_CACHE_TTL),
+        SqliteCache(path, table="url_relevance_stats")
+    )
+
+
+def test_hits_and_misses_are_counted(cache):
+    assert cache.get(URL, "interior", "batch-v1") is None
+    cache.set(URL, "interior", "batch-v1", 0.9, llm_seconds=2.0)
+    assert cache.get(URL, "interior", "batch-v1") == 0.9
+    # Same page under another spelling of its URL
+    assert cache.get("https://cafe.example/gallery#photos", "interior", "batch-v1") == 0.9
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 1, 0.667)
+    assert stats["estimated_llm_seconds_saved"] == 4.0
+
+
+def test_scores_are_kept_per_context_and_prompt(cache):
+    cache.set(URL, "interior", "batch-v1", 0.9)
+    assert cache.get(URL, "food", "batch-v1") is None
+    assert cache.get(URL, "interior", "single-v1") is None
+    assert cache.get(URL, "interior", "batch-v2") is None
+
+
+def test_scores_expire(cache, clock):
+    cache.set(URL, "interior", "single-v1", 0.4)
+    clock[0] += RELEVANCE_CACHE_TTL - 60
+    assert cache.get(URL, "interior", "single-v1") == 0.4
+    clock[0] += 120
+    assert cache.get(URL, "interior", "single-v1") is None
@@ -0,0 +1,78 @@
+import pytest
+
+import route_search
+from geo import decode_polyline, project_onto_route, route_length_m
+from route_search import parse_waypoints, search_along_route, simplify_route
+
+LAT, LON = 48.72, 21.25
+# Straight route ~1.5 km east
+ROUTE = [(LAT, LON), (LAT, LON + 0.01), (LAT, LON + 0.02)]
+
+
+def test_decodes_known_polyline():
+    # Example from Google's encoded polyline documentation
+    points = decode_polyline("_p~iF~ps|U_ulLnnqC_mqNvxq`@")
+    assert points == [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+
+
+def test_parse_waypoints():
+    assert parse_waypoints("48.72,21.25; 48.73,21.26;") == [(48.72, 21.25), (48.73, 21.26)]
+
+
+def test_simplify_route_keeps_ends():
+    points = [(LAT, LON + i * 0.0001) for i in range(1000)]
+    simplified = simplify_route(points, 50)
+    assert len(simplified) == 50
+    assert simplified[0] == points[0] and simplified[-1] == points[-1]
+    assert simplify_route(points[:10], 50) == points[:10]
+
+
+def test_project_onto_route():
+    length = route_length_m(ROUTE)
+    along, offset = project_onto_route(LAT + 100 / 111320.0, LON + 0.015, ROUTE)
+    assert along == pytest.approx(length * 0.75, rel=0.01)
+    assert offset == pytest.approx(100, rel=0.01)
+    # Before the start: clamped to the first point
+    along, offset = project_onto_route(LAT, LON - 0.001, ROUTE)
+    assert along == 0.0 and offset == pytest.approx(73.5, rel=0.02)
+
+
+def _element(osm_id, name, lat, lon):
+    return {"type": "node", "id": osm_id, "lat": lat, "lon": lon, "tags": {"name": name, "amenity": "cafe"}}
+
+
+def test_places_come_in_route_order(monkeypatch):
+    elements = [
+        _element(1, "end", LAT + 0.0005, LON + 0.019),
+        _element(2, "start", LAT - 0.0005, LON + 0.001),
+        _element(3, "middle", LAT, LON + 0.010),
+        _element(4, "too far", LAT + 0.01, LON + 0.005),  # ~1.1 km off the route
+    ]
+    monkeypatch.setattr(route_search, "get_local_index", lambda: None)
+    monkeypatch.setattr(route_search, "fetch_elements", lambda query, raise_errors=False: elements)
+    located = search_along_route(ROUTE, 150, ["amenity=cafe"])
+    assert [place.name for place, _, _ in located] == ["start", "middle", "end"]
+    alongs = [along for _, along, _ in located]
+    assert alongs == sorted(alongs)
+    assert all(offset <= 150 for _, _, offset in located)
+
+
+def test_limit_keeps_places_closest_to_the_route(monkeypatch):
+    elements = [
+        _element(1, "near", LAT + 0.0001, LON + 0.015),
+        _element(2, "farther", LAT + 0.0010, LON + 0.005),
+    ]
+    monkeypatch.setattr(route_search, "get_local_index", lambda: None)
+    monkeypatch.setattr(route_search, "fetch_elements", lambda query, raise_errors=False: elements)
+    assert [place.name for place, _, _ in search_along_route(ROUTE, 150, ["amenity=cafe"], limit=1)] == ["near"]
+
+
+def test_overpass_failure_raises(monkeypatch):
+    def failing(query, raise_errors=False):
+        assert raise_errors
+        raise RuntimeError("Overpass down")
+
+    monkeypatch.setattr(route_search, "get_local_index", lambda: None)
+    monkeypatch.setattr(route_search, "fetch_elements", failing)
+    with pytest.raises(RuntimeError):
+        search_along_route(ROUTE, 150, ["amenity=cafe"])
@@ -0,0 +1,86 @@
+import asyncio
+import re
+import time
+
+import pytest
+
+import tile_cache
+from geo import tiles_covering
+from tile_cache import TileCache
+
+LAT, LON = 48.72, 21.26
+
+
+def _cafe(osm_id, lat, lon):
+    return {"type": "node", "id": osm_id, "lat": lat, "lon": lon, "tags": {"name": f"cafe {osm_id}", "amenity": "cafe"}}
+
+
+PLACES = [_cafe(1, LAT, LON), _cafe(2, LAT + 0.003, LON), _cafe(3, LAT, LON + 0.004), _cafe(4, LAT + 0.02, LON)]
+
+
+@pytest.fixture
+def overpass(monkeypatch):
+    """Fake Overpass answering bbox queries from PLACES, recording every query"""
+    queries = []
+
+    async def fetch(client, query, raise_errors=False, **kwargs):
+        queries.append(query)
+        if overpass.error:
+            raise overpass.error
+        south, west, north, east = map(float, re.search(r"\(([-\d.]+),([-\d.]+),([-\d.]+),([-\d.]+)\)", query).groups())
+        return [element for element in PLACES if south <= element["lat"] <= north and west <= element["lon"] <= east]
+
+    overpass.error = None
+    overpass.queries = queries
+    monkeypatch.setattr(tile_cache, "fetch_elements_async", fetch)
+    monkeypatch.setattr(tile_cache, "get_local_index", lambda: None)
+    return overpass
+
+
+def _query(cache, lat, lon, radius, **kwargs):
+    return [place.name for place in asyncio.run(cache.query_async(None, lat, lon, radius, "amenity=cafe", **kwargs))]
+
+
+def test_places_from_several_tiles_are_merged_nearest_first(overpass):
+    cache = TileCache()
+    assert len(tiles_covering(LAT, LON, 500, cache.zoom)) > 1
+    assert _query(cache, LAT, LON, 500) == ["cafe 1", "cafe 3", "cafe 2"]
+    assert len(overpass.queries) == 1
+
+
+def test_only_missing_tiles_are_fetched(overpass):
+    cache = TileCache()
+    _query(cache, LAT, LON, 200)
+    misses = cache.misses
+    # Same area again: all cached
+    assert _query(cache, LAT, LON, 200) == ["cafe 1"]
+    assert len(overpass.queries) == 1 and cache.misses == misses
+    # Larger area: only the new tiles miss
+    hits = cache.hits
+    _query(cache, LAT, LON, 500)
+    assert len(overpass.queries) == 2
+    assert cache.hits - hits == len(tiles_covering(LAT, LON, 200, cache.zoom))
+
+
+def test_expired_tiles_are_fetched_again(overpass):
+    cache = TileCache(ttl=0.2)
+    _query(cache, LAT, LON, 200)
+    time.sleep(0.3)
+    _query(cache, LAT, LON, 200)
+    assert len(overpass.queries) == 2
+
+
+def test_failed_fill_is_not_cached_as_empty(overpass):
+    cache = TileCache()
+    overpass.error = RuntimeError("Overpass down")
+    assert _query(cache, LAT, LON, 200) == []
+    with pytest.raises(RuntimeError):
+        _query(cache, LAT, LON, 200, raise_errors=True)
+    overpass.error = None
+    assert _query(cache, LAT, LON, 200) == ["cafe 1"]
+    assert len(overpass.queries) == 3
+
+
+def test_ring_query_skips_the_inner_circle(overpass):
+    cache = TileCache()
+    assert _query(cache, LAT, LON, 500, inner_radius=100) == ["cafe 3", "cafe 2"]